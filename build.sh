@@ -7,8 +7,11 @@ set -o errexit
 pip install -r requirements.txt
 
 
-# Convert static asset files
+# Prune, bundle and convert static assets, then collect them
+# (hashed + gzip/brotli variants in prod)
+python manage.py build_assets
 python manage.py collectstatic --no-input
+python manage.py compression_report --static
 
 
 # Apply any outstanding database migrations
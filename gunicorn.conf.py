@@ -0,0 +1,64 @@
+"""
+Gunicorn settings, picked up from the working directory by
+`gunicorn task_manager_site.wsgi`.
+
+Everything can be overridden with environment variables, gunicorn itself
+also reads PORT (bind) and GUNICORN_CMD_ARGS.
+"""
+
+import multiprocessing
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+# "sync" measured the better tail latency (benchmark_http: p99 167 ms
+# against 281 ms for gthread at the same throughput). "gthread" keeps a few
+# requests in flight per process while one waits on Postgres, "gevent"
+# needs gevent installed. "uvicorn" serves the ASGI app instead, needed for
+# the live task updates
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+if worker_class == "uvicorn":
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "task_manager_site.asgi:application"
+else:
+    wsgi_app = "task_manager_site.wsgi:application"
+
+_cpus = multiprocessing.cpu_count()
+if worker_class == "sync":
+    workers = _env_int("WEB_CONCURRENCY", 2 * _cpus + 1)
+    threads = 1
+else:
+    workers = _env_int("WEB_CONCURRENCY", _cpus + 1)
+    threads = _env_int("GUNICORN_THREADS", 4)
+
+# Import Django and the project once in the master process, workers are
+# forked with everything already loaded
+preload_app = True
+
+# Recycle workers now and then so slow leaks can't pile up, the jitter
+# keeps them from all restarting at once
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int(
+    "GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10
+)
+
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+
+def post_fork(server, worker):
+    # never reuse a connection the master might have opened before forking
+    from django.db import connections
+
+    from tasks.warmup import warm_up
+
+    connections.close_all()
+    # resolve the URLConf, compile templates, connect and fill the
+    # counters before the first request instead of during it. Failures
+    # are logged, the worker then starts cold on a fresh connection
+    if warm_up() is None:
+        connections.close_all()
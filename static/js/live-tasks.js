@@ -0,0 +1,52 @@
+// Patch the task list from the live updates stream: completion flips the
+// status badge of the row in place, anything that changes which rows are
+// listed (new tasks, assignments) offers to reload the results instead.
+(function () {
+  const results = document.getElementById("list-results");
+  if (!results || !results.dataset.liveUrl || !("EventSource" in window)) {
+    return;
+  }
+  const notice = document.querySelector("[data-live-notice]");
+
+  function setCompleted(row, completed) {
+    const button = row.querySelector("form[data-toggle-completed] button");
+    if (!button) {
+      return;
+    }
+    button.classList.toggle("bg-gradient-success", completed);
+    button.classList.toggle("bg-gradient-secondary", !completed);
+    button.querySelector("span").textContent = completed ? "Completed" : "Uncompleted";
+  }
+
+  function showNotice() {
+    if (notice) {
+      notice.classList.remove("d-none");
+    }
+  }
+
+  const source = new EventSource(results.dataset.liveUrl);
+  source.addEventListener("task", function (event) {
+    const update = JSON.parse(event.data);
+    const row = results.querySelector('tr[data-task-id="' + update.id + '"]');
+    if (update.kind === "completed" || update.kind === "reopened") {
+      if (row) {
+        setCompleted(row, update.kind === "completed");
+      }
+    } else if (update.kind !== "unassigned" || row) {
+      showNotice();
+    }
+  });
+
+  document.addEventListener("click", function (event) {
+    if (!event.target.closest("[data-live-reload]")) {
+      return;
+    }
+    event.preventDefault();
+    notice.classList.add("d-none");
+    results.dispatchEvent(new CustomEvent("list:reload"));
+  });
+
+  window.addEventListener("pagehide", function () {
+    source.close();
+  });
+})();
@@ -0,0 +1,131 @@
+// Swap only the list results (table + pagination) on filter, search and
+// page changes. The server answers requests carrying the HX-Request
+// header with the results fragment instead of the whole layout.
+//
+// In infinite-scroll mode the "load more" sentinel carries the url of the
+// next batch, its rows are appended to the table once it scrolls into view.
+(function () {
+  const results = document.getElementById("list-results");
+  if (!results) {
+    return;
+  }
+
+  function syncHiddenInputs(params) {
+    document.querySelectorAll("form[method=get] input[type=hidden]").forEach(function (input) {
+      input.value = params.get(input.name) || "";
+    });
+  }
+
+  function load(url, push) {
+    fetch(url, {headers: {"HX-Request": "true"}})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        results.innerHTML = html;
+        if (push) {
+          history.pushState({partial: true}, "", url);
+        }
+        syncHiddenInputs(new URL(url, window.location.href).searchParams);
+        watchSentinel();
+      })
+      .catch(function () {
+        window.location.href = url;
+      });
+  }
+
+  let loadingMore = false;
+  const observer = "IntersectionObserver" in window
+    ? new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+          loadMore(entry.target);
+        }
+      });
+    }, {rootMargin: "200px"})
+    : null;
+
+  function watchSentinel() {
+    const sentinel = results.querySelector("[data-next-url]");
+    if (observer && sentinel) {
+      // re-observing fires again if the sentinel is still in view
+      observer.disconnect();
+      observer.observe(sentinel);
+    }
+  }
+
+  function loadMore(sentinel) {
+    if (loadingMore) {
+      return;
+    }
+    loadingMore = true;
+    const url = sentinel.dataset.nextUrl;
+    fetch(url, {headers: {"HX-Request": "true"}})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.text().then(function (html) {
+          return {html: html, next: response.headers.get("X-Next-Url")};
+        });
+      })
+      .then(function (batch) {
+        results.querySelector("tbody[data-list-rows]").insertAdjacentHTML("beforeend", batch.html);
+        if (batch.next) {
+          sentinel.dataset.nextUrl = batch.next;
+          sentinel.querySelector("a").href = batch.next;
+        } else {
+          sentinel.remove();
+        }
+      })
+      .catch(function () {
+        window.location.href = url;
+      })
+      .finally(function () {
+        loadingMore = false;
+        watchSentinel();
+      });
+  }
+
+  document.addEventListener("click", function (event) {
+    const sentinel = event.target.closest("#list-results [data-next-url]");
+    if (sentinel) {
+      event.preventDefault();
+      loadMore(sentinel);
+    }
+  });
+
+  document.addEventListener("click", function (event) {
+    const link = event.target.closest("#list-results .pagination a.page-link");
+    if (!link || !link.getAttribute("href") || link.getAttribute("href") === "#") {
+      return;
+    }
+    event.preventDefault();
+    load(link.href, true);
+  });
+
+  document.addEventListener("submit", function (event) {
+    const form = event.target;
+    if ((form.getAttribute("method") || "get").toLowerCase() !== "get") {
+      return;
+    }
+    event.preventDefault();
+    const url = new URL(form.action || window.location.href, window.location.href);
+    url.search = new URLSearchParams(new FormData(form)).toString();
+    load(url.toString(), true);
+  });
+
+  window.addEventListener("popstate", function () {
+    load(window.location.href, false);
+  });
+
+  // fired by live-tasks.js once the list went stale
+  results.addEventListener("list:reload", function () {
+    load(window.location.href, false);
+  });
+
+  watchSentinel();
+})();
@@ -0,0 +1,36 @@
+// Flip completion badges in place instead of reloading the list page.
+document.addEventListener("submit", function (event) {
+  const form = event.target;
+  if (!form.matches("form[data-toggle-completed]")) {
+    return;
+  }
+  event.preventDefault();
+
+  fetch(form.action, {
+    method: "POST",
+    body: new FormData(form),
+    headers: {
+      "Accept": "application/json",
+      "X-Requested-With": "XMLHttpRequest",
+    },
+  })
+    .then(function (response) {
+      return response.json().then(function (data) {
+        return {ok: response.ok, data: data};
+      });
+    })
+    .then(function (result) {
+      if (!result.ok) {
+        alert(result.data.error);
+        return;
+      }
+      const button = form.querySelector("button");
+      const completed = result.data.is_completed;
+      button.classList.toggle("bg-gradient-success", completed);
+      button.classList.toggle("bg-gradient-secondary", !completed);
+      button.querySelector("span").textContent = completed ? "Completed" : "Uncompleted";
+    })
+    .catch(function () {
+      form.submit();
+    });
+});
@@ -35,20 +35,21 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "crispy_forms",
     "crispy_bootstrap5",
+    "django_select2",
     "tasks",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "tasks.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "tasks.middleware.TaskEventMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -113,6 +114,14 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# `manage.py build_assets` copies only the referenced files from the source
+# dir, plus bundled CSS/JS and WebP/AVIF image variants
+ASSET_SOURCE_DIR = BASE_DIR / "static"
+ASSET_BUILD_DIR = BASE_DIR / "build" / "static"
+
+# Serve the bundles instead of their individual source files
+ASSET_BUNDLES = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -120,10 +129,78 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "tasks.Worker"
 
-INTERNAL_IPS = [
-    "127.0.0.1",
+# Looks the user of each request up in the cache instead of the database
+AUTHENTICATION_BACKENDS = [
+    "tasks.auth.CachedModelBackend",
 ]
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# The default local-memory cache is per process, so other workers only see
+# a changed user once their cached copy expires
+USER_CACHE_TIMEOUT = 60 * 15 if REDIS_URL else 60
+# the same goes for team membership: other workers keep offering removed
+# members as assignees until their cached set expires
+ELIGIBLE_ASSIGNEES_CACHE_TIMEOUT = 60 * 60 if REDIS_URL else 60
+# access lists most of all: a removed member keeps access in other workers
+# until theirs expires
+ACCESS_CACHE_TIMEOUT = 60 * 60 * 24 if REDIS_URL else 60
+# and for calendar feeds, which other workers would keep serving unchanged
+WORKER_FEED_CACHE_TIMEOUT = 60 * 60 * 24 if REDIS_URL else 60
+# cache versions are bumped by deleting them, which only reaches the
+# process that did it unless the cache is shared
+CACHE_VERSION_TIMEOUT = None if REDIS_URL else 60
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+#
+# "cached_db" reads through the cache and falls back to the database,
+# "cache" needs a shared cache (REDIS_URL), "signed_cookies" keeps the
+# session data client side. Run `manage.py clearsessions` daily for the
+# database backed ones.
+
+SESSION_BACKENDS = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+SESSION_ENGINE = SESSION_BACKENDS[
+    os.environ.get("DJANGO_SESSION_BACKEND", "cached_db")
+]
+
+# Email
+# https://docs.djangoproject.com/en/5.2/topics/email/
+#
+# Deadline digests (`manage.py send_deadline_digests`) go out through
+# EMAIL_BACKEND, SMTP on EMAIL_HOST by default. Links in them start with
+# SITE_URL.
+
+EMAIL_BACKEND = os.environ.get(
+    "DJANGO_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "") == "True"
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DEFAULT_FROM_EMAIL", "Task Manager <noreply@localhost>"
+)
+
+SITE_URL = os.environ.get("SITE_URL", "http://127.0.0.1:8000")
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -7,6 +7,29 @@ DEBUG = os.environ.get("DJANGO_DEBUG", "") != "False"
 
 ALLOWED_HOSTS = ["127.0.0.1"]
 
+# Development-only apps and middleware, production runs without them
+DEV_APPS = [
+    "debug_toolbar",
+]
+DEV_MIDDLEWARE = [
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+]
+
+INSTALLED_APPS = INSTALLED_APPS + DEV_APPS
+
+# as early as possible, but after the middleware compressing responses
+_position = MIDDLEWARE.index("tasks.middleware.CompressionMiddleware") + 1
+MIDDLEWARE = MIDDLEWARE[:_position] + DEV_MIDDLEWARE + MIDDLEWARE[_position:]
+
+# print mails instead of sending them
+EMAIL_BACKEND = os.environ.get(
+    "DJANGO_EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -20,5 +20,27 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": int(os.environ["POSTGRES_DB_PORT"]),
+        # keep connections open between requests of a worker thread
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
+
+# Hashed, precompressed (gzip + brotli) static files, served by WhiteNoise
+# with far-future cache headers. References to files the UI kit does not
+# ship are left alone, so collectstatic also works without build_assets.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "tasks.storage.LenientManifestStaticFilesStorage",
+    },
+}
+# missing files are served unhashed instead of failing the page
+WHITENOISE_MANIFEST_STRICT = False
+
+# Collect the pruned asset build from build.sh instead of the whole UI kit
+if ASSET_BUILD_DIR.is_dir():
+    STATICFILES_DIRS = [ASSET_BUILD_DIR]
+    ASSET_BUNDLES = True
@@ -15,7 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from debug_toolbar.toolbar import debug_toolbar_urls
+from django.apps import apps
 from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
@@ -26,5 +26,8 @@ urlpatterns = [
     path("", include("tasks.urls", namespace="tasks")),
 ]
 
-if settings.DEBUG:
+if settings.DEBUG and apps.is_installed("debug_toolbar"):
+    # dev-only app, imported here so production never loads it
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
     urlpatterns += debug_toolbar_urls()
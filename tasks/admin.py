@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from tasks.models import Task, Worker, Position, Team, Project, TaskType
+from tasks.models import (
+    Task,
+    Worker,
+    Position,
+    Team,
+    Project,
+    TaskType,
+    RecurringTask,
+)
 
 
 @admin.register(Worker)
@@ -31,3 +39,8 @@ class TeamAdmin(admin.ModelAdmin):
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(RecurringTask)
+class RecurringTaskAdmin(admin.ModelAdmin):
+    pass
@@ -0,0 +1,192 @@
+"""
+Static asset build step, run from ``build.sh`` before ``collectstatic``.
+
+Only the files the templates reference are copied to the build directory,
+the theme CSS/JS is bundled and minified, and large JPG/PNG illustrations
+get right-sized WebP/AVIF variants next to them.
+"""
+
+import posixpath
+import re
+import shutil
+from importlib.util import find_spec
+from pathlib import Path
+
+# bundle name -> source files, in load order
+BUNDLES = {
+    "site.css": (
+        "fontello-icons/css/fontello.css",
+        "css/nucleo-icons.css",
+        "css/nucleo-svg.css",
+        "css/soft-design-system.css",
+        "css/my_style.css",
+    ),
+    "site.js": (
+        "js/core/popper.min.js",
+        "js/core/bootstrap.min.js",
+        "js/soft-design-system.min.js",
+    ),
+}
+BUNDLE_DIR = "bundles"
+
+# variant format -> encoder quality, preferred format first
+IMAGE_VARIANTS = {"avif": 50, "webp": 75}
+LARGE_IMAGE_BYTES = 100 * 1024
+MAX_IMAGE_WIDTH = 1920
+
+TEMPLATE_REF = re.compile(
+    r"""{%\s*(?:static|picture|background_image)\s+["']([^"']+)["']"""
+)
+CSS_URL = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+SOURCE_MAP = re.compile(
+    r"(/\*# sourceMappingURL=.*?\*/|//# sourceMappingURL=.*)"
+)
+
+
+def bundle_path(name: str) -> str:
+    return f"{BUNDLE_DIR}/{name}"
+
+
+def variant_path(path: str, fmt: str) -> str:
+    return posixpath.splitext(path)[0] + "." + fmt
+
+
+def referenced_assets(template_dirs) -> set[str]:
+    """Static paths used by ``{% static %}`` and friends in templates."""
+    paths = set()
+    for directory in template_dirs:
+        for template in Path(directory).rglob("*.html"):
+            paths.update(TEMPLATE_REF.findall(template.read_text("utf-8")))
+    return paths
+
+
+def _css_references(path: str, text: str):
+    """Yield ``(url, resolved static path)`` for relative ``url()``s."""
+    for match in CSS_URL.finditer(text):
+        url = match.group(2).strip()
+        if url.startswith(("data:", "http:", "https:", "//", "#", "/")):
+            continue
+        target = re.split(r"[?#]", url, maxsplit=1)[0]
+        yield url, posixpath.normpath(
+            posixpath.join(posixpath.dirname(path), target)
+        )
+
+
+def _rebase_css(path: str, text: str, bundle: str) -> str:
+    """Rewrite relative urls of ``path`` so they work from ``bundle``."""
+    base = posixpath.dirname(bundle)
+
+    def rebase(match):
+        references = list(_css_references(path, match.group(0)))
+        if not references:
+            return match.group(0)
+        url, target = references[0]
+        suffix = url[len(re.split(r"[?#]", url, maxsplit=1)[0]):]
+        return f"url('{posixpath.relpath(target, base)}{suffix}')"
+
+    return CSS_URL.sub(rebase, text)
+
+
+def _minify(name: str, text: str) -> str:
+    text = SOURCE_MAP.sub("", text)
+    try:
+        # build-only dependencies, imported here to keep them out of the
+        # template tags (and so every worker) that import this module
+        import rcssmin
+        import rjsmin
+    except ImportError:  # pragma: no cover - bundles are only concatenated
+        return text
+    if name.endswith(".css"):
+        return rcssmin.cssmin(text)
+    if name.endswith(".js"):
+        return rjsmin.jsmin(text)
+    return text
+
+
+def _write_variants(path: Path, max_width: int) -> dict[str, int]:
+    """
+    Write WebP/AVIF variants of ``path``, returns their sizes. Images
+    wider than ``max_width`` are scaled down, the original included.
+    """
+    from PIL import Image, features  # build-only dependency
+
+    sizes = {}
+    with Image.open(path) as image:
+        if image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+            image.save(path, quality=85, optimize=True)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands()
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        for fmt, quality in IMAGE_VARIANTS.items():
+            if not features.check(fmt):
+                continue
+            target = path.with_suffix("." + fmt)
+            image.save(target, fmt.upper(), quality=quality)
+            sizes[fmt] = target.stat().st_size
+    return sizes
+
+
+def build_assets(
+        source,
+        target,
+        template_dirs,
+        bundles=BUNDLES,
+        large_image_bytes: int = LARGE_IMAGE_BYTES,
+        max_image_width: int = MAX_IMAGE_WIDTH,
+) -> dict:
+    """
+    Rebuild ``target`` from ``source``, returns a summary of what was
+    written for the build report.
+    """
+    source, target = Path(source), Path(target)
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    pending = sorted(referenced_assets(template_dirs))
+    summary = {"files": 0, "bytes": 0, "bundles": {}, "images": {}}
+
+    for name, members in bundles.items():
+        parts = []
+        for member in members:
+            text = (source / member).read_text("utf-8")
+            if name.endswith(".css"):
+                pending.extend(
+                    ref for _, ref in _css_references(member, text)
+                )
+                text = _rebase_css(member, text, bundle_path(name))
+            parts.append(text)
+        content = _minify(name, "\n".join(parts))
+        bundle = target / bundle_path(name)
+        bundle.parent.mkdir(parents=True, exist_ok=True)
+        bundle.write_text(content, "utf-8")
+        summary["bundles"][name] = (
+            sum((source / member).stat().st_size for member in members),
+            bundle.stat().st_size,
+        )
+
+    copied = set()
+    while pending:
+        path = pending.pop()
+        origin = source / path
+        if path in copied or not origin.is_file():
+            continue
+        copied.add(path)
+        destination = target / path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(origin, destination)
+        summary["files"] += 1
+        summary["bytes"] += origin.stat().st_size
+        if origin.suffix == ".css":
+            text = origin.read_text("utf-8")
+            pending.extend(ref for _, ref in _css_references(path, text))
+        elif (find_spec("PIL")
+              and origin.suffix.lower() in (".jpg", ".jpeg", ".png")
+              and origin.stat().st_size > large_image_bytes):
+            variants = _write_variants(destination, max_image_width)
+            variants[origin.suffix.lstrip(".")] = destination.stat().st_size
+            summary["images"][path] = (origin.stat().st_size, variants)
+
+    return summary
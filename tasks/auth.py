@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def _user_cache_key(pk) -> str:
+    return f"worker:{pk}"
+
+
+def forget_cached_user(pk) -> None:
+    cache.delete(_user_cache_key(pk))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` whose ``get_user`` (called by ``AuthenticationMiddleware``
+    on every request) is served from the cache. Entries are dropped when
+    the worker is saved or deleted.
+    """
+
+    def get_user(self, user_id):
+        key = _user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
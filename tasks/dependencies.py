@@ -0,0 +1,179 @@
+"""
+Dependency graph of a project's tasks ("blocked by" chains).
+
+The whole graph is loaded in one query and turned into adjacency arrays:
+tasks are numbered ``0..n-1`` in ``ids`` and ``blocked_by[i]`` lists the
+numbers of the tasks blocking task ``i``. Topological order, cycles and
+the critical path are worked out on those arrays in memory and cached
+until the project graph version changes. The cycle check that guards
+writes always loads the rows afresh, a stale cached graph would let a
+cycle slip in.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from tasks.models import Task
+from tasks.services import project_graph_version
+
+GRAPH_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def load_graph(project_id: int) -> tuple[list[int], list[bool], list[list]]:
+    """``(ids, completed, blocked_by)`` of the project, one query."""
+    rows = (
+        Task.objects.filter(project_id=project_id)
+        .order_by("pk")
+        .values_list("pk", "is_completed", "blocked_by")
+    )
+    ids, completed, index, edges = [], [], {}, []
+    for pk, is_completed, blocker in rows:
+        if pk not in index:
+            index[pk] = len(ids)
+            ids.append(pk)
+            completed.append(is_completed)
+        if blocker is not None:
+            edges.append((index[pk], blocker))
+    blocked_by = [[] for _ in ids]
+    for task, blocker in edges:
+        # blockers that moved to another project are left out
+        if blocker in index:
+            blocked_by[task].append(index[blocker])
+    return ids, completed, blocked_by
+
+
+def _find_cycle(blocked_by: list[list], remaining: set[int]) -> list[int]:
+    """A cycle among ``remaining``, the tasks a topological sort left."""
+    node = min(remaining)
+    path, position = [], {}
+    while node not in position:
+        position[node] = len(path)
+        path.append(node)
+        # every remaining task is blocked by another remaining one
+        node = next(b for b in blocked_by[node] if b in remaining)
+    return path[position[node]:]
+
+
+def analyze(
+        ids: list[int], completed: list[bool], blocked_by: list[list]
+) -> dict:
+    """
+    Topological ``order`` (blockers first), a ``cycle`` if there is one
+    and the ``critical_path``: the longest chain of open tasks, each one
+    blocking the next. Tasks are referred to by pk.
+    """
+    n = len(ids)
+    blocking = [[] for _ in range(n)]
+    pending = [len(blockers) for blockers in blocked_by]
+    for task, blockers in enumerate(blocked_by):
+        for blocker in blockers:
+            blocking[blocker].append(task)
+
+    # Kahn's algorithm, ties in pk order
+    ready = deque(task for task in range(n) if not pending[task])
+    order = []
+    while ready:
+        task = ready.popleft()
+        order.append(task)
+        for dependent in blocking[task]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                ready.append(dependent)
+
+    cycle = []
+    if len(order) < n:
+        cycle = _find_cycle(blocked_by, set(range(n)) - set(order))
+
+    # longest chain of open tasks ending in each task, blockers come
+    # before their dependents in the order
+    length = [0] * n
+    previous = [-1] * n
+    for task in order:
+        blocker = max(blocked_by[task], key=length.__getitem__, default=-1)
+        previous[task] = blocker
+        length[task] = (length[blocker] if blocker != -1 else 0) + (
+            not completed[task]
+        )
+    critical_path = []
+    if order:
+        task = max(order, key=length.__getitem__)
+        if length[task]:
+            while task != -1:
+                critical_path.append(task)
+                task = previous[task]
+            critical_path.reverse()
+
+    return {
+        "order": [ids[task] for task in order],
+        "cycle": [ids[task] for task in cycle],
+        "critical_path": [
+            ids[task] for task in critical_path if not completed[task]
+        ],
+    }
+
+
+def project_graph(project_id: int) -> dict:
+    """
+    The project's graph as ``{"ids", "blocked_by"}`` adjacency arrays
+    along with its ``analyze()`` results, computed once per version.
+    """
+    key = f"project-graph:{project_id}:{project_graph_version(project_id)}"
+    graph = cache.get(key)
+    if graph is None:
+        ids, completed, blocked_by = load_graph(project_id)
+        graph = {
+            "ids": ids,
+            "blocked_by": blocked_by,
+            **analyze(ids, completed, blocked_by),
+        }
+        cache.set(key, graph, GRAPH_CACHE_TIMEOUT)
+    return graph
+
+
+def creates_cycle(task: Task, blocker_ids: Iterable[int]) -> bool:
+    """
+    Whether ``task`` blocked by ``blocker_ids`` closes a cycle, that is
+    whether one of them is already (indirectly) blocked by ``task``.
+    """
+    if task.pk is None or task.project_id is None:
+        # nothing can depend on a task that is not in the graph yet
+        return False
+    ids, _, blocked_by = load_graph(task.project_id)
+    index = {pk: i for i, pk in enumerate(ids)}
+    target = index.get(task.pk)
+    if target is None:
+        return False
+    stack = [index[pk] for pk in blocker_ids if pk in index]
+    seen = bytearray(len(index))
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if not seen[node]:
+            seen[node] = 1
+            stack.extend(blocked_by[node])
+    return False
+
+
+def validate_blockers(task: Task, blockers: Iterable[Task]) -> None:
+    """Raise ``ValidationError`` unless ``task`` can be blocked by them."""
+    blockers = list(blockers)
+    if not blockers:
+        return
+    if task.pk is not None and any(b.pk == task.pk for b in blockers):
+        raise ValidationError(
+            {"blocked_by": "A task cannot be blocked by itself."}
+        )
+    if task.project_id is None or any(
+            b.project_id != task.project_id for b in blockers
+    ):
+        raise ValidationError(
+            {"blocked_by": "Only tasks of the same project can block it."}
+        )
+    if creates_cycle(task, [b.pk for b in blockers]):
+        raise ValidationError(
+            {"blocked_by": "These dependencies would form a cycle."}
+        )
@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.dispatch import Signal
+
+from tasks.models import TaskEvent
+
+# fields of Task whose changes end up in the event log
+TRACKED_FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "is_completed",
+    "priority",
+    "type_id",
+    "project_id",
+    "parent_id",
+)
+
+# sent with the list of events after each batch is written
+task_events_recorded = Signal()
+
+_scope: ContextVar["EventScope | None"] = ContextVar(
+    "task_event_scope", default=None
+)
+
+
+class _Savepoint:
+    """
+    ``on_commit`` callback standing for the (sub)transaction events were
+    recorded in. Django drops it when that savepoint rolls back, so events
+    whose savepoint neither committed nor is still pending were undone.
+    """
+
+    def __init__(self, connection) -> None:
+        self.connection = connection
+        self.savepoints = tuple(filter(None, connection.savepoint_ids))
+        self.committed = False
+        transaction.on_commit(self)
+
+    def __call__(self) -> None:
+        self.committed = True
+
+    @property
+    def pending(self) -> bool:
+        return any(
+            callback is self
+            for _, callback, _ in self.connection.run_on_commit
+        )
+
+    @property
+    def survived(self) -> bool:
+        return self.committed or self.pending
+
+
+class EventScope:
+    """
+    Events collected during one request or transaction, written with a
+    single INSERT. Events recorded inside an atomic block are only
+    written if the block was not rolled back.
+    """
+
+    def __init__(self, actor_id: int | None = None) -> None:
+        self.actor_id = actor_id
+        self.events: list[tuple[TaskEvent, _Savepoint | None]] = []
+        self._savepoint: _Savepoint | None = None
+
+    def add(self, event: TaskEvent, connection) -> None:
+        savepoint = None
+        if connection.in_atomic_block:
+            savepoint = self._savepoint
+            if savepoint is None or not (
+                    savepoint.savepoints
+                    == tuple(filter(None, connection.savepoint_ids))
+                    and savepoint.pending
+            ):
+                savepoint = self._savepoint = _Savepoint(connection)
+        self.events.append((event, savepoint))
+
+    def flush(self) -> None:
+        events = [
+            event for event, savepoint in self.events
+            if savepoint is None or savepoint.survived
+        ]
+        self.events = []
+        if events:
+            TaskEvent.objects.bulk_create(events)
+            task_events_recorded.send(sender=TaskEvent, events=events)
+
+
+@contextmanager
+def event_scope(actor_id: int | None = None):
+    """
+    Collect the events recorded inside the block, written when it ends.
+    Nothing is written when the block raises.
+    """
+    scope = EventScope(actor_id)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+    scope.flush()
+
+
+def _transaction_scope(connection) -> EventScope:
+    """
+    Scope shared by the events of the current transaction (savepoint),
+    written in one batch once it commits. A rollback drops the scope
+    along with its ``on_commit`` callback.
+    """
+    # atomic(savepoint=False) blocks show up as None
+    savepoints = tuple(filter(None, connection.savepoint_ids))
+    pending = getattr(connection, "_task_event_scope", None)
+    if pending is not None:
+        pending_savepoints, scope, flush = pending
+        if pending_savepoints == savepoints and any(
+                callback is flush
+                for _, callback, _ in connection.run_on_commit
+        ):
+            return scope
+
+    scope = EventScope()
+
+    def flush():
+        if getattr(connection, "_task_event_scope", None) is entry:
+            connection._task_event_scope = None
+        scope.flush()
+
+    entry = (savepoints, scope, flush)
+    connection._task_event_scope = entry
+    transaction.on_commit(flush)
+    return scope
+
+
+def record(task_id: int, kind: str, **fields) -> None:
+    """
+    Buffer an event for ``task_id``.
+
+    Inside ``event_scope`` (every request, see TaskEventMiddleware) the
+    event is written when the scope ends, unless the atomic block it was
+    recorded in rolled back. Outside of it events are
+    written once per transaction when it commits, right away in
+    autocommit mode.
+    """
+    scope = _scope.get()
+    connection = transaction.get_connection()
+    fields.setdefault("actor_id", scope.actor_id if scope else None)
+    event = TaskEvent(task_id=task_id, kind=kind, **fields)
+    if scope is not None:
+        scope.add(event, connection)
+    elif connection.in_atomic_block:
+        # written by the scope's own on_commit callback
+        _transaction_scope(connection).events.append((event, None))
+    else:
+        # autocommit, the change is already written
+        TaskEvent.objects.bulk_create([event])
+        task_events_recorded.send(sender=TaskEvent, events=[event])
+
+
+def _as_text(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def record_changes(task) -> None:
+    """Record the difference between ``task`` and its loaded state."""
+    loaded = getattr(task, "_loaded_values", None)
+    if loaded is None:
+        return
+    for attname in TRACKED_FIELDS:
+        old = loaded.get(attname, DEFERRED)
+        if old is DEFERRED:
+            continue
+        new = getattr(task, attname)
+        loaded[attname] = new
+        if old == new:
+            continue
+        if attname == "is_completed":
+            kind = TaskEvent.Kind.COMPLETED if new else TaskEvent.Kind.REOPENED
+            record(task.pk, kind)
+        else:
+            record(
+                task.pk,
+                TaskEvent.Kind.CHANGED,
+                field=attname,
+                old_value=_as_text(old),
+                new_value=_as_text(new),
+            )
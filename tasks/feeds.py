@@ -0,0 +1,154 @@
+"""
+Per-worker iCalendar feeds of the tasks assigned to them.
+
+The rendered feed is cached until one of the worker's tasks or
+assignments changes (``worker_feed_version``), so the polling of calendar
+apps is answered from the cache or with a 304. Every feed carries a sync
+token, with it a client only gets the events that changed since, looked
+up in the task event log.
+
+Feed urls carry the worker's ``feed_secret``, regenerating it revokes
+every url handed out before.
+"""
+
+import datetime
+import hashlib
+from collections.abc import Callable
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from tasks.ical import cancelled_event, stream_calendar, task_event
+from tasks.models import TaskEvent, Worker, new_feed_secret
+from tasks.services import worker_feed_version
+
+# events are stamped when recorded but written at the end of the request,
+# tokens reach back this far so that none of them slips through
+SYNC_TOKEN_OVERLAP = datetime.timedelta(minutes=2)
+
+_FEED_KEY_SALT = "tasks.worker-feed"
+_SYNC_TOKEN_SALT = "tasks.worker-feed-sync"
+
+
+def feed_key(worker: Worker) -> str:
+    """The secret part of the worker's feed url."""
+    return signing.dumps([worker.pk, worker.feed_secret], salt=_FEED_KEY_SALT)
+
+
+def worker_for_key(key: str) -> Worker | None:
+    try:
+        pk, secret = signing.loads(key, salt=_FEED_KEY_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    worker = Worker.objects.filter(pk=pk, is_active=True).first()
+    if worker is None or not constant_time_compare(
+        worker.feed_secret, str(secret)
+    ):
+        return None
+    return worker
+
+
+def reset_feed_key(worker: Worker) -> str:
+    """Regenerate the worker's feed secret, the old urls stop working."""
+    worker.feed_secret = new_feed_secret()
+    worker.save(update_fields=["feed_secret"])
+    return feed_key(worker)
+
+
+def make_sync_token(version: str, now: datetime.datetime) -> str:
+    return signing.dumps(
+        [version, (now - SYNC_TOKEN_OVERLAP).isoformat()],
+        salt=_SYNC_TOKEN_SALT,
+    )
+
+
+def read_sync_token(token: str) -> tuple[str, datetime.datetime]:
+    """``(version, since)`` of ``token``, raises ``BadSignature``."""
+    version, since = signing.loads(token, salt=_SYNC_TOKEN_SALT)
+    return version, datetime.datetime.fromisoformat(since)
+
+
+def _render(worker: Worker, events, token: str) -> str:
+    return "".join(
+        stream_calendar(
+            events,
+            f"Tasks of {worker}",
+            properties=[("X-SYNC-TOKEN", token)],
+        )
+    )
+
+
+def _assigned_tasks(worker: Worker):
+    return worker.tasks.select_related("type").order_by("deadline", "pk")
+
+
+def worker_feed(worker: Worker, absolute_uri: Callable[[str], str]) -> dict:
+    """
+    The worker's whole feed as ``{"body", "etag", "token"}``, rendered
+    once per feed version.
+    """
+    version = worker_feed_version(worker.pk)
+    # UIDs and links carry the host the feed was requested from
+    host = urlsplit(absolute_uri("/")).netloc
+    key = f"worker-feed:{worker.pk}:{version}:{host}"
+    feed = cache.get(key)
+    if feed is None:
+        now = timezone.now()
+        token = make_sync_token(version, now)
+        body = _render(
+            worker,
+            (
+                task_event(task, absolute_uri, now)
+                for task in _assigned_tasks(worker).iterator()
+            ),
+            token,
+        )
+        feed = {
+            "body": body,
+            "etag": '"%s"' % hashlib.md5(body.encode()).hexdigest(),
+            "token": token,
+        }
+        cache.set(key, feed, settings.WORKER_FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def worker_feed_changes(
+        worker: Worker, token: str, absolute_uri: Callable[[str], str]
+) -> tuple[str, str]:
+    """
+    ``(calendar, next token)`` with the events changed since ``token``:
+    tasks that are assigned now, and cancellations for the ones that
+    were unassigned or deleted. Raises ``BadSignature`` for bad tokens.
+    """
+    version, since = read_sync_token(token)
+    current = worker_feed_version(worker.pk)
+    now = timezone.now()
+    next_token = make_sync_token(current, now)
+    if version == current:
+        # nothing was recorded for this worker since the token was made
+        return _render(worker, [], next_token), next_token
+
+    changed = set(
+        TaskEvent.objects.filter(
+            # no join on the task, deleted tasks have events too
+            Q(task_id__in=worker.tasks.values("pk"))
+            | Q(kind=TaskEvent.Kind.ASSIGNED, new_value=str(worker.pk))
+            | Q(kind=TaskEvent.Kind.UNASSIGNED, old_value=str(worker.pk)),
+            created_at__gt=since,
+        )
+        .order_by()
+        .values_list("task_id", flat=True)
+        .distinct()
+    )
+    tasks = list(_assigned_tasks(worker).filter(pk__in=changed))
+    removed = changed - {task.pk for task in tasks}
+    events = [task_event(task, absolute_uri, now) for task in tasks] + [
+        cancelled_event("task", pk, absolute_uri, now)
+        for pk in sorted(removed)
+    ]
+    return _render(worker, events, next_token), next_token
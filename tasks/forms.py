@@ -3,8 +3,178 @@ from typing import Any
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.urls import reverse_lazy
+from django_select2.forms import (
+    HeavySelect2Widget,
+    HeavySelect2MultipleWidget,
+)
 
 from tasks.models import Task, TaskType, Worker, Position, Team, Project
+from tasks.pagination import PAGE_SIZE_CHOICES
+from tasks.services import sync_team_members
+
+
+class AutocompleteWidgetMixin:
+    """
+    Select2 picker fed by one of our paged autocomplete endpoints.
+
+    Only the selected objects are rendered as options, so the page never
+    materializes the full choice list.
+    """
+
+    def __init__(self, *args, **kwargs):
+        attrs = {"data-minimum-input-length": 0, **kwargs.pop("attrs", {})}
+        kwargs.setdefault("data_url", "#")
+        super().__init__(*args, attrs=attrs, **kwargs)
+
+    def set_to_cache(self):
+        # results are served by our own views, nothing to share via cache
+        pass
+
+    def optgroups(self, name, value, attrs=None):
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, "", "", False, 0))
+        selected = [pk for pk in value if pk]
+        if selected:
+            field = self.choices.field
+            for obj in self.choices.queryset.filter(pk__in=selected):
+                options.append(
+                    self.create_option(
+                        name,
+                        obj.pk,
+                        field.label_from_instance(obj),
+                        True,
+                        len(options),
+                    )
+                )
+        return [(None, options, 0)]
+
+
+class AutocompleteSelectWidget(AutocompleteWidgetMixin, HeavySelect2Widget):
+    pass
+
+
+class AutocompleteSelectMultipleWidget(
+    AutocompleteWidgetMixin, HeavySelect2MultipleWidget
+):
+    pass
+
+
+class RemoteChoiceFieldMixin:
+    """
+    Model choice field whose options come from ``tasks:autocomplete``.
+
+    Submitted ids are validated with a single ``pk``/``pk__in`` query
+    against ``queryset``, restricted to the ``only`` columns.
+    """
+
+    only = ("id", "name")
+
+    def __init__(self, queryset, source: str, **kwargs):
+        super().__init__(queryset, **kwargs)
+        self.widget.data_url = self.get_data_url(source)
+
+    def get_data_url(self, source: str):
+        return reverse_lazy("tasks:autocomplete", kwargs={"source": source})
+
+    def _set_queryset(self, queryset):
+        super()._set_queryset(
+            None if queryset is None else queryset.only(*self.only)
+        )
+
+    queryset = property(
+        forms.ModelChoiceField._get_queryset, _set_queryset
+    )
+
+
+class RemoteModelChoiceField(RemoteChoiceFieldMixin, forms.ModelChoiceField):
+    widget = AutocompleteSelectWidget
+
+
+class RemoteModelMultipleChoiceField(
+    RemoteChoiceFieldMixin, forms.ModelMultipleChoiceField
+):
+    widget = AutocompleteSelectMultipleWidget
+
+
+class BlockerChoiceField(RemoteModelMultipleChoiceField):
+    # Task.clean() compares the blockers' projects
+    only = ("id", "name", "project_id")
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("label", "Blocked by:")
+        super().__init__(Task.objects.all(), "tasks", **kwargs)
+
+
+class ParentChoiceField(RemoteModelChoiceField):
+    # Task.clean() compares the parent's project
+    only = ("id", "name", "project_id")
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("label", "Parent task:")
+        super().__init__(Task.objects.all(), "tasks", **kwargs)
+
+
+class TaskDependencyFormMixin:
+    """Hands the chosen blockers to ``Task.clean()`` for the cycle check."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if "blocked_by" in cleaned_data:
+            self.instance.pending_blocked_by = cleaned_data["blocked_by"]
+        return cleaned_data
+
+
+class TaskParentFormMixin:
+    """Subtasks left without a project get their parent's."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["project"].help_text = (
+            "Subtasks belong to their parent task's project."
+        )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        parent = cleaned_data.get("parent")
+        if parent is not None and cleaned_data.get("project") is None:
+            cleaned_data["project"] = Project.objects.filter(
+                pk=parent.project_id
+            ).first()
+        return cleaned_data
+
+
+def worker_label(worker: Worker) -> str:
+    """Label that only needs the columns of ``assignee_queryset()``."""
+    return worker.full_name or worker.username
+
+
+def assignee_queryset(queryset=None):
+    queryset = Worker.objects.all() if queryset is None else queryset
+    return queryset.only("id", "username", "full_name")
+
+
+class WorkerChoiceMixin:
+    only = ("id", "username", "full_name")
+
+    def __init__(self, queryset=None, source="workers", **kwargs):
+        queryset = Worker.objects.all() if queryset is None else queryset
+        super().__init__(queryset, source, **kwargs)
+
+    def get_data_url(self, source: str):
+        return reverse_lazy("tasks:worker-autocomplete")
+
+    def label_from_instance(self, obj):
+        return worker_label(obj)
+
+
+class WorkerChoiceField(WorkerChoiceMixin, RemoteModelChoiceField):
+    pass
+
+
+class AssigneeChoiceField(WorkerChoiceMixin, RemoteModelMultipleChoiceField):
+    pass
 
 
 class TaskSearchForm(forms.Form):
@@ -16,7 +186,16 @@ class TaskSearchForm(forms.Form):
     )
 
 
-class TaskCreateForm(forms.ModelForm):
+class TaskCreateForm(
+        TaskParentFormMixin, TaskDependencyFormMixin, forms.ModelForm
+):
+    type = RemoteModelChoiceField(TaskType.objects.all(), "task-types")
+    project = RemoteModelChoiceField(
+        Project.objects.all(), "projects", required=False
+    )
+    parent = ParentChoiceField(required=False)
+    blocked_by = BlockerChoiceField(required=False)
+
     class Meta:
         model = Task
         fields = (
@@ -25,6 +204,8 @@ class TaskCreateForm(forms.ModelForm):
             "deadline",
             "type",
             "project",
+            "parent",
+            "blocked_by",
             "description",
         )
         labels = {
@@ -45,12 +226,10 @@ class TaskCreateForm(forms.ModelForm):
         }
 
 
-# Python
 class TaskAssignForm(forms.ModelForm):
-    assignees = forms.ModelMultipleChoiceField(
+    assignees = AssigneeChoiceField(
         queryset=Worker.objects.none(),
         label="Assignees:",
-        widget=forms.CheckboxSelectMultiple(),
         required=False,
     )
 
@@ -63,14 +242,44 @@ class TaskAssignForm(forms.ModelForm):
             *args: Any,
             **kwargs: dict[str, Any]
     ) -> None:
-        queryset = kwargs.pop("assignees_queryset", None)
+        self.eligible_ids = kwargs.pop("eligible_ids", None)
         super().__init__(*args, **kwargs)
-        self.fields["assignees"].queryset = (
-            queryset if queryset is not None else Worker.objects.all()
-        )
-
+        assignees = self.fields["assignees"]
+        assignees.queryset = assignee_queryset()
+        if self.instance.pk:
+            assignees.widget.data_url = "{}?task={}".format(
+                reverse_lazy("tasks:worker-autocomplete"), self.instance.pk
+            )
+
+    def clean_assignees(self):
+        assignees = self.cleaned_data["assignees"]
+        if self.eligible_ids is not None:
+            outsiders = [
+                worker for worker in assignees
+                if worker.pk not in self.eligible_ids
+            ]
+            if outsiders:
+                raise forms.ValidationError(
+                    "%(workers)s cannot be assigned to this task.",
+                    code="not_eligible",
+                    params={
+                        "workers": ", ".join(map(worker_label, outsiders))
+                    },
+                )
+        return assignees
+
+
+class TaskUpdateForm(
+        TaskParentFormMixin, TaskDependencyFormMixin, forms.ModelForm
+):
+    type = RemoteModelChoiceField(TaskType.objects.all(), "task-types")
+    project = RemoteModelChoiceField(
+        Project.objects.all(), "projects", required=False
+    )
+    parent = ParentChoiceField(required=False)
+    blocked_by = BlockerChoiceField(required=False)
+    assignees = AssigneeChoiceField(required=False)
 
-class TaskUpdateForm(forms.ModelForm):
     class Meta:
         model = Task
         fields = (
@@ -80,6 +289,8 @@ class TaskUpdateForm(forms.ModelForm):
             "deadline",
             "type",
             "project",
+            "parent",
+            "blocked_by",
             "description",
             "assignees",
         )
@@ -98,7 +309,6 @@ class TaskUpdateForm(forms.ModelForm):
             "description": forms.Textarea(
                 attrs={"placeholder": "Description"}
             ),
-            "assignees": forms.CheckboxSelectMultiple,
         }
 
 
@@ -201,6 +411,29 @@ class WorkerUpdateForm(UserChangeForm):
         )
 
 
+class ListPreferencesForm(forms.ModelForm):
+    page_size = forms.TypedChoiceField(
+        choices=[("", "Default")] + [(n, n) for n in PAGE_SIZE_CHOICES],
+        coerce=int,
+        empty_value=None,
+        required=False,
+        label="Per page",
+        widget=forms.Select(
+            attrs={"class": "form-select form-select-sm w-auto"}
+        ),
+    )
+
+    class Meta:
+        model = get_user_model()
+        fields = ("page_size", "infinite_scroll")
+        labels = {"infinite_scroll": "Infinite scroll"}
+        widgets = {
+            "infinite_scroll": forms.CheckboxInput(
+                attrs={"class": "form-check-input"}
+            ),
+        }
+
+
 class PositionSearchForm(forms.Form):
     name = forms.CharField(
         max_length=100,
@@ -232,7 +465,20 @@ class TeamSearchForm(forms.Form):
     )
 
 
-class TeamCreateForm(forms.ModelForm):
+class TeamMembersFormMixin:
+    """Save ``workers`` as a diff against the current membership."""
+
+    def _save_m2m(self):
+        sync_team_members(
+            self.instance,
+            self.cleaned_data["workers"].values_list("pk", flat=True),
+        )
+
+
+class TeamCreateForm(TeamMembersFormMixin, forms.ModelForm):
+    workers = AssigneeChoiceField(required=False)
+    leader = WorkerChoiceField(required=False)
+
     class Meta:
         model = Team
         fields = ("name", "workers", "leader")
@@ -241,17 +487,16 @@ class TeamCreateForm(forms.ModelForm):
         }
         widgets = {
             "name": forms.TextInput(attrs={"placeholder": "Name*"}),
-            "workers": forms.CheckboxSelectMultiple(),
         }
 
 
-class TeamUpdateForm(forms.ModelForm):
+class TeamUpdateForm(TeamMembersFormMixin, forms.ModelForm):
+    workers = AssigneeChoiceField(required=False)
+    leader = WorkerChoiceField(required=False)
+
     class Meta:
         model = Team
         fields = ("name", "workers", "leader")
-        widgets = {
-            "workers": forms.CheckboxSelectMultiple(),
-        }
 
 
 class ProjectSearchForm(forms.Form):
@@ -264,6 +509,11 @@ class ProjectSearchForm(forms.Form):
 
 
 class ProjectCreateForm(forms.ModelForm):
+    leader = WorkerChoiceField(required=False)
+    team = RemoteModelChoiceField(
+        Team.objects.all(), "teams", required=False
+    )
+
     class Meta:
         model = Project
         fields = ("name", "description", "deadline", "leader", "team")
@@ -286,6 +536,11 @@ class ProjectCreateForm(forms.ModelForm):
 
 
 class ProjectUpdateForm(forms.ModelForm):
+    leader = WorkerChoiceField(required=False)
+    team = RemoteModelChoiceField(
+        Team.objects.all(), "teams", required=False
+    )
+
     class Meta:
         model = Project
         fields = (
@@ -0,0 +1,133 @@
+"""
+Subtask hierarchy on top of the ``TaskClosure`` table.
+
+Every task has a closure row for each of its ancestors, so a subtree,
+the ancestors of a task or the completion of everything below it are
+single indexed queries instead of one query per level. Linking and
+unlinking a subtree are one statement each.
+
+Completion rolls up: a task whose subtasks are all completed is
+completed as well, reopening a subtask reopens its completed ancestors.
+"""
+
+from collections.abc import Iterable
+
+from django.db import connection
+from django.db.models import Count, F, Q, QuerySet
+
+from tasks.events import record
+from tasks.models import Task, TaskClosure, TaskEvent
+
+
+def _table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def link_subtree(task_id: int, parent_id: int) -> None:
+    """
+    Hang the task and its subtasks below ``parent_id``: every ancestor
+    of the parent (and the parent itself) becomes an ancestor of every
+    task of the subtree, one ``INSERT ... SELECT``.
+    """
+    closure = _table(TaskClosure)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {closure} (ancestor_id, descendant_id, depth) "
+            "SELECT up.ancestor_id, down.descendant_id, "
+            "up.depth + down.depth + 1 "
+            "FROM ("
+            f"SELECT ancestor_id, depth FROM {closure} "
+            "WHERE descendant_id = %s UNION ALL SELECT %s, 0"
+            ") up CROSS JOIN ("
+            f"SELECT descendant_id, depth FROM {closure} "
+            "WHERE ancestor_id = %s UNION ALL SELECT %s, 0"
+            ") down",
+            [parent_id, parent_id, task_id, task_id],
+        )
+
+
+def unlink_subtree(task_id: int) -> None:
+    """Detach the task and its subtasks from all of the task's ancestors."""
+    subtree = Q(descendant_id=task_id) | Q(
+        descendant__in=TaskClosure.objects.filter(
+            ancestor_id=task_id
+        ).values("descendant")
+    )
+    TaskClosure.objects.filter(subtree).exclude(
+        # links inside the subtree stay
+        ancestor__in=TaskClosure.objects.filter(
+            ancestor_id=task_id
+        ).values("descendant")
+    ).exclude(ancestor_id=task_id).delete()
+
+
+def subtasks(task: Task) -> QuerySet:
+    """All tasks below ``task``, annotated with their ``depth``."""
+    return Task.objects.filter(ancestor_links__ancestor=task).annotate(
+        depth=F("ancestor_links__depth")
+    )
+
+
+def subtask_counts(task_ids: Iterable[int]) -> dict[int, dict]:
+    """
+    ``{task_id: {"total": ..., "completed": ...}}`` of all subtasks at
+    any depth, in one grouped query. Tasks without subtasks are left out.
+    """
+    rows = (
+        TaskClosure.objects.filter(ancestor_id__in=task_ids)
+        .values("ancestor_id")
+        .annotate(
+            total=Count("pk"),
+            completed=Count("pk", filter=Q(descendant__is_completed=True)),
+        )
+        .order_by()
+    )
+    return {
+        row["ancestor_id"]: {
+            "total": row["total"],
+            "completed": row["completed"],
+        }
+        for row in rows
+    }
+
+
+def roll_up_completion(task_id: int, is_completed: bool) -> list[int]:
+    """
+    Bring the ancestors of ``task_id`` in line with its completion, in
+    one ``UPDATE ... RETURNING``, and record their events. Returns the
+    ids of the ancestors that changed.
+
+    Completed, an ancestor is completed once all of its subtasks are.
+    The ancestors between it and ``task_id`` don't count, they are
+    completed by the same statement when their own subtasks are done.
+    Reopened, every completed ancestor is reopened.
+    """
+    task, closure = _table(Task), _table(TaskClosure)
+    ancestors = f"SELECT ancestor_id FROM {closure} WHERE descendant_id = %s"
+    with connection.cursor() as cursor:
+        if is_completed:
+            cursor.execute(
+                f"UPDATE {task} SET is_completed = %s "
+                f"WHERE NOT is_completed AND id IN ({ancestors}) "
+                "AND NOT EXISTS ("
+                f"SELECT 1 FROM {closure} below "
+                f"JOIN {task} sub ON sub.id = below.descendant_id "
+                f"WHERE below.ancestor_id = {task}.id "
+                f"AND NOT sub.is_completed AND sub.id NOT IN ({ancestors})"
+                ") RETURNING id",
+                [True, task_id, task_id],
+            )
+        else:
+            cursor.execute(
+                f"UPDATE {task} SET is_completed = %s "
+                f"WHERE is_completed AND id IN ({ancestors}) RETURNING id",
+                [False, task_id],
+            )
+        changed = [row[0] for row in cursor.fetchall()]
+    for pk in changed:
+        record(
+            pk,
+            TaskEvent.Kind.COMPLETED if is_completed
+            else TaskEvent.Kind.REOPENED,
+        )
+    return changed
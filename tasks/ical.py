@@ -0,0 +1,140 @@
+"""
+Minimal iCalendar (RFC 5545) writer for the deadline feeds.
+
+Events are lists of ``(property, value)`` pairs, values are escaped and
+lines folded here, so the feed can be streamed one event at a time.
+"""
+
+import datetime
+from collections.abc import Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+
+PRODID = "-//Task Manager//Deadlines//EN"
+LINE_OCTETS = 75
+
+# Task.Priority -> iCalendar PRIORITY (1 highest, 9 lowest)
+PRIORITIES = {"URGENT": 1, "HIGH": 3, "MEDIUM": 5, "LOW": 9}
+
+
+def escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line into CRLF terminated lines of 75 octets."""
+    encoded = line.encode()
+    chunks = []
+    limit = LINE_OCTETS
+    while len(encoded) > limit:
+        cut = limit
+        # never split a multi-byte character
+        while encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut])
+        encoded = encoded[cut:]
+        # continuation lines start with a space
+        limit = LINE_OCTETS - 1
+    chunks.append(encoded)
+    return b"\r\n ".join(chunks).decode() + "\r\n"
+
+
+def format_datetime(value: datetime.datetime) -> str:
+    utc = value.astimezone(datetime.timezone.utc)
+    return utc.strftime("%Y%m%dT%H%M%SZ")
+
+
+def format_date(value: datetime.date) -> str:
+    return value.strftime("%Y%m%d")
+
+
+def _uid(kind: str, pk: int, absolute_uri: Callable[[str], str]) -> str:
+    return f"{kind}-{pk}@{urlsplit(absolute_uri('/')).hostname}"
+
+
+def task_event(
+        task,
+        absolute_uri: Callable[[str], str],
+        stamp: datetime.datetime,
+) -> list:
+    """
+    The deadline of ``task`` as a zero-length event, ``task.type`` has
+    to be loaded along with it. ``absolute_uri`` is usually
+    ``request.build_absolute_uri``.
+    """
+    summary = task.name if not task.is_completed else f"✓ {task.name}"
+    event = [
+        ("UID", _uid("task", task.pk, absolute_uri)),
+        ("DTSTAMP", format_datetime(stamp)),
+        ("DTSTART", format_datetime(task.deadline)),
+        ("SUMMARY", escape(summary)),
+        ("CATEGORIES", escape(str(task.type))),
+        ("PRIORITY", str(PRIORITIES.get(task.priority, 0))),
+        ("URL", absolute_uri(task.get_absolute_url())),
+    ]
+    if task.description:
+        event.append(("DESCRIPTION", escape(task.description)))
+    return event
+
+
+def project_event(
+        project,
+        absolute_uri: Callable[[str], str],
+        stamp: datetime.datetime,
+) -> list:
+    """The deadline of ``project`` as an all-day event."""
+    return [
+        ("UID", _uid("project", project.pk, absolute_uri)),
+        ("DTSTAMP", format_datetime(stamp)),
+        ("DTSTART;VALUE=DATE", format_date(project.deadline)),
+        ("SUMMARY", escape(f"Project deadline: {project.name}")),
+        ("URL", absolute_uri(project.get_absolute_url())),
+    ]
+
+
+def cancelled_event(
+        kind: str,
+        pk: int,
+        absolute_uri: Callable[[str], str],
+        stamp: datetime.datetime,
+) -> list:
+    """Tells a syncing client to drop the event it got for ``pk``."""
+    return [
+        ("UID", _uid(kind, pk, absolute_uri)),
+        ("DTSTAMP", format_datetime(stamp)),
+        ("DTSTART", format_datetime(stamp)),
+        ("STATUS", "CANCELLED"),
+    ]
+
+
+def stream_calendar(
+        events: Iterable[list],
+        name: str,
+        properties: Iterable[tuple[str, str]] = (),
+) -> Iterator[str]:
+    """
+    Yield the calendar piece by piece, one chunk per event.
+    ``properties`` are extra calendar properties for the header.
+    """
+    yield "".join(
+        fold(line) for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{escape(name)}",
+            *(f"{key}:{value}" for key, value in properties),
+        )
+    )
+    for event in events:
+        yield "".join(
+            [fold("BEGIN:VEVENT")]
+            + [fold(f"{key}:{value}") for key, value in event]
+            + [fold("END:VEVENT")]
+        )
+    yield fold("END:VCALENDAR")
@@ -0,0 +1,230 @@
+"""
+Live task updates for the server-sent events stream.
+
+Compact updates (completion, assignment, new tasks) are published from
+the task event signal, in whatever thread recorded them, and fanned out
+to the async SSE streams through a broker. ``LocalBroker`` only reaches
+streams served by the same process. With ``REDIS_URL`` set updates go
+through Redis pub/sub instead, so streams served by an ASGI process also
+see the changes made in the WSGI workers.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing, asynccontextmanager
+from functools import cache
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from tasks.models import TaskEvent
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+
+# event log kinds that are pushed to the lists
+LIVE_KINDS = {
+    TaskEvent.Kind.CREATED: "created",
+    TaskEvent.Kind.COMPLETED: "completed",
+    TaskEvent.Kind.REOPENED: "reopened",
+    TaskEvent.Kind.ASSIGNED: "assigned",
+    TaskEvent.Kind.UNASSIGNED: "unassigned",
+}
+# sent instead of the updates a slow stream could not keep up with
+RESYNC = {"kind": "resync"}
+
+
+class _Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+
+    def offer(self, updates: list[dict]) -> None:
+        """Queue ``updates``, runs in the subscriber's event loop."""
+        for update in updates:
+            try:
+                self.queue.put_nowait(update)
+            except asyncio.QueueFull:
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(RESYNC)
+                return
+
+
+class LocalBroker:
+    """Fan-out to the streams of this process, thread safe."""
+
+    queue_size = 100
+
+    def __init__(self) -> None:
+        self._subscriptions: set[_Subscription] = set()
+        self._lock = threading.Lock()
+
+    def _deliver(self, updates: list[dict]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.offer, updates
+                )
+            except RuntimeError:  # the loop is gone
+                with self._lock:
+                    self._subscriptions.discard(subscription)
+
+    def publish(self, updates: list[dict]) -> None:
+        if updates:
+            self._deliver(updates)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        subscription = _Subscription(
+            asyncio.get_running_loop(), self.queue_size
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription.queue
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes to a Redis channel. Each process keeps one listener on it
+    (started with its first stream) that hands updates to its streams.
+    """
+
+    channel = "tasks:live-updates"
+
+    def __init__(self, url: str) -> None:
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._listener: asyncio.Task | None = None
+
+    def publish(self, updates: list[dict]) -> None:
+        if not updates:
+            return
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        try:
+            self._client.publish(self.channel, json.dumps(updates))
+        except redis.RedisError:
+            # live updates are best effort, never fail the request
+            logger.warning("Could not publish task updates", exc_info=True)
+
+    async def _listen(self) -> None:
+        import redis.asyncio
+
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub(
+                        ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        self._deliver(json.loads(message["data"]))
+            except (redis.RedisError, OSError):
+                logger.warning(
+                    "Task updates listener lost Redis", exc_info=True
+                )
+            finally:
+                await client.aclose()
+            # streams may have missed updates meanwhile
+            self._deliver([RESYNC])
+            await asyncio.sleep(1)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe() as queue:
+            yield queue
+
+
+@cache
+def get_broker() -> LocalBroker:
+    redis_url = getattr(settings, "REDIS_URL", None)
+    return RedisBroker(redis_url) if redis_url else LocalBroker()
+
+
+def task_updates(
+        events: Iterable[TaskEvent], tasks: dict[int, tuple]
+) -> list[dict]:
+    """
+    Compact updates for ``events``. ``tasks`` maps task ids to their
+    ``(project_id, team_id)``, events of tasks missing from it (deleted
+    ones) are left out.
+    """
+    updates = []
+    for event in events:
+        kind = LIVE_KINDS.get(event.kind)
+        if kind is None or event.task_id not in tasks:
+            continue
+        project_id, team_id = tasks[event.task_id]
+        update = {
+            "id": event.task_id,
+            "kind": kind,
+            "project": project_id,
+            "team": team_id,
+        }
+        if event.field == "assignees":
+            update["worker"] = int(event.new_value or event.old_value)
+        updates.append(update)
+    return updates
+
+
+def _matches(update: dict, projects: set[int], teams: set[int]) -> bool:
+    if update["kind"] == RESYNC["kind"] or not (projects or teams):
+        return True
+    return update["project"] in projects or update["team"] in teams
+
+
+async def event_stream(
+        projects: set[int], teams: set[int]
+) -> AsyncIterator[str]:
+    """
+    Server-sent events with the updates of ``projects`` or ``teams``
+    (all of them when both are empty), and a comment now and then to
+    keep proxies from closing the connection.
+    """
+    async with get_broker().subscribe() as queue:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                update = await asyncio.wait_for(
+                    queue.get(), KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if _matches(update, projects, teams):
+                yield f"event: task\ndata: {json.dumps(update)}\n\n"
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    """
+    Streams ``stream`` and closes it once the server stops reading.
+
+    Django only closes its own wrappers around the content, the stream
+    and its broker subscription would be left to the garbage collector.
+    """
+
+    def __init__(self, stream: AsyncIterator[str], **kwargs) -> None:
+        super().__init__(stream, content_type="text/event-stream", **kwargs)
+        self.stream = stream
+
+    async def __aiter__(self):
+        async with aclosing(self.stream):
+            async for part in super().__aiter__():
+                yield part
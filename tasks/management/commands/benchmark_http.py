@@ -0,0 +1,76 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+import requests
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _session_cookie(username: str) -> dict[str, str]:
+    """Log ``username`` in the way ``Client.force_login`` does."""
+    user = get_user_model().objects.filter(username=username).first()
+    if user is None:
+        raise CommandError(f"Unknown user {username!r}.")
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return {settings.SESSION_COOKIE_NAME: session.session_key}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a page of a running server (e.g. gunicorn with "
+        "gunicorn.conf.py) and report throughput and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url",
+            nargs="?",
+            default="http://127.0.0.1:8000/tasks/",
+            help="Page to load, defaults to the local task list.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username to load the page as, the server has to share "
+                 "the session store (database or REDIS_URL).",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=8)
+
+    def handle(self, *args, **options):
+        cookies = _session_cookie(options["user"]) if options["user"] else {}
+        http = requests.Session()
+        http.cookies.update(cookies)
+
+        def timed_get(_):
+            start = time.perf_counter()
+            response = http.get(options["url"], allow_redirects=False)
+            return response.status_code, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            results = list(pool.map(timed_get, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        statuses = sorted({status for status, _ in results})
+        latencies = sorted(seconds * 1000 for _, seconds in results)
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{len(results)} requests in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.0f} req/s), status {statuses}"
+        )
+        self.stdout.write(
+            f"p50 {quantiles[49]:.1f} ms, p95 {quantiles[94]:.1f} ms, "
+            f"p99 {quantiles[98]:.1f} ms, max {latencies[-1]:.1f} ms"
+        )
@@ -0,0 +1,63 @@
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+PAGE = b"<html><body>" + b"<p>row</p>" * 500 + b"</body></html>"
+
+
+def _view(request):
+    return HttpResponse(PAGE)
+
+
+def _build_chain(paths):
+    handler = _view
+    for path in reversed(paths):
+        handler = import_string(path)(handler)
+    return handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request overhead of the configured middleware stack, compared "
+        "with the same stack without DEV_MIDDLEWARE, and per middleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        factory = RequestFactory(
+            SERVER_NAME=hosts[0] if hosts else "localhost"
+        )
+        dev_only = getattr(settings, "DEV_MIDDLEWARE", [])
+
+        def per_request(paths):
+            chain = _build_chain(paths)
+            seconds = timeit.timeit(
+                lambda: chain(
+                    factory.get("/", headers={"accept-encoding": "br"})
+                ),
+                number=count,
+            )
+            return seconds / count * 1_000_000
+
+        baseline = per_request([])
+        configured = per_request(settings.MIDDLEWARE)
+        lean = per_request(
+            [path for path in settings.MIDDLEWARE if path not in dev_only]
+        )
+        self.stdout.write(f"no middleware: {baseline:.1f} us/request")
+        self.stdout.write(f"configured: {configured:.1f} us/request")
+        self.stdout.write(f"without dev middleware: {lean:.1f} us/request")
+
+        previous = baseline
+        for index, path in enumerate(settings.MIDDLEWARE, start=1):
+            current = per_request(settings.MIDDLEWARE[:index])
+            self.stdout.write(f"  +{current - previous:7.1f} us  {path}")
+            previous = current
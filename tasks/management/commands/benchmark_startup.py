@@ -0,0 +1,66 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+IMPORT_WSGI = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import task_manager_site.wsgi\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+# prod settings read these at import time, no connection is opened
+PLACEHOLDER_ENV = {
+    "POSTGRES_DB": "benchmark",
+    "POSTGRES_USER": "benchmark",
+    "POSTGRES_PASSWORD": "benchmark",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB_PORT": "5432",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the import time of task_manager_site.wsgi (Django setup "
+        "included) in fresh interpreters, per settings module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "settings_modules",
+            nargs="*",
+            default=[
+                "task_manager_site.settings.dev",
+                "task_manager_site.settings.prod",
+            ],
+        )
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for module in options["settings_modules"]:
+            env = {
+                **PLACEHOLDER_ENV,
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": module,
+            }
+            timings = [
+                float(
+                    subprocess.run(
+                        [sys.executable, "-c", IMPORT_WSGI],
+                        env=env,
+                        cwd=settings.BASE_DIR,
+                        capture_output=True,
+                        text=True,
+                        check=True,
+                    ).stdout
+                )
+                for _ in range(options["runs"])
+            ]
+            self.stdout.write(
+                f"{module}: median {statistics.median(timings) * 1000:.0f} ms,"
+                f" min {min(timings) * 1000:.0f} ms"
+            )
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from tasks.assets import build_assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the static files the templates reference to ASSET_BUILD_DIR, "
+        "bundle and minify the theme CSS/JS and write WebP/AVIF variants "
+        "of large images. Run before collectstatic."
+    )
+
+    def handle(self, *args, **options):
+        template_dirs = [
+            directory
+            for engine in engines.all()
+            for directory in engine.template_dirs
+        ]
+        summary = build_assets(
+            settings.ASSET_SOURCE_DIR, settings.ASSET_BUILD_DIR, template_dirs
+        )
+
+        self.stdout.write(
+            f"copied {summary['files']} files ({summary['bytes']} bytes)"
+        )
+        for name, (before, after) in summary["bundles"].items():
+            self.stdout.write(f"bundle {name}: {before} -> {after} bytes")
+        for path, (before, variants) in summary["images"].items():
+            sizes = ", ".join(
+                f"{fmt} {size}" for fmt, size in variants.items()
+            )
+            self.stdout.write(f"image {path}: {before} bytes -> {sizes}")
@@ -0,0 +1,96 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from tasks.middleware import BROTLI_QUALITY, brotli
+
+DEFAULT_PAGES = (
+    "tasks:index",
+    "tasks:task-list",
+    "tasks:project-list",
+    "tasks:team-list",
+    "tasks:worker-list",
+)
+
+
+def _sizes(content: bytes) -> tuple[int, int, int | None]:
+    return (
+        len(content),
+        len(gzip.compress(content, compresslevel=6)),
+        len(brotli.compress(content, quality=BROTLI_QUALITY))
+        if brotli else None,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Report bytes saved by compression: per rendered page, and for "
+        "the precompressed files written by collectstatic (--static)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Pages to render, defaults to the main list pages.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username to render the pages as (they need a login).",
+        )
+        parser.add_argument(
+            "--static",
+            action="store_true",
+            help="Summarize the .gz/.br files in STATIC_ROOT instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options["static"]:
+            self.report_static()
+        else:
+            self.report_pages(
+                options["paths"] or [reverse(name) for name in DEFAULT_PAGES],
+                options["user"],
+            )
+
+    def report_pages(self, paths, username):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+        if username:
+            user = get_user_model().objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"Unknown user {username!r}.")
+            client.force_login(user)
+
+        for path in paths:
+            response = client.get(path)
+            raw, gzipped, brotlied = _sizes(response.content)
+            best = min(gzipped, brotlied or gzipped)
+            self.stdout.write(
+                f"{path} [{response.status_code}]: {raw} bytes, "
+                f"gzip {gzipped}, br {brotlied or '-'}, "
+                f"saved {raw - best} ({100 * (raw - best) // max(raw, 1)}%)"
+            )
+
+    def report_static(self):
+        root = Path(settings.STATIC_ROOT)
+        raw = {"gz": 0, "br": 0}
+        compressed = {"gz": 0, "br": 0}
+        for path in root.rglob("*"):
+            suffix = path.suffix.lstrip(".")
+            if suffix not in raw:
+                continue
+            original = path.with_suffix("")
+            if original.is_file():
+                raw[suffix] += original.stat().st_size
+                compressed[suffix] += path.stat().st_size
+        for suffix in ("gz", "br"):
+            self.stdout.write(
+                f"{suffix}: {raw[suffix]} -> {compressed[suffix]} bytes, "
+                f"saved {raw[suffix] - compressed[suffix]}"
+            )
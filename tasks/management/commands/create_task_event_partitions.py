@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tasks.partitions import create_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create monthly partitions of the task event log on PostgreSQL. "
+        "Run ahead of time (e.g. monthly from cron) so new events never "
+        "land in the default partition, events already there are moved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=3,
+            help="Number of months to prepare, starting with the current one.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write("Partitioning is only supported on PostgreSQL.")
+            return
+
+        for partition in create_partitions(connection, options["months"]):
+            line = "{name}: {start} - {end}".format(**partition)
+            if partition["moved"]:
+                line += f", moved {partition['moved']} events"
+            self.stdout.write(line)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from tasks.recurrence import MATERIALIZE_DAYS, materialize
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the tasks of the recurring task templates that are due "
+        "within the next days. Safe to re-run, intended for a daily cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=MATERIALIZE_DAYS,
+            help=f"How far ahead to create tasks, {MATERIALIZE_DAYS} days "
+                 f"by default.",
+        )
+
+    def handle(self, *args, **options):
+        report = materialize(days=options["days"])
+        self.stdout.write(
+            f"{report['tasks']} tasks, {report['assignments']} assignments "
+            f"in {report['seconds']:.2f} s"
+        )
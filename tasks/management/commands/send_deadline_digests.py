@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from tasks.digests import DIGEST_DAYS, send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Email every worker the open tasks that are overdue or due within "
+        "the next days. Intended to be run daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DIGEST_DAYS,
+            help=f"How far ahead to look, {DIGEST_DAYS} days by default.",
+        )
+
+    def handle(self, *args, **options):
+        report = send_digests(days=options["days"])
+        self.stdout.write(
+            f"{report['workers']} workers, {report['tasks']} tasks in "
+            f"{report['seconds']:.2f} s "
+            f"({report['workers_per_second']:.0f} workers/s)"
+        )
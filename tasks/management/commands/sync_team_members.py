@@ -0,0 +1,57 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.services import sync_team_memberships
+
+
+def _rows(reader: csv.DictReader):
+    """``(team, username)`` pairs, incomplete rows stop the sync."""
+    for row in reader:
+        team, username = row["team"], row["username"]
+        if team is None or username is None:
+            raise CommandError(
+                f"Line {reader.line_num}: expected 'team' and 'username' "
+                "values, nothing was changed."
+            )
+        yield team, username
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync team membership from an HR export CSV with 'team' and "
+        "'username' columns. Teams in the file get exactly the listed "
+        "members, other teams are left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the CSV export.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the changes without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                if not {"team", "username"} <= set(reader.fieldnames or ()):
+                    raise CommandError(
+                        "Export must have 'team' and 'username' columns."
+                    )
+                result = sync_team_memberships(
+                    _rows(reader), dry_run=options["dry_run"]
+                )
+        except OSError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            "teams: {teams}, added: {added}, removed: {removed}".format(
+                **result
+            )
+        )
+        for name in result["unknown_teams"]:
+            self.stderr.write(f"unknown team: {name}")
+        for username in result["unknown_workers"]:
+            self.stderr.write(f"unknown worker: {username}")
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from tasks.snapshots import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Append today's open/completed/overdue task counters per project, "
+        "team and task type. Intended to be run daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            default=None,
+            help="Snapshot date label (YYYY-MM-DD), defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        written = take_snapshots(options["date"])
+        for name, count in written.items():
+            self.stdout.write(f"{name}: {count} rows")
@@ -0,0 +1,137 @@
+import logging
+import re
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from tasks.events import event_scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+logger = logging.getLogger("tasks.compression")
+
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "text/calendar",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+BROTLI_QUALITY = 5
+MIN_COMPRESS_LENGTH = 200
+
+re_accepts_brotli = re.compile(r"\bbr\b")
+
+
+class TaskEventMiddleware:
+    """
+    Collect task events of a request and write them in one batch. Events
+    of atomic blocks that rolled back are left out, whatever the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, "user", None)
+        actor_id = user.pk if user and user.is_authenticated else None
+        with event_scope(actor_id):
+            response = self.get_response(request)
+        return response
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        # flush every chunk so streamed pages still arrive incrementally
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Brotli or gzip for dynamic responses, whichever the client prefers.
+
+    Static files never get here, WhiteNoise serves their precompressed
+    variants. Only textual content types are compressed, and event
+    streams are left alone. Streaming responses are compressed chunk by
+    chunk. Bytes saved per page are logged to ``tasks.compression``.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0]
+        if (content_type not in COMPRESSIBLE_TYPES
+                or response.has_header("Content-Encoding")):
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is None or not re_accepts_brotli.search(accept_encoding):
+            original = None if response.streaming else len(response.content)
+            response = super().process_response(request, response)
+            self.log_savings(request, response, original)
+            return response
+
+        if (not response.streaming
+                and len(response.content) < MIN_COMPRESS_LENGTH):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _abrotli_sequence(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = _brotli_sequence(
+                    response.streaming_content
+                )
+            del response.headers["Content-Length"]
+            original = None
+        else:
+            original = len(response.content)
+            compressed = brotli.compress(
+                response.content, quality=BROTLI_QUALITY
+            )
+            if len(compressed) >= original:
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        self.log_savings(request, response, original)
+        return response
+
+    def log_savings(self, request, response, original):
+        encoding = response.get("Content-Encoding")
+        if original is None or not encoding:
+            return
+        compressed = len(response.content)
+        logger.info(
+            "%s %s: %d -> %d bytes (%s, saved %d)",
+            request.method,
+            request.path,
+            original,
+            compressed,
+            encoding,
+            original - compressed,
+        )
@@ -0,0 +1,137 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from tasks.partitions import create_partitions
+
+# On PostgreSQL the event log is range-partitioned by month. The primary
+# key has to include the partition key, everything else mirrors the
+# model. The first monthly partitions are created here, the following ones
+# by ``create_task_event_partitions``, rows outside of them land in the
+# default partition.
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE "tasks_taskevent" (
+        "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+        "kind" varchar(20) NOT NULL,
+        "field" varchar(50) NOT NULL,
+        "old_value" text NOT NULL,
+        "new_value" text NOT NULL,
+        "created_at" timestamp with time zone NOT NULL,
+        "actor_id" bigint NULL,
+        "task_id" bigint NOT NULL,
+        PRIMARY KEY ("id", "created_at")
+    ) PARTITION BY RANGE ("created_at")
+    """,
+    """
+    CREATE TABLE "tasks_taskevent_default"
+    PARTITION OF "tasks_taskevent" DEFAULT
+    """,
+    """
+    CREATE INDEX "tasks_taskevent_task_idx"
+    ON "tasks_taskevent" ("task_id", "created_at")
+    """,
+    """
+    CREATE INDEX "tasks_taskevent_actor_id_idx"
+    ON "tasks_taskevent" ("actor_id")
+    """,
+]
+
+
+def create_task_event_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+        create_partitions(schema_editor.connection, months=3)
+    else:
+        schema_editor.create_model(apps.get_model("tasks", "TaskEvent"))
+
+
+def drop_task_event_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("tasks", "TaskEvent"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_snapshots"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="TaskEvent",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "kind",
+                            models.CharField(
+                                choices=[
+                                    ("CREATED", "Created"),
+                                    ("CHANGED", "Changed"),
+                                    ("COMPLETED", "Completed"),
+                                    ("REOPENED", "Reopened"),
+                                    ("ASSIGNED", "Assigned"),
+                                    ("UNASSIGNED", "Unassigned"),
+                                ],
+                                max_length=20,
+                            ),
+                        ),
+                        (
+                            "field",
+                            models.CharField(blank=True, default="", max_length=50),
+                        ),
+                        ("old_value", models.TextField(blank=True, default="")),
+                        ("new_value", models.TextField(blank=True, default="")),
+                        (
+                            "created_at",
+                            models.DateTimeField(default=django.utils.timezone.now),
+                        ),
+                        (
+                            "actor",
+                            models.ForeignKey(
+                                blank=True,
+                                db_constraint=False,
+                                null=True,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="+",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                        (
+                            "task",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                db_index=False,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="events",
+                                to="tasks.task",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "ordering": ["created_at"],
+                        "indexes": [
+                            models.Index(
+                                fields=["task", "created_at"],
+                                name="tasks_taskevent_task_idx",
+                            )
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_task_event_table, drop_task_event_table),
+    ]
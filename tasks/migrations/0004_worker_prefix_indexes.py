@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Prefix indexes backing the worker autocomplete (``istartswith`` on
+# full_name and username). They are expression indexes tuned per
+# database, so they are not declared on the model.
+INDEXES = {
+    "postgresql": [
+        (
+            "tasks_worker_full_name_prefix_idx",
+            'CREATE INDEX "tasks_worker_full_name_prefix_idx" '
+            'ON "tasks_worker" (UPPER("full_name"::text) text_pattern_ops)',
+        ),
+        (
+            "tasks_worker_username_prefix_idx",
+            'CREATE INDEX "tasks_worker_username_prefix_idx" '
+            'ON "tasks_worker" (UPPER("username"::text) text_pattern_ops)',
+        ),
+    ],
+    "sqlite": [
+        (
+            "tasks_worker_full_name_prefix_idx",
+            'CREATE INDEX "tasks_worker_full_name_prefix_idx" '
+            'ON "tasks_worker" ("full_name" COLLATE NOCASE)',
+        ),
+        (
+            "tasks_worker_username_prefix_idx",
+            'CREATE INDEX "tasks_worker_username_prefix_idx" '
+            'ON "tasks_worker" ("username" COLLATE NOCASE)',
+        ),
+    ],
+}
+
+
+def create_prefix_indexes(apps, schema_editor):
+    for name, sql in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    quote = schema_editor.quote_name
+    for name, sql in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote(name)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_events"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
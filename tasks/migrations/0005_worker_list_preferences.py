@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_worker_prefix_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="worker",
+            name="infinite_scroll",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="worker",
+            name="page_size",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(100),
+                ],
+            ),
+        ),
+    ]
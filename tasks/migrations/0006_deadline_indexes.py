@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_worker_list_preferences"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["deadline"], name="tasks_proje_deadlin_797d24_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["deadline"], name="tasks_task_deadlin_736196_idx"
+            ),
+        ),
+    ]
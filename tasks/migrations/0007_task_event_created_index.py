@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_deadline_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskevent",
+            index=models.Index(
+                fields=["created_at"], name="tasks_taskevent_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_task_event_created_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="blocked_by",
+            field=models.ManyToManyField(
+                blank=True, related_name="blocking", to="tasks.task"
+            ),
+        ),
+    ]
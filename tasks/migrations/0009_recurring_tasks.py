@@ -0,0 +1,102 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:56
+
+import datetime
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_dependencies"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurringTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=80)),
+                ("description", models.TextField(blank=True, default="")),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("URGENT", "Urgent"),
+                            ("HIGH", "High"),
+                            ("MEDIUM", "Medium"),
+                            ("LOW", "Low"),
+                        ],
+                        default="MEDIUM",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[
+                            ("DAILY", "Daily"),
+                            ("WEEKLY", "Weekly"),
+                            ("MONTHLY", "Monthly"),
+                        ],
+                        default="WEEKLY",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                ("starts_on", models.DateField()),
+                ("ends_on", models.DateField(blank=True, null=True)),
+                ("due_time", models.TimeField(default=datetime.time(17, 0))),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "assignees",
+                    models.ManyToManyField(
+                        blank=True,
+                        related_name="recurring_tasks",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_tasks",
+                        to="tasks.project",
+                    ),
+                ),
+                (
+                    "type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_tasks",
+                        to="tasks.tasktype",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["project", "name"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("name", "project"),
+                        name="unique_recurring_task_name_per_project",
+                    )
+                ],
+            },
+        ),
+    ]
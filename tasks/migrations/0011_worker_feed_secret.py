@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:35
+
+import tasks.models
+from django.db import migrations, models
+
+
+def give_each_worker_a_secret(apps, schema_editor):
+    # the default is evaluated once for the existing rows
+    Worker = apps.get_model("tasks", "Worker")
+    workers = list(Worker.objects.only("pk"))
+    for worker in workers:
+        worker.feed_secret = tasks.models.new_feed_secret()
+    Worker.objects.bulk_update(workers, ["feed_secret"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_task_hierarchy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="worker",
+            name="feed_secret",
+            field=models.CharField(
+                default=tasks.models.new_feed_secret, editable=False, max_length=32
+            ),
+        ),
+        migrations.RunPython(
+            give_each_worker_a_secret, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:01
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def copy_root_projects(apps, schema_editor):
+    # subtasks used to be saved without a project, they get the one of
+    # the top of their hierarchy
+    Task = apps.get_model("tasks", "Task")
+    TaskClosure = apps.get_model("tasks", "TaskClosure")
+    root_project = (
+        TaskClosure.objects.filter(descendant_id=OuterRef("pk"))
+        .order_by("-depth")
+        .values("ancestor__project_id")[:1]
+    )
+    Task.objects.filter(
+        parent__isnull=False, project__isnull=True
+    ).update(project_id=Subquery(root_project))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_worker_feed_secret"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_root_projects, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,65 @@
+import datetime
+import secrets
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
 
+from tasks.pagination import MAX_PAGE_SIZE
+
+
+class ValidatedSaveMixin:
+    """
+    Run ``full_clean()`` on every save.
+
+    With ``save(update_fields=[...])`` only the saved fields are
+    validated, so unique and constraint checks (each a query) are
+    skipped for columns that did not change.
+    """
+
+    def full_clean(self, exclude=None, validate_unique=True,
+                   validate_constraints=True):
+        self._clean_exclude = set(exclude or ())
+        try:
+            super().full_clean(
+                exclude=exclude,
+                validate_unique=validate_unique,
+                validate_constraints=validate_constraints,
+            )
+        finally:
+            del self._clean_exclude
+
+    def should_validate(self, *fields: str) -> bool:
+        """Used by clean() to skip checks of fields that are not saved."""
+        exclude = getattr(self, "_clean_exclude", None)
+        return not exclude or any(field not in exclude for field in fields)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.full_clean()
+        else:
+            update_fields = set(update_fields)
+            self.full_clean(
+                exclude=[
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if field.name not in update_fields
+                    and field.attname not in update_fields
+                ]
+            )
+        return super().save(*args, **kwargs)
+
+
+def new_feed_secret() -> str:
+    return secrets.token_urlsafe(24)
 
-class Worker(AbstractUser):
+
+class Worker(ValidatedSaveMixin, AbstractUser):
     position = models.ForeignKey(
         "Position",
         on_delete=models.CASCADE,
@@ -24,6 +77,22 @@ class Worker(AbstractUser):
         blank=True,
         default="",
     )
+    # list preferences, an empty page size means the list's default
+    page_size = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[
+            MinValueValidator(1),
+            MaxValueValidator(MAX_PAGE_SIZE),
+        ],
+    )
+    infinite_scroll = models.BooleanField(default=False)
+    # part of the calendar feed url, replaced to revoke the old urls
+    feed_secret = models.CharField(
+        max_length=32,
+        default=new_feed_secret,
+        editable=False,
+    )
 
     class Meta:
         ordering = ["username"]
@@ -40,14 +109,18 @@ class Worker(AbstractUser):
 
     def save(self, *args, **kwargs):
         self.full_name = self.create_full_name()
-        self.full_clean()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {
+            "first_name", "last_name"
+        } & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "full_name"}
         return super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("tasks:worker-detail", kwargs={"pk": self.pk})
 
 
-class Task(models.Model):
+class Task(ValidatedSaveMixin, models.Model):
     class Priority(models.TextChoices):
         URGENT = "URGENT", "Urgent"
         HIGH = "HIGH", "High"
@@ -78,6 +151,25 @@ class Task(models.Model):
         related_name="tasks",
         blank=True,
     )
+    # subtasks belong to their parent's project, see TaskClosure
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        related_name="subtasks",
+        null=True,
+        blank=True,
+    )
+    # tasks of the same project that have to be done first
+    blocked_by = models.ManyToManyField(
+        "self",
+        symmetrical=False,
+        related_name="blocking",
+        blank=True,
+    )
+
+    # blockers about to replace ``blocked_by``, set by the task forms so
+    # that clean() can reject dependency cycles before they are saved
+    pending_blocked_by = None
 
     class Meta:
         ordering = ["deadline"]
@@ -91,13 +183,75 @@ class Task(models.Model):
         ]
         indexes = [
             models.Index(fields=["project", "deadline"]),
+            # calendar ranges across all projects
+            models.Index(fields=["deadline"]),
             models.Index(fields=["is_completed"]),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # loaded values are diffed on save to build the task event log
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _changed(self, attname: str) -> bool:
+        loaded = getattr(self, "_loaded_values", {})
+        return self.pk is None or loaded.get(attname) != getattr(
+            self, attname
+        )
+
+    def _clean_parent(self):
+        if self.parent_id == self.pk:
+            raise ValidationError(
+                {"parent": "A task cannot be its own subtask."}
+            )
+        if (self.pk is not None
+                and TaskClosure.objects.filter(
+                    ancestor_id=self.pk, descendant_id=self.parent_id
+                ).exists()):
+            raise ValidationError(
+                {"parent": "A task cannot be a subtask of its own subtask."}
+            )
+        if self.project_id is None:
+            self.project_id = self.parent.project_id
+        elif self.project_id != self.parent.project_id:
+            raise ValidationError(
+                {"project": "A subtask belongs to its parent's project."}
+            )
+
     def clean(self):
+        if self.pending_blocked_by is not None:
+            from tasks.dependencies import validate_blockers
+
+            validate_blockers(self, self.pending_blocked_by)
+        if (self.parent_id
+                and self.should_validate("parent", "project")
+                and (self._changed("parent_id")
+                     or self._changed("project_id"))):
+            self._clean_parent()
+        if (self.pk is not None
+                and self.should_validate("project")
+                and self._changed("project_id")
+                and TaskClosure.objects.filter(ancestor_id=self.pk).exists()):
+            raise ValidationError(
+                {"project": "A task with subtasks cannot change its project."}
+            )
+        if (self.is_completed
+                and self.pk is not None
+                and self.should_validate("is_completed")
+                and self._changed("is_completed")
+                and TaskClosure.objects.filter(
+                    ancestor_id=self.pk, descendant__is_completed=False
+                ).exists()):
+            raise ValidationError(
+                "Cannot complete a task with uncompleted subtasks."
+            )
+        if not self.should_validate("deadline", "project"):
+            return
         if self.deadline and self.deadline < timezone.now():
             raise ValidationError("Deadline cannot be in the past.")
         if (self.project
@@ -109,13 +263,51 @@ class Task(models.Model):
                 )
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        if self.parent_id and self.project_id is None:
+            # subtasks belong to their parent's project
+            self.project_id = self.parent.project_id
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "project"}
         return super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("tasks:task-detail", kwargs={"pk": self.pk})
 
 
+class TaskClosure(models.Model):
+    """
+    Closure table of the subtask hierarchy: one row for every task and
+    each of its ancestors, ``depth`` 1 for the parent. Tasks are not
+    rows of their own, so top-level tasks without subtasks have none.
+    Kept up to date by ``tasks.hierarchy``.
+    """
+
+    ancestor = models.ForeignKey(
+        "Task",
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+    )
+    descendant = models.ForeignKey(
+        "Task",
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+    )
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            # also the index for subtree lookups by ancestor
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="unique_task_closure",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"]),
+        ]
+
+
 class TaskType(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, default="")
@@ -174,7 +366,7 @@ class Team(models.Model):
         return reverse("tasks:team-detail", kwargs={"pk": self.pk})
 
 
-class Project(models.Model):
+class Project(ValidatedSaveMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, default="")
     leader = models.ForeignKey(
@@ -197,22 +389,232 @@ class Project(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["deadline"]),
+        ]
 
     def __str__(self):
         return self.name
 
     def clean(self):
-        if self.deadline and self.deadline < timezone.localdate():
+        if (self.should_validate("deadline")
+                and self.deadline
+                and self.deadline < timezone.localdate()):
             raise ValidationError("Deadline cannot be in the past.")
-        if self.is_completed:
-            if self.tasks.filter(is_completed=False).exists():
+        if self.should_validate("is_completed") and self.is_completed:
+            if Task.objects.filter(project=self, is_completed=False).exists():
                 raise ValidationError(
                     "Cannot complete project with uncompleted tasks."
                 )
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
-
     def get_absolute_url(self):
         return reverse("tasks:project-detail", kwargs={"pk": self.pk})
+
+
+class RecurringTask(models.Model):
+    """
+    Template of a task that is due again and again, its occurrences are
+    created ahead of time by ``manage.py materialize_recurring_tasks``.
+    Every occurrence is named after the template and its date, which
+    keeps reruns from creating a task twice.
+    """
+
+    class Frequency(models.TextChoices):
+        DAILY = "DAILY", "Daily"
+        WEEKLY = "WEEKLY", "Weekly"
+        MONTHLY = "MONTHLY", "Monthly"
+
+    name = models.CharField(max_length=80)
+    description = models.TextField(blank=True, default="")
+    type = models.ForeignKey(
+        "TaskType",
+        on_delete=models.CASCADE,
+        related_name="recurring_tasks",
+    )
+    project = models.ForeignKey(
+        "Project",
+        on_delete=models.CASCADE,
+        related_name="recurring_tasks",
+    )
+    priority = models.CharField(
+        max_length=10,
+        choices=Task.Priority.choices,
+        default=Task.Priority.MEDIUM,
+    )
+    assignees = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        related_name="recurring_tasks",
+        blank=True,
+    )
+    # the rule: every ``interval`` days/weeks/months from ``starts_on``,
+    # due at ``due_time``, until ``ends_on`` or the project deadline
+    frequency = models.CharField(
+        max_length=10,
+        choices=Frequency.choices,
+        default=Frequency.WEEKLY,
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)]
+    )
+    starts_on = models.DateField()
+    ends_on = models.DateField(null=True, blank=True)
+    due_time = models.TimeField(default=datetime.time(17))
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["project", "name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "project"],
+                name="unique_recurring_task_name_per_project",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_frequency_display().lower()})"
+
+    def clean(self):
+        if self.ends_on and self.starts_on and self.ends_on < self.starts_on:
+            raise ValidationError("The end cannot be before the start.")
+
+
+class Snapshot(models.Model):
+    """
+    Daily aggregate of task counters for one dimension.
+
+    Rows are only ever appended by the ``take_snapshots`` command,
+    charts read history from here instead of recomputing it from Task.
+    """
+
+    date = models.DateField()
+    open_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ["date"]
+
+
+class ProjectSnapshot(Snapshot):
+    project = models.ForeignKey(
+        "Project",
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+    )
+
+    class Meta(Snapshot.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "date"],
+                name="unique_project_snapshot_per_day",
+            ),
+        ]
+
+
+class TeamSnapshot(Snapshot):
+    team = models.ForeignKey(
+        "Team",
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+    )
+
+    class Meta(Snapshot.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "date"],
+                name="unique_team_snapshot_per_day",
+            ),
+        ]
+
+
+class TaskTypeSnapshot(Snapshot):
+    type = models.ForeignKey(
+        "TaskType",
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+    )
+
+    class Meta(Snapshot.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "date"],
+                name="unique_task_type_snapshot_per_day",
+            ),
+        ]
+
+
+class TaskEventQuerySet(models.QuerySet):
+    def timeline(self, task):
+        """Compact, chronological history of one task."""
+        task_id = getattr(task, "pk", task)
+        return (
+            self.filter(task_id=task_id)
+            .order_by("created_at", "id")
+            .values(
+                "kind",
+                "field",
+                "old_value",
+                "new_value",
+                "actor_id",
+                "created_at",
+            )
+        )
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only history of task changes.
+
+    Foreign keys carry no database constraint so that history outlives
+    deleted tasks and workers, and so the table can be partitioned by
+    month on PostgreSQL (see migration 0003).
+    """
+
+    class Kind(models.TextChoices):
+        CREATED = "CREATED", "Created"
+        CHANGED = "CHANGED", "Changed"
+        COMPLETED = "COMPLETED", "Completed"
+        REOPENED = "REOPENED", "Reopened"
+        ASSIGNED = "ASSIGNED", "Assigned"
+        UNASSIGNED = "UNASSIGNED", "Unassigned"
+
+    task = models.ForeignKey(
+        "Task",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="events",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    field = models.CharField(max_length=50, blank=True, default="")
+    old_value = models.TextField(blank=True, default="")
+    new_value = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = TaskEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["task", "created_at"],
+                name="tasks_taskevent_task_idx",
+            ),
+            # changes since a point in time, for the calendar sync
+            models.Index(
+                fields=["created_at"],
+                name="tasks_taskevent_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.task_id}"
@@ -0,0 +1,206 @@
+import datetime
+import hashlib
+import json
+from decimal import Decimal
+from uuid import UUID
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# upper bound of the per-user page size, also the choices offered
+MAX_PAGE_SIZE = 100
+PAGE_SIZE_CHOICES = (5, 10, 25, 50, MAX_PAGE_SIZE)
+
+
+def estimated_rows(queryset: QuerySet) -> int:
+    """
+    Postgres' own row estimate for ``queryset``: ``pg_class.reltuples``
+    when it is unfiltered, the planner's ``EXPLAIN`` estimate otherwise.
+    """
+    queryset = queryset.order_by()
+    with connections[queryset.db].cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 until the table has been vacuumed or analyzed
+            if row and row[0] >= 0:
+                return row[0]
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedPage(Page):
+    """Page that knows from its own rows whether another one follows."""
+
+    def __init__(self, object_list, number, paginator, has_next: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that skips the exact ``COUNT(*)`` for large lists.
+
+    On Postgres lists estimated above ``estimate_threshold`` rows use the
+    estimate, narrower ones are counted exactly. Other databases count
+    exactly but keep large counts cached for ``count_cache_timeout``.
+    ``is_estimate`` tells the template to say "about N pages".
+
+    An estimate may fall short of the real count, so estimated pages are
+    not checked against it: a page exists when it has rows, and one
+    extra row tells whether there is a next one.
+    """
+
+    estimate_threshold = 10_000
+    count_cache_timeout = 60
+
+    is_estimate = False
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        try:
+            sql = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            # e.g. an empty ``pk__in``, nothing to count
+            return 0
+
+        if connections[queryset.db].vendor == "postgresql":
+            estimate = estimated_rows(queryset)
+            if estimate >= self.estimate_threshold:
+                self.is_estimate = True
+                return estimate
+            return super().count
+
+        key = "paginator-count:" + hashlib.md5(
+            repr((queryset.db, sql)).encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is not None:
+            self.is_estimate = True
+            return count
+        count = super().count
+        if count >= self.estimate_threshold:
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # an integer, the parent class checked that first
+            number = int(number)
+            if not self.is_estimate or number < 1:
+                raise
+            return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return EstimatedPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+def _keyset_default(value):
+    # full precision, DjangoJSONEncoder would cut microseconds off and
+    # the continuation would repeat rows sharing the millisecond
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Cannot use {type(value).__name__} in a keyset token.")
+
+
+class KeysetSerializer:
+    def dumps(self, obj):
+        return json.dumps(
+            obj, separators=(",", ":"), default=_keyset_default
+        ).encode("latin-1")
+
+    def loads(self, data):
+        return json.loads(data.decode("latin-1"))
+
+
+def keyset_ordering(queryset: QuerySet) -> list[str]:
+    """
+    The ordering of ``queryset`` made total by a trailing ``pk``, so
+    every row has a unique position to continue from.
+    """
+    ordering = list(
+        queryset.query.order_by or queryset.model._meta.ordering
+    )
+    if not ordering or ordering[-1].lstrip("-") not in ("pk", "id"):
+        ordering.append("pk")
+    return ordering
+
+
+def _keyset_salt(queryset: QuerySet) -> str:
+    return f"tasks.keyset:{queryset.model._meta.label}"
+
+
+def keyset_token(queryset: QuerySet, obj) -> str:
+    """Signed continuation token pointing right after ``obj``."""
+    ordering = keyset_ordering(queryset)
+    values = []
+    for field in ordering:
+        name = field.lstrip("-")
+        if name == "pk":
+            values.append(obj.pk)
+        else:
+            attname = obj._meta.get_field(name).attname
+            values.append(getattr(obj, attname))
+    return signing.dumps(
+        [ordering, values],
+        salt=_keyset_salt(queryset),
+        serializer=KeysetSerializer,
+        compress=True,
+    )
+
+
+def keyset_after(queryset: QuerySet, token: str) -> QuerySet:
+    """
+    Rows of ``queryset`` following the row ``token`` was made from, in
+    keyset order. Raises ``signing.BadSignature`` for tampered tokens and
+    tokens of another list or ordering.
+    """
+    ordering, values = signing.loads(
+        token, salt=_keyset_salt(queryset), serializer=KeysetSerializer
+    )
+    if ordering != keyset_ordering(queryset):
+        raise signing.BadSignature("Token does not match the list ordering.")
+
+    # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+    condition, equal = Q(), {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return queryset.filter(condition).order_by(*ordering)
@@ -0,0 +1,77 @@
+"""
+Monthly partitions of the task event log on PostgreSQL.
+
+Migration 0003 creates the partitioned table with a default partition
+and the partitions of the first months, ``create_task_event_partitions``
+adds the following ones. A new partition may not overlap rows of the
+default partition, those are moved over while it is detached.
+"""
+
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+TABLE = "tasks_taskevent"
+DEFAULT_PARTITION = "tasks_taskevent_default"
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    """First day of the month ``months`` after ``day``'s."""
+    month = day.month - 1 + months
+    return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def create_partition(connection, start: datetime.date) -> dict | None:
+    """
+    Create the partition of the month starting on ``start``. Returns its
+    ``name``, ``start``, ``end`` and the number of rows ``moved`` out of
+    the default partition, ``None`` if it exists already.
+    """
+    end = add_months(start, 1)
+    name = f"{TABLE}_{start:%Y_%m}"
+    quote = connection.ops.quote_name
+    table, default = quote(TABLE), quote(DEFAULT_PARTITION)
+    atomic = transaction.atomic(using=connection.alias)
+    with atomic, connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return None
+        # waits for the inserts in flight, new ones wait for the partition
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        in_range = "created_at >= %s AND created_at < %s"
+        cursor.execute(
+            f"SELECT count(*) FROM {default} WHERE {in_range}", [start, end]
+        )
+        moved = cursor.fetchone()[0]
+        if moved:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {table} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        if moved:
+            cursor.execute(
+                f"INSERT INTO {table} SELECT * FROM {default} "
+                f"WHERE {in_range}",
+                [start, end],
+            )
+            cursor.execute(
+                f"DELETE FROM {default} WHERE {in_range}", [start, end]
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"
+            )
+    return {"name": name, "start": start, "end": end, "moved": moved}
+
+
+def create_partitions(connection, months: int) -> list[dict]:
+    """``create_partition()`` for ``months`` months from the current one."""
+    first = timezone.localdate().replace(day=1)
+    partitions = []
+    for offset in range(months):
+        partition = create_partition(connection, add_months(first, offset))
+        if partition is not None:
+            partitions.append(partition)
+    return partitions
@@ -0,0 +1,92 @@
+"""
+Team and project scoped access.
+
+A worker has access to the teams they are a member or the leader of,
+and to the projects they lead or whose team they have access to. Tasks
+follow their project, tasks outside of a project are open to everybody.
+Subtasks always carry their parent's project (``Task.save()``), so those
+of a private task are private as well.
+Superusers have access to everything.
+
+The two id sets are resolved with two queries, cached per worker until
+their memberships change (``access_version``) and looked up once per
+request. Without a shared cache (``REDIS_URL``) the invalidation only
+reaches the process that made the change, so ``ACCESS_CACHE_TIMEOUT`` is
+kept short there. Views apply them as ``id IN (...)`` filters on their querysets,
+so list pages never check objects one by one.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+
+from tasks.models import Project, Task, Team, Worker
+from tasks.services import access_version
+
+ACCESS_KEYS = {
+    Project: "projects",
+    Team: "teams",
+}
+
+
+def resolve_access(worker_id: int) -> dict[str, frozenset[int]]:
+    """``{"projects", "teams"}`` ids the worker has access to."""
+    teams = frozenset(
+        Team.workers.through.objects.filter(worker_id=worker_id)
+        .order_by()
+        .values_list("team_id", flat=True)
+        .union(
+            Team.objects.filter(leader_id=worker_id)
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+    )
+    projects = frozenset(
+        Project.objects.filter(Q(leader_id=worker_id) | Q(team_id__in=teams))
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+    return {"projects": projects, "teams": teams}
+
+
+def worker_access(worker: Worker) -> dict[str, frozenset[int]] | None:
+    """Cached ``resolve_access()``, ``None`` means everything."""
+    if worker.is_superuser:
+        return None
+    key = f"access:{worker.pk}:{access_version(worker.pk)}"
+    access = cache.get(key)
+    if access is None:
+        access = resolve_access(worker.pk)
+        cache.set(key, access, settings.ACCESS_CACHE_TIMEOUT)
+    return access
+
+
+def request_access(request) -> dict[str, frozenset[int]] | None:
+    """``worker_access()`` of the request's user, once per request."""
+    if not hasattr(request, "_access"):
+        request._access = worker_access(request.user)
+    return request._access
+
+
+def accessible(queryset: QuerySet, request) -> QuerySet:
+    """
+    ``queryset`` limited to the projects, teams or tasks the user has
+    access to. Querysets of other models are returned as they are.
+    """
+    access = request_access(request)
+    if access is None:
+        return queryset
+    model = queryset.model
+    if model is Task:
+        return queryset.filter(
+            Q(project__isnull=True) | Q(project_id__in=access["projects"])
+        )
+    if model in ACCESS_KEYS:
+        return queryset.filter(pk__in=access[ACCESS_KEYS[model]])
+    return queryset
+
+
+def can_access(request, model, pk: int) -> bool:
+    """Whether the user may see the ``Project`` or ``Team``, no query."""
+    access = request_access(request)
+    return access is None or pk in access[ACCESS_KEYS[model]]
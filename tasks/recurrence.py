@@ -0,0 +1,165 @@
+"""
+Occurrences of recurring task templates.
+
+``materialize()`` creates the tasks due within the next days for every
+active template in bulk: one query for what already exists, one
+``bulk_create`` for the tasks and one for their assignees. Occurrence
+names are unique per project (``unique_task_name_per_project``), so
+reruns skip what is already there. A run is one transaction holding
+the template rows, concurrent runs wait for it and then skip what it
+created.
+"""
+
+import calendar
+import datetime
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.events import event_scope, record
+from tasks.models import RecurringTask, Task, TaskEvent
+from tasks.schedule import tasks_due_between
+from tasks.services import forget_dashboard_counts
+
+MATERIALIZE_DAYS = 14
+
+
+def _add_months(day: datetime.date, months: int) -> datetime.date:
+    """``day`` moved by ``months``, the 31st becomes the month's last day."""
+    year, month = divmod(day.month - 1 + months, 12)
+    year, month = day.year + year, month + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return day.replace(year=year, month=month, day=min(day.day, last_day))
+
+
+def occurrences(
+        template: RecurringTask, first: datetime.date, last: datetime.date
+) -> Iterator[datetime.date]:
+    """Days between ``first`` and ``last`` the template is due on."""
+    ends = [last, template.project.deadline]
+    if template.ends_on:
+        ends.append(template.ends_on)
+    last = min(ends)
+    start = template.starts_on
+    if template.frequency == RecurringTask.Frequency.MONTHLY:
+        months = (first.year - start.year) * 12 + first.month - start.month
+        step = max(months // template.interval, 0)
+        while (day := _add_months(start, step * template.interval)) <= last:
+            if day >= first:
+                yield day
+            step += 1
+        return
+
+    days = template.interval
+    if template.frequency == RecurringTask.Frequency.WEEKLY:
+        days *= 7
+    # first due day on or after ``first``
+    skip = max(-(-(first - start).days // days), 0)
+    day = start + datetime.timedelta(days=skip * days)
+    while day <= last:
+        yield day
+        day += datetime.timedelta(days=days)
+
+
+def occurrence_name(template: RecurringTask, day: datetime.date) -> str:
+    return f"{template.name} ({day.isoformat()})"
+
+
+def materialize(
+        days: int = MATERIALIZE_DAYS, now: datetime.datetime | None = None
+) -> dict:
+    """
+    Create the occurrences due within ``days`` that don't exist yet and
+    assign them. Returns the number of ``tasks`` and ``assignments``
+    created and the ``seconds`` it took.
+    """
+    started = time.perf_counter()
+    now = now or timezone.now()
+    first = timezone.localdate(now)
+    last = first + datetime.timedelta(days=days)
+    with transaction.atomic():
+        templates = list(
+            RecurringTask.objects.filter(
+                is_active=True, project__is_completed=False
+            )
+            .select_related("project")
+            # concurrent runs wait here, so that what exists is known
+            .select_for_update(of=("self",))
+        )
+        assignees = defaultdict(list)
+        template_assignees = RecurringTask.assignees.through.objects.filter(
+            recurringtask__in=templates
+        )
+        for template_id, worker_id in template_assignees.values_list(
+                "recurringtask_id", "worker_id"
+        ):
+            assignees[template_id].append(worker_id)
+
+        window = tasks_due_between(
+            first,
+            last,
+            Task.objects.filter(
+                project_id__in={template.project_id for template in templates}
+            ),
+        )
+        existing = set(window.values_list("project_id", "name"))
+        new = {}
+        for template in templates:
+            for day in occurrences(template, first, last):
+                deadline = timezone.make_aware(
+                    datetime.datetime.combine(day, template.due_time)
+                )
+                key = (template.project_id, occurrence_name(template, day))
+                if deadline <= now or key in existing:
+                    continue
+                new[key] = (template, Task(
+                    name=key[1],
+                    description=template.description,
+                    deadline=deadline,
+                    priority=template.priority,
+                    type_id=template.type_id,
+                    project_id=template.project_id,
+                ))
+
+        created, assignments = [], []
+        if new:
+            # other runs are kept out by the lock, conflicts are tasks
+            # someone named like an occurrence meanwhile
+            Task.objects.bulk_create(
+                [task for _, task in new.values()], ignore_conflicts=True
+            )
+            created = [
+                (pk, new[project_id, name][0])
+                for pk, project_id, name in window.values_list(
+                    "pk", "project_id", "name"
+                )
+                if (project_id, name) in new
+            ]
+            Assignment = Task.assignees.through
+            assignments = [
+                Assignment(task_id=pk, worker_id=worker_id)
+                for pk, template in created
+                for worker_id in assignees[template.pk]
+            ]
+            with event_scope():
+                Assignment.objects.bulk_create(
+                    assignments, ignore_conflicts=True
+                )
+                for pk, _ in created:
+                    record(pk, TaskEvent.Kind.CREATED)
+                for assignment in assignments:
+                    record(
+                        assignment.task_id,
+                        TaskEvent.Kind.ASSIGNED,
+                        field="assignees",
+                        new_value=str(assignment.worker_id),
+                    )
+            forget_dashboard_counts()
+    return {
+        "tasks": len(created),
+        "assignments": len(assignments),
+        "seconds": time.perf_counter() - started,
+    }
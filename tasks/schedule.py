@@ -0,0 +1,83 @@
+"""
+Deadline range queries behind the calendar, the project timeline and the
+iCal feed. Every query is a half-open range on ``deadline`` so it can use
+the deadline indexes.
+"""
+
+import calendar
+import datetime
+
+from django.db.models import Count, Q, QuerySet
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from tasks.models import Project, Task
+
+
+def day_bounds(
+        first: datetime.date, last: datetime.date
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """Aware ``[first 00:00, day after last 00:00)`` in the current zone."""
+    start = datetime.datetime.combine(first, datetime.time.min)
+    end = datetime.datetime.combine(
+        last + datetime.timedelta(days=1), datetime.time.min
+    )
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def month_weeks(year: int, month: int) -> list[list[datetime.date]]:
+    """Full weeks (Monday first) covering the month."""
+    return calendar.Calendar().monthdatescalendar(year, month)
+
+
+def tasks_due_between(
+        first: datetime.date,
+        last: datetime.date,
+        queryset: QuerySet | None = None,
+) -> QuerySet:
+    if queryset is None:
+        queryset = Task.objects.all()
+    start, end = day_bounds(first, last)
+    return queryset.filter(deadline__gte=start, deadline__lt=end)
+
+
+def task_deadline_counts(
+        first: datetime.date,
+        last: datetime.date,
+        queryset: QuerySet | None = None,
+) -> dict[datetime.date, dict]:
+    """
+    Tasks due per local day between ``first`` and ``last``:
+    ``{day: {"total": ..., "completed": ...}}``, days without tasks are
+    left out. One grouped query, no task rows are loaded.
+    """
+    rows = (
+        tasks_due_between(first, last, queryset)
+        .order_by()
+        .annotate(day=TruncDate("deadline"))
+        .values("day")
+        .annotate(
+            total=Count("pk"),
+            completed=Count("pk", filter=Q(is_completed=True)),
+        )
+    )
+    return {
+        row["day"]: {"total": row["total"], "completed": row["completed"]}
+        for row in rows
+    }
+
+
+def tasks_due_on(day: datetime.date) -> QuerySet:
+    return (
+        tasks_due_between(day, day)
+        .select_related("type", "project")
+        .order_by("deadline", "pk")
+    )
+
+
+def projects_due_between(
+        first: datetime.date, last: datetime.date
+) -> QuerySet:
+    return Project.objects.filter(
+        deadline__gte=first, deadline__lte=last
+    ).order_by("deadline", "pk")
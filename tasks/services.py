@@ -0,0 +1,359 @@
+from collections.abc import Iterable
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.dispatch import Signal
+
+from tasks.events import record
+from tasks.hierarchy import roll_up_completion
+from tasks.models import Task, TaskClosure, TaskEvent, Project, Team, Worker
+
+DASHBOARD_COUNTS_KEY = "dashboard-counts"
+DASHBOARD_COUNTS_TIMEOUT = 60 * 5
+ACCESS_GENERATION_KEY = "access-generation"
+
+# sent once per membership sync with
+# changes={team_id: (added_worker_ids, removed_worker_ids)}
+team_members_changed = Signal()
+
+
+def _quoted_table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def toggle_task_completed(
+        pk: int, project_ids: Iterable[int] | None = None
+) -> bool:
+    """
+    Flip ``Task.is_completed`` in a single ``UPDATE ... RETURNING``.
+
+    A task with open subtasks can't be completed, the check is part of
+    the same statement. Subtasks roll their completion up to their
+    ancestors with one more statement. Given ``project_ids`` only tasks
+    of those projects (or of none) are touched. Returns the new value,
+    raises ``ValidationError`` when it is blocked by open subtasks and
+    ``Task.DoesNotExist`` for unknown or inaccessible pk.
+    """
+    scope, scope_params = "", []
+    if project_ids is not None:
+        scope_params = sorted(project_ids)
+        # "IN (NULL)" matches nothing, tasks without a project remain
+        scope = " AND (project_id IS NULL OR project_id IN ({}))".format(
+            ", ".join(["%s"] * len(scope_params)) or "NULL"
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {_quoted_table(Task)} "
+            "SET is_completed = NOT is_completed "
+            f"WHERE id = %s{scope} AND (is_completed OR NOT EXISTS ("
+            f"SELECT 1 FROM {_quoted_table(TaskClosure)} below "
+            f"JOIN {_quoted_table(Task)} sub ON sub.id = below.descendant_id "
+            "WHERE below.ancestor_id = %s AND NOT sub.is_completed"
+            ")) RETURNING is_completed, parent_id",
+            [pk, *scope_params, pk],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        tasks = Task.objects.filter(pk=pk)
+        if project_ids is not None:
+            tasks = tasks.filter(
+                Q(project__isnull=True) | Q(project_id__in=scope_params)
+            )
+        if tasks.exists():
+            raise ValidationError(
+                "Cannot complete a task with uncompleted subtasks."
+            )
+        raise Task.DoesNotExist(f"Task {pk} does not exist.")
+    is_completed, parent_id = bool(row[0]), row[1]
+    record(
+        pk,
+        TaskEvent.Kind.COMPLETED if is_completed else TaskEvent.Kind.REOPENED,
+    )
+    if parent_id is not None:
+        roll_up_completion(pk, is_completed)
+    return is_completed
+
+
+def toggle_project_completed(pk: int) -> bool:
+    """
+    Flip ``Project.is_completed`` in a single ``UPDATE ... RETURNING``.
+
+    A project can only be completed when it has no open tasks, the check
+    is part of the same statement. Raises ``ValidationError`` when it is
+    blocked by open tasks and ``Project.DoesNotExist`` for unknown pk.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {_quoted_table(Project)} "
+            "SET is_completed = NOT is_completed "
+            "WHERE id = %s AND (is_completed OR NOT EXISTS ("
+            f"SELECT 1 FROM {_quoted_table(Task)} "
+            "WHERE NOT is_completed AND (project_id = %s OR id IN ("
+            # subtasks without a project of their own
+            "SELECT below.descendant_id "
+            f"FROM {_quoted_table(TaskClosure)} below "
+            f"JOIN {_quoted_table(Task)} top ON top.id = below.ancestor_id "
+            "WHERE top.project_id = %s"
+            ")))) RETURNING is_completed",
+            [pk, pk, pk],
+        )
+        row = cursor.fetchone()
+    if row is not None:
+        return bool(row[0])
+    if Project.objects.filter(pk=pk).exists():
+        raise ValidationError("Cannot complete project with uncompleted tasks.")
+    raise Project.DoesNotExist(f"Project {pk} does not exist.")
+
+
+def dashboard_counts() -> dict[str, int]:
+    """
+    Task, project and worker totals of the home page, cached until one
+    of them is created or deleted.
+    """
+    counts = cache.get(DASHBOARD_COUNTS_KEY)
+    if counts is None:
+        counts = {
+            "tasks_count": Task.objects.count(),
+            "project_count": Project.objects.count(),
+            "worker_count": Worker.objects.count(),
+        }
+        cache.set(DASHBOARD_COUNTS_KEY, counts, DASHBOARD_COUNTS_TIMEOUT)
+    return counts
+
+
+def forget_dashboard_counts() -> None:
+    cache.delete(DASHBOARD_COUNTS_KEY)
+
+
+def _cache_version(key: str) -> str:
+    """Opaque token stored under ``key``, new once the key is deleted."""
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(key, version, settings.CACHE_VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def _membership_version_key(team_id: int) -> str:
+    return f"team-membership-version:{team_id}"
+
+
+def team_membership_version(team_id: int) -> str:
+    """Opaque token that changes whenever the team's members change."""
+    return _cache_version(_membership_version_key(team_id))
+
+
+def bump_team_membership_version(*team_ids: int) -> None:
+    cache.delete_many([_membership_version_key(pk) for pk in team_ids])
+
+
+def _worker_feed_version_key(worker_id: int) -> str:
+    return f"worker-feed-version:{worker_id}"
+
+
+def worker_feed_version(worker_id: int) -> str:
+    """
+    Opaque token that changes whenever one of the worker's tasks or
+    their assignments change.
+    """
+    return _cache_version(_worker_feed_version_key(worker_id))
+
+
+def bump_worker_feed_versions(*worker_ids: int) -> None:
+    cache.delete_many([_worker_feed_version_key(pk) for pk in worker_ids])
+
+
+def _project_graph_version_key(project_id: int) -> str:
+    return f"project-graph-version:{project_id}"
+
+
+def project_graph_version(project_id: int) -> str:
+    """
+    Opaque token that changes whenever the project's tasks, their
+    completion or their dependencies change.
+    """
+    return _cache_version(_project_graph_version_key(project_id))
+
+
+def bump_project_graph_versions(*project_ids: int) -> None:
+    cache.delete_many(
+        [_project_graph_version_key(pk) for pk in project_ids]
+    )
+
+
+def _access_version_key(worker_id: int) -> str:
+    return f"access-version:{worker_id}"
+
+
+def access_version(worker_id: int) -> str:
+    """
+    Opaque token that changes whenever the worker's team memberships
+    change, and whenever any team or project is saved or deleted (leaders
+    and project teams are rarely edited, all workers resolve again then).
+    """
+    return "{}:{}".format(
+        _cache_version(ACCESS_GENERATION_KEY),
+        _cache_version(_access_version_key(worker_id)),
+    )
+
+
+def bump_access_versions(*worker_ids: int) -> None:
+    cache.delete_many([_access_version_key(pk) for pk in worker_ids])
+
+
+def bump_access_generation() -> None:
+    cache.delete(ACCESS_GENERATION_KEY)
+
+
+def _team_member_ids(team_id: int) -> QuerySet:
+    return (
+        Team.workers.through.objects.filter(team_id=team_id)
+        .order_by()
+        .values_list("worker_id", flat=True)
+    )
+
+
+def eligible_assignee_ids(project: Project | None) -> frozenset[int] | None:
+    """
+    Ids of the workers that may be assigned to tasks of ``project``:
+    its team members plus its leader. ``None`` means everybody (tasks
+    outside of a project, or of one with neither team nor leader).
+
+    The set is a UNION of the membership rows and the leader, cached per
+    project and keyed on the team-membership version.
+    """
+    if project is None:
+        return None
+    team_id, leader_id = project.team_id, project.leader_id
+    if not team_id:
+        return frozenset([leader_id]) if leader_id else None
+
+    key = "eligible-assignees:{}:{}:{}:{}".format(
+        project.pk, team_id, leader_id, team_membership_version(team_id)
+    )
+    ids = cache.get(key)
+    if ids is None:
+        members = _team_member_ids(team_id)
+        if leader_id:
+            leader = (
+                Worker.objects.filter(pk=leader_id)
+                .order_by()
+                .values_list("pk", flat=True)
+            )
+            members = members.union(leader)
+        ids = frozenset(members)
+        cache.set(key, ids, settings.ELIGIBLE_ASSIGNEES_CACHE_TIMEOUT)
+    return ids
+
+
+def eligible_assignees(project: Project | None) -> QuerySet:
+    """Queryset flavour of ``eligible_assignee_ids`` for searching."""
+    if project is None or not (project.team_id or project.leader_id):
+        return Worker.objects.all()
+    condition = Q(pk__in=[project.leader_id] if project.leader_id else [])
+    if project.team_id:
+        condition |= Q(pk__in=_team_member_ids(project.team_id))
+    return Worker.objects.filter(condition)
+
+
+def _apply_membership_changes(
+        changes: dict[int, tuple[set[int], set[int]]]
+) -> dict[int, tuple[set[int], set[int]]]:
+    """
+    Write only the membership delta: one bulk INSERT for the added rows,
+    one DELETE for the removed ones, then a single aggregated signal.
+    """
+    changes = {
+        team_id: (added, removed)
+        for team_id, (added, removed) in changes.items()
+        if added or removed
+    }
+    if not changes:
+        return changes
+
+    through = Team.workers.through
+    removed_rows = Q()
+    for team_id, (_, removed) in changes.items():
+        if removed:
+            removed_rows |= Q(team_id=team_id, worker_id__in=removed)
+    with transaction.atomic():
+        through.objects.bulk_create(
+            [
+                through(team_id=team_id, worker_id=worker_id)
+                for team_id, (added, _) in changes.items()
+                for worker_id in sorted(added)
+            ],
+            ignore_conflicts=True,
+        )
+        if removed_rows:
+            through.objects.filter(removed_rows).delete()
+    team_members_changed.send(sender=Team, changes=changes)
+    return changes
+
+
+def sync_team_members(
+        team: Team, worker_ids: Iterable[int]
+) -> tuple[set[int], set[int]]:
+    """
+    Make ``worker_ids`` the members of ``team``, touching only the rows
+    that differ. Returns the ``(added, removed)`` worker ids.
+    """
+    wanted = set(worker_ids)
+    current = set(_team_member_ids(team.pk))
+    added, removed = wanted - current, current - wanted
+    _apply_membership_changes({team.pk: (added, removed)})
+    return added, removed
+
+
+def sync_team_memberships(
+        rows: Iterable[tuple[str, str]], dry_run: bool = False
+) -> dict:
+    """
+    Sync memberships from an HR export of ``(team name, username)`` rows.
+
+    Every team mentioned in the export ends up with exactly the listed
+    members, teams that are not mentioned are left alone. Unknown teams
+    and usernames are skipped and reported.
+    """
+    wanted: dict[str, set[str]] = {}
+    for team_name, username in rows:
+        usernames = wanted.setdefault(team_name.strip(), set())
+        if username.strip():
+            usernames.add(username.strip())
+
+    teams = dict(
+        Team.objects.filter(name__in=wanted).values_list("name", "pk")
+    )
+    usernames = set().union(*wanted.values()) if wanted else set()
+    workers = dict(
+        Worker.objects.filter(username__in=usernames)
+        .values_list("username", "pk")
+    )
+
+    current: dict[int, set[int]] = {pk: set() for pk in teams.values()}
+    for team_id, worker_id in Team.workers.through.objects.filter(
+            team_id__in=current
+    ).values_list("team_id", "worker_id"):
+        current[team_id].add(worker_id)
+
+    changes = {}
+    for name, team_id in teams.items():
+        ids = {workers[u] for u in wanted[name] if u in workers}
+        changes[team_id] = (
+            ids - current[team_id], current[team_id] - ids
+        )
+    if not dry_run:
+        changes = _apply_membership_changes(changes)
+
+    return {
+        "teams": len(teams),
+        "added": sum(len(added) for added, _ in changes.values()),
+        "removed": sum(len(removed) for _, removed in changes.values()),
+        "unknown_teams": sorted(set(wanted) - set(teams)),
+        "unknown_workers": sorted(usernames - set(workers)),
+    }
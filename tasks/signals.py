@@ -0,0 +1,239 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from tasks.auth import forget_cached_user
+from tasks.events import (
+    TRACKED_FIELDS,
+    record,
+    record_changes,
+    task_events_recorded,
+)
+from tasks.hierarchy import link_subtree, roll_up_completion, unlink_subtree
+from tasks.live import get_broker, task_updates
+from tasks.models import Project, Task, TaskEvent, Team, Worker
+from tasks.services import (
+    bump_access_generation,
+    bump_access_versions,
+    bump_project_graph_versions,
+    bump_team_membership_version,
+    bump_worker_feed_versions,
+    forget_dashboard_counts,
+    team_members_changed,
+)
+
+GRAPH_EVENT_KINDS = {
+    TaskEvent.Kind.CREATED,
+    TaskEvent.Kind.COMPLETED,
+    TaskEvent.Kind.REOPENED,
+}
+
+
+@receiver(post_save, sender=Task)
+def maintain_task_hierarchy(sender, instance, created, raw=False, **kwargs):
+    # connected before log_task_save, which moves _loaded_values on
+    if raw:
+        return
+    loaded = {} if created else getattr(instance, "_loaded_values", {})
+    old_parent_id = loaded.get("parent_id", instance.parent_id)
+    moved = instance.parent_id != (None if created else old_parent_id)
+    if moved:
+        if not created:
+            unlink_subtree(instance.pk)
+        if instance.parent_id is not None:
+            link_subtree(instance.pk, instance.parent_id)
+    was_completed = loaded.get("is_completed", instance.is_completed)
+    if instance.parent_id is not None and (
+            moved or was_completed != instance.is_completed
+    ):
+        roll_up_completion(instance.pk, instance.is_completed)
+
+
+@receiver(post_save, sender=Task)
+def log_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record(instance.pk, TaskEvent.Kind.CREATED)
+        instance._loaded_values = {
+            attname: getattr(instance, attname) for attname in TRACKED_FIELDS
+        }
+    else:
+        record_changes(instance)
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def log_task_assignees(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # pk_set is not passed for clear(), remember what is about to go
+        if reverse:
+            instance._cleared_pks = set(
+                instance.tasks.values_list("pk", flat=True)
+            )
+        else:
+            instance._cleared_pks = set(
+                instance.assignees.values_list("pk", flat=True)
+            )
+        return
+    if action == "post_clear":
+        action, pk_set = "post_remove", instance.__dict__.pop(
+            "_cleared_pks", set()
+        )
+    if action not in ("post_add", "post_remove"):
+        return
+
+    for pk in sorted(pk_set or ()):
+        task_id, worker_id = (pk, instance.pk) if reverse else (instance.pk, pk)
+        if action == "post_add":
+            record(
+                task_id,
+                TaskEvent.Kind.ASSIGNED,
+                field="assignees",
+                new_value=str(worker_id),
+            )
+        else:
+            record(
+                task_id,
+                TaskEvent.Kind.UNASSIGNED,
+                field="assignees",
+                old_value=str(worker_id),
+            )
+
+
+@receiver(pre_delete, sender=Task)
+def log_task_delete(sender, instance, **kwargs):
+    # the assignment rows go with the task without m2m_changed, keep
+    # the history (and the workers' calendar sync) aware of them
+    for worker_id in instance.assignees.values_list("pk", flat=True):
+        record(
+            instance.pk,
+            TaskEvent.Kind.UNASSIGNED,
+            field="assignees",
+            old_value=str(worker_id),
+        )
+
+
+@receiver(task_events_recorded, sender=TaskEvent)
+def on_task_events_recorded(sender, events, **kwargs):
+    # one query for both: assignees whose calendar feeds go stale, and
+    # project/team of the tasks for the live update filters
+    worker_ids = {
+        int(event.new_value or event.old_value)
+        for event in events
+        if event.field == "assignees"
+    }
+    tasks = {}
+    for task_id, project_id, team_id, worker_id in Task.objects.filter(
+            pk__in={event.task_id for event in events}
+    ).values_list("pk", "project_id", "project__team_id", "assignees"):
+        tasks[task_id] = (project_id, team_id)
+        if worker_id is not None:
+            worker_ids.add(worker_id)
+    if worker_ids:
+        bump_worker_feed_versions(*worker_ids)
+    get_broker().publish(task_updates(events, tasks))
+
+    # dependency graphs gain or lose tasks, critical paths follow completion
+    project_ids = {
+        tasks[event.task_id][0]
+        for event in events
+        if event.task_id in tasks
+        and (event.kind in GRAPH_EVENT_KINDS or event.field == "project_id")
+    }
+    project_ids.update(
+        int(event.old_value)
+        for event in events
+        if event.field == "project_id" and event.old_value
+    )
+    project_ids.discard(None)
+    if project_ids:
+        bump_project_graph_versions(*project_ids)
+
+
+@receiver(m2m_changed, sender=Task.blocked_by.through)
+def invalidate_project_graph(sender, instance, action, **kwargs):
+    if (action in ("post_add", "post_remove", "post_clear")
+            and instance.project_id is not None):
+        bump_project_graph_versions(instance.project_id)
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_project_graph_on_delete(sender, instance, **kwargs):
+    if instance.project_id is not None:
+        bump_project_graph_versions(instance.project_id)
+
+
+@receiver(m2m_changed, sender=Team.workers.through)
+def invalidate_team_membership(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if action in ("post_add", "post_remove"):
+        team_ids = pk_set if reverse else [instance.pk]
+    elif action == "pre_clear":
+        team_ids = (
+            instance.teams.values_list("pk", flat=True) if reverse
+            else [instance.pk]
+        )
+    else:
+        return
+    bump_team_membership_version(*team_ids)
+
+
+@receiver(m2m_changed, sender=Team.workers.through)
+def invalidate_member_access(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action in ("post_add", "post_remove"):
+        worker_ids = [instance.pk] if reverse else pk_set
+    elif action == "pre_clear":
+        worker_ids = (
+            [instance.pk] if reverse
+            else instance.workers.values_list("pk", flat=True)
+        )
+    else:
+        return
+    bump_access_versions(*worker_ids)
+
+
+@receiver(team_members_changed, sender=Team)
+def invalidate_synced_teams(sender, changes, **kwargs):
+    bump_team_membership_version(*changes)
+    bump_access_versions(
+        *{
+            worker_id
+            for added, removed in changes.values()
+            for worker_id in added | removed
+        }
+    )
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Team)
+@receiver(post_delete, sender=Project)
+def invalidate_access(sender, **kwargs):
+    # leaders and project teams decide who has access
+    bump_access_generation()
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Worker)
+def invalidate_dashboard_counts_on_create(sender, created, **kwargs):
+    if created:
+        forget_dashboard_counts()
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Worker)
+def invalidate_dashboard_counts_on_delete(sender, **kwargs):
+    forget_dashboard_counts()
@@ -0,0 +1,81 @@
+from datetime import date, datetime
+
+from django.db import connections
+from django.db.models import Count, DateField, Q, QuerySet, Value
+from django.utils import timezone
+
+from tasks.models import (
+    Task,
+    ProjectSnapshot,
+    TeamSnapshot,
+    TaskTypeSnapshot,
+)
+
+# snapshot model -> path from Task to the dimension column
+DIMENSIONS = {
+    ProjectSnapshot: ("project", "project"),
+    TeamSnapshot: ("team", "project__team"),
+    TaskTypeSnapshot: ("type", "type"),
+}
+
+
+def _aggregate_queryset(
+        lookup: str, day: date, now: datetime
+) -> QuerySet:
+    return (
+        Task.objects.filter(**{f"{lookup}__isnull": False})
+        .order_by()
+        .values(lookup)
+        .annotate(
+            snapshot_date=Value(day, output_field=DateField()),
+            open=Count("id", filter=Q(is_completed=False)),
+            completed=Count("id", filter=Q(is_completed=True)),
+            overdue=Count(
+                "id", filter=Q(is_completed=False, deadline__lt=now)
+            ),
+        )
+    )
+
+
+def _insert_select(model, field: str, queryset: QuerySet) -> int:
+    """Run ``INSERT INTO <snapshot table> SELECT <aggregates>``."""
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    columns = (
+        model._meta.get_field(field).column,
+        "date",
+        "open_count",
+        "completed_count",
+        "overdue_count",
+    )
+    sql, params = queryset.query.sql_with_params()
+    insert = "INSERT INTO {} ({}) {}".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(insert, params)
+        return cursor.rowcount
+
+
+def take_snapshots(day: date | None = None) -> dict[str, int]:
+    """
+    Write one row per project, team and task type for ``day``.
+
+    Every dimension is a single statement. Dimensions that were
+    already captured for ``day`` are skipped, so the command is safe
+    to re-run from cron.
+    """
+    now = timezone.now()
+    day = day or timezone.localdate(now)
+    written = {}
+    for model, (field, lookup) in DIMENSIONS.items():
+        if model.objects.filter(date=day).exists():
+            written[model._meta.model_name] = 0
+            continue
+        queryset = _aggregate_queryset(lookup, day, now)
+        written[model._meta.model_name] = _insert_select(
+            model, field, queryset
+        )
+    return written
@@ -0,0 +1,73 @@
+import posixpath
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from tasks.assets import BUNDLES, IMAGE_VARIANTS, bundle_path, variant_path
+
+register = template.Library()
+
+
+@lru_cache
+def image_variants(path: str) -> tuple[tuple[str, str], ...]:
+    """``(format, path)`` of the WebP/AVIF variants written by the build."""
+    if not settings.ASSET_BUNDLES:
+        return ()
+    return tuple(
+        (fmt, variant_path(path, fmt))
+        for fmt in IMAGE_VARIANTS
+        if staticfiles_storage.exists(variant_path(path, fmt))
+    )
+
+
+@register.simple_tag
+def bundle(name: str) -> str:
+    """One bundled file in production, its sources during development."""
+    paths = (bundle_path(name),) if settings.ASSET_BUNDLES else BUNDLES[name]
+    if name.endswith(".css"):
+        html = '<link href="{}" rel="stylesheet">'
+    else:
+        html = '<script src="{}"></script>'
+    return format_html_join("\n", html, ((static(path),) for path in paths))
+
+
+@register.simple_tag
+def picture(path: str, **attrs: str) -> str:
+    img = format_html(
+        '<img src="{}"{}>',
+        static(path),
+        format_html_join("", ' {}="{}"', attrs.items()),
+    )
+    variants = image_variants(path)
+    if not variants:
+        return img
+    sources = format_html_join(
+        "",
+        '<source type="image/{}" srcset="{}">',
+        ((fmt, static(variant)) for fmt, variant in variants),
+    )
+    # display: contents keeps the <img> sized by the surrounding layout
+    return format_html(
+        '<picture style="display: contents">{}{}</picture>', sources, img
+    )
+
+
+@register.simple_tag
+def background_image(path: str) -> str:
+    """Inline ``background-image`` declarations preferring AVIF/WebP."""
+    css = format_html("background-image: url('{}');", static(path))
+    variants = image_variants(path)
+    if not variants:
+        return css
+    extension = posixpath.splitext(path)[1].lstrip(".").lower()
+    fallback = ({"jpg": "jpeg"}.get(extension, extension), path)
+    image_set = format_html_join(
+        ", ",
+        "url('{}') type('image/{}')",
+        ((static(variant), fmt) for fmt, variant in (*variants, fallback)),
+    )
+    return format_html("{} background-image: image-set({});", css, image_set)
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from tasks.assets import build_assets
+from tasks.templatetags.assets import image_variants
+
+BUNDLES = {
+    "site.css": ("theme/css/theme.css",),
+    "site.js": ("js/theme.js",),
+}
+
+
+class BuildAssetsTest(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = self.root / "static"
+        self.files = {
+            "theme/css/theme.css": (
+                "@font-face { src: url('../fonts/icons.woff2?v=1'); }\n"
+                ".logo { background: url(data:image/png;base64,AAAA); }"
+            ),
+            "theme/fonts/icons.woff2": "font",
+            "js/theme.js": (
+                "var answer = 42;\n//# sourceMappingURL=theme.js.map"
+            ),
+            "js/page.js": "document.title = 'page';",
+            "js/unused.js": "unused();",
+        }
+        for path, content in self.files.items():
+            (self.source / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.source / path).write_text(content)
+        Image.new("RGB", (400, 200), "red").save(self.source / "hero.jpg")
+
+        templates = self.root / "templates"
+        templates.mkdir()
+        (templates / "page.html").write_text(
+            "{% load static assets %}"
+            "<script src=\"{% static 'js/page.js' %}\"></script>"
+            "{% picture 'hero.jpg' %}"
+        )
+        self.target = self.root / "build"
+        self.summary = build_assets(
+            self.source,
+            self.target,
+            [templates],
+            bundles=BUNDLES,
+            large_image_bytes=0,
+            max_image_width=100,
+        )
+
+    def test_only_referenced_files_are_copied(self):
+        self.assertTrue((self.target / "js/page.js").exists())
+        self.assertTrue((self.target / "theme/fonts/icons.woff2").exists())
+        self.assertFalse((self.target / "js/unused.js").exists())
+        self.assertFalse((self.target / "theme/css/theme.css").exists())
+
+    def test_bundles_are_rebased_and_minified(self):
+        css = (self.target / "bundles/site.css").read_text()
+        self.assertIn("url('../theme/fonts/icons.woff2?v=1')", css)
+        self.assertIn("url(data:image/png;base64,AAAA)", css)
+        self.assertNotIn("\n", css)
+        js = (self.target / "bundles/site.js").read_text()
+        self.assertIn("var answer=42", js)
+        self.assertNotIn("sourceMappingURL", js)
+
+    def test_large_images_get_right_sized_variants(self):
+        for name in ("hero.jpg", "hero.webp", "hero.avif"):
+            with Image.open(self.target / name) as image:
+                self.assertEqual(image.size, (100, 50))
+        self.assertEqual(
+            set(self.summary["images"]["hero.jpg"][1]),
+            {"avif", "webp", "jpg"},
+        )
+
+
+class AssetTagsTest(SimpleTestCase):
+    def render(self, template):
+        return Template("{% load assets %}" + template).render(Context())
+
+    def test_bundle_renders_sources_during_development(self):
+        html = self.render('{% bundle "site.js" %}')
+        self.assertIn("js/core/bootstrap.min.js", html)
+        self.assertNotIn("bundles/", html)
+
+    @override_settings(ASSET_BUNDLES=True)
+    def test_bundle_renders_single_file(self):
+        html = self.render('{% bundle "site.css" %}')
+        self.assertHTMLEqual(
+            html, '<link href="/static/bundles/site.css" rel="stylesheet">'
+        )
+
+    def test_picture_without_variants(self):
+        image_variants.cache_clear()
+        html = self.render("{% picture 'img/login.jpg' class='w-100' %}")
+        self.assertHTMLEqual(
+            html, '<img src="/static/img/login.jpg" class="w-100">'
+        )
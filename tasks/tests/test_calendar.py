@@ -0,0 +1,324 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.events import event_scope
+from tasks.feeds import feed_key
+from tasks.ical import fold
+from tasks.models import Project, Task, TaskType
+from tasks.schedule import task_deadline_counts, tasks_due_on
+
+
+class CalendarTestMixin:
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            username="test_user",
+            password="Password123!"
+        )
+        self.client.force_login(self.user)
+        self.task_type = TaskType.objects.create(name="Review")
+        # a day well in the future, deadlines can't be in the past
+        self.day = timezone.localdate() + datetime.timedelta(days=60)
+
+    def at(self, day, hour, minute=0):
+        return timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time(hour, minute))
+        )
+
+    def create_task(self, name, deadline, **kwargs):
+        return Task.objects.create(
+            name=name, type=self.task_type, deadline=deadline, **kwargs
+        )
+
+
+class ScheduleTest(CalendarTestMixin, TestCase):
+    def test_counts_per_day(self):
+        next_day = self.day + datetime.timedelta(days=1)
+        self.create_task("Early", self.at(self.day, 0, 0))
+        self.create_task("Late", self.at(self.day, 23, 59))
+        done = self.create_task("Done", self.at(self.day, 12))
+        done.is_completed = True
+        done.save()
+        self.create_task("Next", self.at(next_day, 9))
+
+        with self.assertNumQueries(1):
+            counts = task_deadline_counts(self.day, next_day)
+        self.assertEqual(counts, {
+            self.day: {"total": 3, "completed": 1},
+            next_day: {"total": 1, "completed": 0},
+        })
+
+    @override_settings(TIME_ZONE="America/New_York")
+    def test_days_follow_the_current_time_zone(self):
+        # 02:00 UTC is still the previous evening in New York
+        utc_deadline = datetime.datetime.combine(
+            self.day, datetime.time(2), tzinfo=datetime.timezone.utc
+        )
+        self.create_task("Evening", utc_deadline)
+        previous_day = self.day - datetime.timedelta(days=1)
+
+        self.assertEqual(
+            list(task_deadline_counts(previous_day, self.day)),
+            [previous_day],
+        )
+        self.assertQuerySetEqual(
+            tasks_due_on(previous_day).values_list("name", flat=True),
+            ["Evening"],
+        )
+
+
+class CalendarViewTest(CalendarTestMixin, TestCase):
+    def month_url(self, day):
+        return reverse(
+            "tasks:task-calendar-month",
+            kwargs={"year": day.year, "month": day.month},
+        )
+
+    def test_month_shows_counts_without_task_rows(self):
+        self.create_task("Write report", self.at(self.day, 10))
+        self.create_task("Send report", self.at(self.day, 11))
+
+        response = self.client.get(self.month_url(self.day))
+
+        self.assertContains(response, "2 tasks")
+        self.assertNotContains(response, "Write report")
+        self.assertIsNone(response.context["day_tasks"])
+
+    def test_expanded_day_lists_its_tasks(self):
+        self.create_task("Write report", self.at(self.day, 10))
+        other = self.day + datetime.timedelta(days=1)
+        self.create_task("Other day", self.at(other, 10))
+
+        response = self.client.get(
+            self.month_url(self.day), {"day": self.day.isoformat()}
+        )
+        self.assertContains(response, "Write report")
+        self.assertNotContains(response, "Other day")
+
+        response = self.client.get(
+            self.month_url(self.day),
+            {"day": self.day.isoformat()},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertTemplateUsed(response, "tasks/partials/calendar_day.html")
+        self.assertTemplateNotUsed(response, "tasks/task_calendar.html")
+
+    def test_invalid_month_and_day(self):
+        response = self.client.get(
+            reverse(
+                "tasks:task-calendar-month",
+                kwargs={"year": 2026, "month": 13},
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse("tasks:task-calendar"), {"day": "tomorrow"}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            reverse("tasks:task-calendar"), {"day": "9999-12-31"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_timeline_groups_projects_by_month(self):
+        Project.objects.create(name="Launch", deadline=self.day)
+        later = self.day + datetime.timedelta(days=400)
+        Project.objects.create(name="Someday", deadline=later)
+
+        response = self.client.get(
+            reverse("tasks:project-timeline"),
+            {"start": self.day.isoformat()},
+        )
+
+        months = response.context["months"]
+        self.assertEqual(months[0]["month"], self.day.replace(day=1))
+        self.assertEqual(
+            [project.name for project in months[0]["projects"]], ["Launch"]
+        )
+        self.assertNotContains(response, "Someday")
+
+
+class CalendarFeedTest(CalendarTestMixin, TestCase):
+    def test_feed_streams_tasks_and_projects(self):
+        self.create_task(
+            "Ship, finally; really", self.at(self.day, 10, 30),
+            description="Line one\nLine two",
+        )
+        Project.objects.create(name="Launch", deadline=self.day)
+
+        response = self.client.get(reverse("tasks:calendar-feed"))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Type"], "text/calendar; charset=utf-8"
+        )
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+        self.assertIn(
+            "DTSTART:" + self.day.strftime("%Y%m%d") + "T103000Z", body
+        )
+        self.assertIn("SUMMARY:Ship\\, finally\\; really", body)
+        self.assertIn("DESCRIPTION:Line one\\nLine two", body)
+        self.assertIn(
+            "DTSTART;VALUE=DATE:" + self.day.strftime("%Y%m%d"), body
+        )
+
+    def test_feed_range(self):
+        self.create_task("Inside", self.at(self.day, 10))
+        self.create_task(
+            "Outside", self.at(self.day + datetime.timedelta(days=2), 10)
+        )
+
+        response = self.client.get(
+            reverse("tasks:calendar-feed"),
+            {"from": self.day.isoformat(), "to": self.day.isoformat()},
+        )
+
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("Inside", body)
+        self.assertNotIn("Outside", body)
+
+    def test_feed_range_is_bounded(self):
+        for params in (
+                {"to": "9999-12-31"},
+                {"from": "2020-01-01", "to": "2030-01-01"},
+        ):
+            with self.subTest(**params):
+                response = self.client.get(
+                    reverse("tasks:calendar-feed"), params
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_long_lines_are_folded(self):
+        folded = fold("SUMMARY:" + "ä" * 80)
+
+        lines = folded.split("\r\n")
+        self.assertEqual(lines[-1], "")
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertTrue(all(line.startswith(" ") for line in lines[1:-1]))
+        self.assertEqual(
+            "".join(line[1:] if i else line for i, line in enumerate(lines)),
+            "SUMMARY:" + "ä" * 80,
+        )
+
+
+class WorkerFeedTest(CalendarTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse(
+            "tasks:worker-calendar-feed", args=[feed_key(self.user)]
+        )
+        self.mine = self.create_task("Mine", self.at(self.day, 9))
+        self.other = self.create_task("Not mine", self.at(self.day, 10))
+        with event_scope():
+            self.mine.assignees.add(self.user)
+        self.client.logout()
+
+    def fetch(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(
+            response["Content-Type"], "text/calendar; charset=utf-8"
+        )
+        return response
+
+    def test_feed_lists_assigned_tasks(self):
+        response = self.fetch()
+
+        body = response.content.decode().replace("\r\n ", "")
+        self.assertIn("SUMMARY:Mine", body)
+        self.assertNotIn("Not mine", body)
+        self.assertIn("X-SYNC-TOKEN:" + response["X-Sync-Token"], body)
+        self.assertTrue(response["ETag"].startswith('"'))
+
+    def test_feed_is_cached_until_assignments_change(self):
+        etag = self.fetch()["ETag"]
+
+        # only the key is checked against the database
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with event_scope():
+            self.other.assignees.add(self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Not mine", response.content.decode())
+
+    def test_unrelated_changes_keep_the_feed(self):
+        etag = self.fetch()["ETag"]
+
+        with event_scope():
+            self.other.name = "Still not mine"
+            self.other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_sync_token_returns_changes_only(self):
+        token = self.fetch()["X-Sync-Token"]
+        with self.assertNumQueries(1):
+            response = self.fetch(**{"sync-token": token})
+        self.assertNotIn("BEGIN:VEVENT", response.content.decode())
+
+        later = self.create_task("Later", self.at(self.day, 11))
+        with event_scope():
+            later.assignees.add(self.user)
+            self.mine.assignees.remove(self.user)
+            self.other.name = "Still not mine"
+            self.other.save()
+
+        response = self.fetch(**{"sync-token": token})
+        body = response.content.decode()
+        self.assertIn("SUMMARY:Later", body)
+        self.assertIn(f"UID:task-{self.mine.pk}@testserver", body)
+        self.assertIn("STATUS:CANCELLED", body)
+        self.assertNotIn("Still not mine", body)
+        self.assertNotEqual(response["X-Sync-Token"], token)
+
+    def test_deleted_task_is_cancelled(self):
+        token = self.fetch()["X-Sync-Token"]
+        pk = self.mine.pk
+
+        with event_scope():
+            self.mine.delete()
+
+        body = self.fetch(**{"sync-token": token}).content.decode()
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:task-{pk}@testserver", body)
+        self.assertIn("STATUS:CANCELLED", body)
+
+    def test_invalid_key_and_token(self):
+        response = self.client.get(
+            reverse("tasks:worker-calendar-feed", args=["bogus"])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.url, {"sync-token": "bogus"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_reset_revokes_the_old_url(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("tasks:worker-feed-reset"))
+        self.assertRedirects(response, self.user.get_absolute_url())
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.user.refresh_from_db()
+        response = self.client.get(
+            reverse("tasks:worker-calendar-feed", args=[feed_key(self.user)])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(WORKER_FEED_CACHE_TIMEOUT=0, CACHE_VERSION_TIMEOUT=0)
+    def test_feed_expires_without_a_shared_cache(self):
+        self.fetch()
+
+        # a change whose invalidation only reached another process
+        Task.objects.filter(pk=self.mine.pk).update(name="Renamed")
+
+        self.assertIn("SUMMARY:Renamed", self.fetch().content.decode())
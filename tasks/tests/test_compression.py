@@ -0,0 +1,103 @@
+import gzip
+import tempfile
+from io import StringIO
+
+import brotli
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from tasks.middleware import CompressionMiddleware
+from tasks.storage import LenientManifestStaticFilesStorage
+
+PAGE = b"<html><body>" + b"<p>Task list row</p>" * 100 + b"</body></html>"
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept_encoding="gzip, deflate, br"):
+        middleware = CompressionMiddleware(lambda request: response)
+        request = self.factory.get(
+            "/tasks/", headers={"accept-encoding": accept_encoding}
+        )
+        return middleware(request)
+
+    def test_brotli_preferred(self):
+        response = self.process(HttpResponse(PAGE))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), PAGE)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_gzip_fallback(self):
+        response = self.process(HttpResponse(PAGE), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), PAGE)
+
+    def test_streaming_response(self):
+        response = self.process(
+            StreamingHttpResponse(iter([PAGE[:100], PAGE[100:]]))
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(brotli.decompress(b"".join(chunks)), PAGE)
+
+    def test_skips_small_and_binary_responses(self):
+        small = self.process(HttpResponse(b"<p>ok</p>"))
+        self.assertFalse(small.has_header("Content-Encoding"))
+        image = self.process(HttpResponse(PAGE, content_type="image/png"))
+        self.assertFalse(image.has_header("Content-Encoding"))
+        stream = self.process(
+            StreamingHttpResponse(
+                iter([PAGE]), content_type="text/event-stream"
+            )
+        )
+        self.assertFalse(stream.has_header("Content-Encoding"))
+
+    def test_savings_are_logged(self):
+        with self.assertLogs("tasks.compression", "INFO") as logs:
+            self.process(HttpResponse(PAGE))
+        self.assertIn(f"GET /tasks/: {len(PAGE)} ->", logs.output[0])
+
+    def test_compression_report(self):
+        get_user_model().objects.create_user(
+            username="test_user", password="Password123!"
+        )
+        out = StringIO()
+        call_command(
+            "compression_report",
+            reverse("tasks:task-list"),
+            user="test_user",
+            stdout=out,
+        )
+        self.assertIn("/tasks/ [200]:", out.getvalue())
+        self.assertIn("saved", out.getvalue())
+
+
+class LenientStorageTest(TestCase):
+    def test_missing_references_are_left_alone(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        storage = LenientManifestStaticFilesStorage(location=root.name)
+        storage.save("logo.svg", ContentFile(b"<svg></svg>"))
+        storage.save("site.css", ContentFile(
+            b".logo{background:url(logo.svg)}"
+            b".add{background:url(missing.svg)}\n"
+            b"/*# sourceMappingURL=site.css.map */"
+        ))
+
+        list(storage.post_process({
+            name: (storage, name) for name in ("logo.svg", "site.css")
+        }))
+
+        with storage.open(storage.stored_name("site.css")) as css:
+            content = css.read().decode()
+        self.assertIn(storage.stored_name("logo.svg"), content)
+        self.assertIn('url("missing.svg")', content)
+        self.assertIn("sourceMappingURL=site.css.map", content)
+
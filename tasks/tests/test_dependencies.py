@@ -0,0 +1,200 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.dependencies import analyze, project_graph, validate_blockers
+from tasks.events import event_scope
+from tasks.forms import TaskUpdateForm
+from tasks.models import Project, Task, TaskType
+from tasks.services import toggle_task_completed
+
+
+class AnalyzeTest(TestCase):
+    def test_order_and_critical_path(self):
+        # 10 <- 11 <- 13, 12 <- 13, 14 on its own
+        ids = [10, 11, 12, 13, 14]
+        blocked_by = [[], [0], [], [1, 2], []]
+
+        result = analyze(ids, [False] * 5, blocked_by)
+
+        self.assertEqual(result["order"], [10, 12, 14, 11, 13])
+        self.assertEqual(result["cycle"], [])
+        self.assertEqual(result["critical_path"], [10, 11, 13])
+
+    def test_completed_tasks_are_off_the_critical_path(self):
+        ids = [10, 11, 12, 13]
+        blocked_by = [[], [0], [1], []]
+
+        result = analyze(ids, [True, True, False, True], blocked_by)
+
+        self.assertEqual(result["critical_path"], [12])
+
+    def test_cycle(self):
+        ids = [10, 11, 12, 13]
+        blocked_by = [[], [2], [1], [2]]
+
+        result = analyze(ids, [False] * 4, blocked_by)
+
+        self.assertEqual(result["order"], [10])
+        self.assertEqual(sorted(result["cycle"]), [11, 12])
+
+
+class DependencyTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.deadline = timezone.now() + timezone.timedelta(days=1)
+        self.task_type = TaskType.objects.create(name="Review")
+        self.project = Project.objects.create(
+            name="Launch",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+        )
+
+    def create_task(self, name, project=None, blocked_by=()):
+        task = Task.objects.create(
+            name=name,
+            type=self.task_type,
+            deadline=self.deadline,
+            project=project or self.project,
+        )
+        task.blocked_by.add(*blocked_by)
+        return task
+
+    def chain(self, length):
+        tasks = [self.create_task("Task 0")]
+        for i in range(1, length):
+            tasks.append(self.create_task(f"Task {i}", blocked_by=tasks[-1:]))
+        return tasks
+
+
+class ProjectGraphTest(DependencyTestMixin, TestCase):
+    def test_graph_is_loaded_once_per_version(self):
+        first, second, third = self.chain(3)
+
+        with self.assertNumQueries(1):
+            graph = project_graph(self.project.pk)
+        with self.assertNumQueries(0):
+            project_graph(self.project.pk)
+        self.assertEqual(graph["order"], [first.pk, second.pk, third.pk])
+        self.assertEqual(
+            graph["critical_path"], [first.pk, second.pk, third.pk]
+        )
+
+        third.blocked_by.remove(second)
+        self.assertEqual(project_graph(self.project.pk)["critical_path"],
+                         [first.pk, second.pk])
+
+    def test_completion_updates_the_critical_path(self):
+        first, second = self.chain(2)
+        self.assertEqual(
+            project_graph(self.project.pk)["critical_path"],
+            [first.pk, second.pk],
+        )
+
+        with event_scope():
+            toggle_task_completed(first.pk)
+
+        self.assertEqual(
+            project_graph(self.project.pk)["critical_path"], [second.pk]
+        )
+
+    def test_cycle_check_is_one_query_for_long_chains(self):
+        tasks = self.chain(30)
+
+        with self.assertNumQueries(1):
+            with self.assertRaisesMessage(Exception, "form a cycle"):
+                validate_blockers(tasks[0], [tasks[-1]])
+        # only the chosen blockers' ancestors matter
+        validate_blockers(tasks[-1], [tasks[0]])
+
+    def test_cycle_check_ignores_the_cached_graph(self):
+        first, second = self.chain(2)
+        third = self.create_task("Task 2")
+        project_graph(self.project.pk)
+
+        # an edge whose invalidation only reached another process
+        Task.blocked_by.through.objects.create(
+            from_task=third, to_task=second
+        )
+
+        with self.assertRaisesMessage(Exception, "form a cycle"):
+            validate_blockers(first, [third])
+
+    def test_dependencies_view(self):
+        first, second = self.chain(2)
+        user = get_user_model().objects.create_superuser(
+            username="test_user", password="Password123!"
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(
+            reverse("tasks:project-dependencies", args=[self.project.pk])
+        )
+
+        self.assertEqual(response.json(), {
+            "project": self.project.pk,
+            "edges": [[second.pk, first.pk]],
+            "order": [first.pk, second.pk],
+            "critical_path": [first.pk, second.pk],
+            "cycle": [],
+        })
+
+        response = self.client.get(
+            reverse("tasks:project-dependencies", args=[self.project.pk + 1])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskDependencyFormTest(DependencyTestMixin, TestCase):
+    def form(self, task, blocked_by):
+        return TaskUpdateForm(
+            instance=task,
+            data={
+                "name": task.name,
+                "priority": task.priority,
+                "deadline": timezone.localtime(self.deadline).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "type": task.type_id,
+                "project": task.project_id,
+                "blocked_by": [blocker.pk for blocker in blocked_by],
+            },
+        )
+
+    def test_valid_dependencies_are_saved(self):
+        first, second = self.chain(2)
+        third = self.create_task("Task 2")
+
+        form = self.form(third, [first, second])
+
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertQuerySetEqual(
+            third.blocked_by.order_by("pk"), [first, second]
+        )
+
+    def test_cycles_are_rejected(self):
+        first, second, third = self.chain(3)
+
+        form = self.form(first, [third])
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["blocked_by"],
+            ["These dependencies would form a cycle."],
+        )
+        self.assertFalse(self.form(first, [first]).is_valid())
+
+    def test_blockers_from_other_projects_are_rejected(self):
+        other = Project.objects.create(
+            name="Other",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+        )
+        task = self.create_task("Task")
+        outsider = self.create_task("Outsider", project=other)
+
+        form = self.form(task, [outsider])
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("same project", form.errors["blocked_by"][0])
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.digests import send_digests, worker_digests
+from tasks.models import Task, TaskType
+
+
+class DeadlineDigestTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.task_type = TaskType.objects.create(name="Review")
+        self.alice = self.create_worker("alice", "alice@example.com")
+        self.bob = self.create_worker("bob", "bob@example.com")
+
+    def create_worker(self, username, email, **kwargs):
+        return get_user_model().objects.create_user(
+            username=username,
+            email=email,
+            password="Password123!",
+            **kwargs,
+        )
+
+    def create_task(self, name, hours, *assignees, **kwargs):
+        task = Task.objects.create(
+            name=name,
+            type=self.task_type,
+            deadline=self.now + timezone.timedelta(days=30),
+            **kwargs,
+        )
+        # deadlines can't be set in the past through the model
+        Task.objects.filter(pk=task.pk).update(
+            deadline=self.now + timezone.timedelta(hours=hours)
+        )
+        task.assignees.add(*assignees)
+        return task
+
+    def test_digests_group_tasks_per_worker(self):
+        self.create_task("Late", -5, self.alice)
+        self.create_task("Soon", 5, self.alice, self.bob)
+        self.create_task("Sooner", 1, self.alice)
+        self.create_task("Far", 24 * 10, self.alice)
+        self.create_task("Done", 5, self.alice, is_completed=True)
+        self.create_task("Nobody's", 5)
+
+        with self.assertNumQueries(1):
+            digests = list(worker_digests(self.now, days=3))
+
+        self.assertEqual(
+            [
+                (
+                    digest["worker"]["name"],
+                    [task["name"] for task in digest["overdue"]],
+                    [task["name"] for task in digest["upcoming"]],
+                )
+                for digest in digests
+            ],
+            [
+                ("alice", ["Late"], ["Sooner", "Soon"]),
+                ("bob", [], ["Soon"]),
+            ],
+        )
+
+    def test_workers_without_email_or_inactive_are_skipped(self):
+        no_email = self.create_worker("carol", "")
+        inactive = self.create_worker("dave", "d@example.com", is_active=False)
+        self.create_task("Soon", 5, no_email, inactive)
+
+        self.assertEqual(list(worker_digests(self.now)), [])
+
+    def test_send_over_one_connection(self):
+        self.create_task("Late", -5, self.alice)
+        self.create_task("Soon", 5, self.alice, self.bob)
+
+        with self.assertNumQueries(1):
+            report = send_digests(self.now, batch_size=1)
+
+        self.assertEqual(report["workers"], 2)
+        self.assertEqual(report["tasks"], 3)
+        self.assertEqual(len(mail.outbox), 2)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ["alice@example.com"])
+        self.assertEqual(message.subject, "Your tasks: 1 overdue, 1 due soon")
+        self.assertIn("Overdue:\n- Late", message.body)
+        self.assertIn("http://127.0.0.1:8000/tasks/", message.body)
+
+    def test_command_reports_throughput(self):
+        self.create_task("Soon", 5, self.alice)
+        out = StringIO()
+
+        call_command("send_deadline_digests", stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertRegex(out.getvalue(), r"1 workers, 1 tasks in .* workers/s")
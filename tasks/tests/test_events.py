@@ -0,0 +1,229 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.events import event_scope, record
+from tasks.middleware import TaskEventMiddleware
+from tasks.models import Task, TaskType, TaskEvent
+
+TASK_URL = reverse("tasks:task-list")
+
+
+class TaskEventModelTest(TestCase):
+    def setUp(self):
+        self.task_type = TaskType.objects.create(name="Test Type")
+        self.deadline = timezone.now() + timezone.timedelta(days=1)
+        self.worker = get_user_model().objects.create_user(
+            username="test_worker",
+            password="Password123!"
+        )
+
+    def test_create_and_change_are_logged_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name="Test Task",
+                deadline=self.deadline,
+                type=self.task_type,
+            )
+        task = Task.objects.get(pk=task.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.name = "Renamed"
+            task.is_completed = True
+            task.save()
+
+        timeline = list(TaskEvent.objects.timeline(task))
+        self.assertEqual(
+            [(event["kind"], event["field"]) for event in timeline],
+            [
+                (TaskEvent.Kind.CREATED, ""),
+                (TaskEvent.Kind.CHANGED, "name"),
+                (TaskEvent.Kind.COMPLETED, ""),
+            ],
+        )
+        self.assertEqual(timeline[1]["old_value"], "Test Task")
+        self.assertEqual(timeline[1]["new_value"], "Renamed")
+
+    def test_unchanged_save_is_not_logged(self):
+        task = Task.objects.create(
+            name="Test Task",
+            deadline=self.deadline,
+            type=self.task_type,
+        )
+        task = Task.objects.get(pk=task.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertFalse(TaskEvent.objects.exists())
+
+    def test_assignee_changes_are_logged(self):
+        # events of one transaction share a batch, commit the creation
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name="Test Task",
+                deadline=self.deadline,
+                type=self.task_type,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.worker)
+            self.worker.tasks.clear()
+
+        kinds = list(
+            TaskEvent.objects.timeline(task)
+            .filter(field="assignees")
+            .values_list("kind", flat=True)
+        )
+        self.assertEqual(
+            kinds, [TaskEvent.Kind.ASSIGNED, TaskEvent.Kind.UNASSIGNED]
+        )
+
+    def test_events_survive_task_deletion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name="Test Task",
+                deadline=self.deadline,
+                type=self.task_type,
+            )
+        task_id = task.pk
+        task.delete()
+        self.assertTrue(TaskEvent.objects.filter(task_id=task_id).exists())
+
+    def test_transaction_events_are_written_in_one_batch(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            task = Task.objects.create(
+                name="Test Task",
+                deadline=self.deadline,
+                type=self.task_type,
+            )
+            task.assignees.add(self.worker)
+            task.name = "Renamed"
+            task.save()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(TaskEvent.objects.filter(task=task).count(), 3)
+
+    def test_rolled_back_events_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name="Test Task",
+                deadline=self.deadline,
+                type=self.task_type,
+            )
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    task.assignees.add(self.worker)
+                    raise ValueError
+            task.name = "Renamed"
+            task.save()
+
+        self.assertEqual(
+            list(
+                TaskEvent.objects.timeline(task).values_list("kind", flat=True)
+            ),
+            [TaskEvent.Kind.CREATED, TaskEvent.Kind.CHANGED],
+        )
+
+    def test_failed_scope_writes_nothing(self):
+        task = Task.objects.create(
+            name="Test Task",
+            deadline=self.deadline,
+            type=self.task_type,
+        )
+        with self.assertRaises(ValueError):
+            with event_scope():
+                task.assignees.add(self.worker)
+                raise ValueError
+
+        self.assertFalse(TaskEvent.objects.exists())
+
+
+class TaskEventRequestTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.client.force_login(self.user)
+        self.task_type = TaskType.objects.create(name="Test Type")
+        self.task = Task.objects.create(
+            name="Test Task",
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            type=self.task_type,
+        )
+
+    def test_toggle_completed_logs_actor(self):
+        self.client.post(
+            TASK_URL + f"{self.task.id}/completed/", {"next": TASK_URL}
+        )
+        event = TaskEvent.objects.get(task=self.task)
+        self.assertEqual(event.kind, TaskEvent.Kind.COMPLETED)
+        self.assertEqual(event.actor, self.user)
+
+    def test_request_events_written_in_one_insert(self):
+        form_data = {
+            "is_completed": True,
+            "name": "Renamed",
+            "priority": Task.Priority.LOW.value,
+            "deadline": self.task.deadline.isoformat(),
+            "type": self.task_type.id,
+            "description": "New description",
+            "assignees": [self.user.id],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                TASK_URL + f"{self.task.id}/update/", data=form_data
+            )
+        inserts = [
+            query for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "tasks_taskevent"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(TaskEvent.objects.filter(task=self.task).count(), 5)
+
+    def test_task_timeline(self):
+        self.client.get(TASK_URL + f"{self.task.id}/take/")
+        response = self.client.get(TASK_URL + f"{self.task.id}/timeline/")
+        self.assertEqual(response.status_code, 200)
+        events = response.json()["events"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["kind"], TaskEvent.Kind.ASSIGNED)
+        self.assertEqual(events[0]["actor_id"], self.user.id)
+
+    def test_rolled_back_requests_write_no_events(self):
+        def view(request):
+            try:
+                with transaction.atomic():
+                    self.task.name = "Renamed"
+                    self.task.save()
+                    raise IntegrityError
+            except IntegrityError:
+                # the view swallows the failure and answers as usual
+                return HttpResponse("Could not rename the task.")
+
+        request = RequestFactory().get(TASK_URL)
+        request.user = self.user
+        response = TaskEventMiddleware(view)(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TaskEvent.objects.exists())
+
+    def test_committed_blocks_of_a_request_are_written(self):
+        def view(request):
+            with transaction.atomic():
+                record(self.task.pk, TaskEvent.Kind.COMPLETED)
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    record(self.task.pk, TaskEvent.Kind.REOPENED)
+                    raise ValueError
+            return HttpResponse(status=500)
+
+        request = RequestFactory().get(TASK_URL)
+        request.user = self.user
+        TaskEventMiddleware(view)(request)
+
+        self.assertEqual(
+            list(TaskEvent.objects.values_list("kind", flat=True)),
+            [TaskEvent.Kind.COMPLETED],
+        )
@@ -4,8 +4,8 @@ from django.urls import reverse
 from django.utils import timezone
 
 from tasks.forms import TaskSearchForm, WorkerCreationForm, TaskCreateForm, TaskUpdateForm, TaskTypeSearchForm, \
-    WorkerUpdateForm, PositionCreateForm, WorkerSearchForm, TeamCreateForm, ProjectCreateForm, ProjectUpdateForm, \
-    TeamSearchForm, TaskTypeCreateForm, TaskTypeUpdateForm, ProjectSearchForm, PositionSearchForm
+    WorkerUpdateForm, PositionCreateForm, WorkerSearchForm, TeamCreateForm, TeamUpdateForm, ProjectCreateForm, ProjectUpdateForm, \
+    TeamSearchForm, TaskTypeCreateForm, TaskTypeUpdateForm, ProjectSearchForm, PositionSearchForm, TaskAssignForm
 from tasks.models import Task, TaskType, Position, Project, Team
 from tasks.views import PositionUpdateView
 
@@ -103,6 +103,63 @@ class PrivateTaskFormsTest(TestCase):
         form = TaskUpdateForm(data=form_data, instance=self.task)
         self.assertTrue(form.is_valid())
 
+    def test_task_create_form_renders_without_choice_queries(self):
+        TaskType.objects.create(name="Other Type")
+        form = TaskCreateForm()
+        with self.assertNumQueries(0):
+            html = form.as_p()
+        self.assertNotIn("Test Type", html)
+        self.assertIn(
+            reverse("tasks:autocomplete", kwargs={"source": "task-types"}),
+            html,
+        )
+
+    def test_task_create_form_renders_selected_choice(self):
+        form = TaskCreateForm(data={"type": self.task_type.id})
+        html = form["type"].as_widget()
+        self.assertIn("Test Type", html)
+
+    def test_task_create_form_rejects_unknown_id(self):
+        form = TaskCreateForm(
+            data={
+                "name": "Task",
+                "deadline": self.deadline.isoformat(),
+                "type": 0,
+                "priority": Task.Priority.LOW,
+            }
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("type", form.errors)
+
+    def test_task_update_form_renders_only_selected_assignees(self):
+        other = get_user_model().objects.create_user(
+            username="not_selected",
+            password="PASSWORD123",
+        )
+        self.task.assignees.add(self.user)
+        html = TaskUpdateForm(instance=self.task)["assignees"].as_widget()
+        self.assertIn(self.user.username, html)
+        self.assertNotIn(other.username, html)
+        self.assertIn(reverse("tasks:worker-autocomplete"), html)
+
+    def test_task_assign_form_scopes_autocomplete_to_task(self):
+        form = TaskAssignForm(instance=self.task)
+        html = form["assignees"].as_widget()
+        self.assertIn(f"?task={self.task.id}", html)
+
+    def test_task_assign_form_validates_against_eligible_ids(self):
+        other = get_user_model().objects.create_user(
+            username="not_allowed",
+            password="PASSWORD123",
+        )
+        form = TaskAssignForm(
+            data={"assignees": [other.id]},
+            instance=self.task,
+            eligible_ids=frozenset([self.user.pk]),
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("cannot be assigned", form.errors["assignees"][0])
+
 
 class PrivateTaskTypeFormsTest(TestCase):
     def setUp(self):
@@ -310,6 +367,21 @@ class PrivateTeamFormsTest(TestCase):
         form = TeamCreateForm(data=form_data, instance=team)
         self.assertTrue(form.is_valid())
 
+    def test_team_update_form_saves_membership_diff(self):
+        team = Team.objects.create(name="Test Team")
+        worker = get_user_model().objects.create_user(
+            username="test_worker",
+            password="Password123!"
+        )
+        team.workers.add(worker)
+        form = TeamUpdateForm(
+            data={"name": team.name, "workers": [self.user.id]},
+            instance=team,
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(list(team.workers.all()), [self.user])
+
     def test_team_search_form_valid_data(self):
         name = "another"
         name2 = "just121214412"
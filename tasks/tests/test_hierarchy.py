@@ -0,0 +1,199 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.events import event_scope
+from tasks.hierarchy import subtask_counts, subtasks
+from tasks.models import Project, Task, TaskClosure, TaskEvent, TaskType
+from tasks.services import toggle_project_completed, toggle_task_completed
+
+
+class HierarchyTestMixin:
+    def setUp(self):
+        self.task_type = TaskType.objects.create(name="Review")
+        self.project = Project.objects.create(
+            name="Launch",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+        )
+        # root > child > grandchild, root > sibling
+        self.root = self.create_task("Root", project=self.project)
+        self.child = self.create_task("Child", parent=self.root)
+        self.grandchild = self.create_task("Grandchild", parent=self.child)
+        self.sibling = self.create_task("Sibling", parent=self.root)
+
+    def create_task(self, name, **kwargs):
+        return Task.objects.create(
+            name=name,
+            type=self.task_type,
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            **kwargs,
+        )
+
+    def reload(self, *tasks):
+        for task in tasks:
+            task.refresh_from_db()
+
+
+class ClosureTest(HierarchyTestMixin, TestCase):
+    def links(self):
+        return set(
+            TaskClosure.objects.values_list(
+                "ancestor__name", "descendant__name", "depth"
+            )
+        )
+
+    def test_links_are_kept_for_every_ancestor(self):
+        self.assertEqual(self.links(), {
+            ("Root", "Child", 1),
+            ("Root", "Grandchild", 2),
+            ("Child", "Grandchild", 1),
+            ("Root", "Sibling", 1),
+        })
+
+    def test_subtree_and_counts_are_single_queries(self):
+        with event_scope():
+            # completes the child as well
+            self.grandchild.is_completed = True
+            self.grandchild.save()
+
+        with self.assertNumQueries(1):
+            rows = list(subtasks(self.root).values_list("name", "depth"))
+        self.assertCountEqual(
+            rows, [("Child", 1), ("Grandchild", 2), ("Sibling", 1)]
+        )
+        with self.assertNumQueries(1):
+            counts = subtask_counts([self.root.pk, self.child.pk])
+        self.assertEqual(counts, {
+            self.root.pk: {"total": 3, "completed": 2},
+            self.child.pk: {"total": 1, "completed": 1},
+        })
+
+    def test_moving_a_subtree(self):
+        other = self.create_task("Other", project=self.project)
+
+        self.child.parent = other
+        self.child.save()
+
+        self.assertEqual(self.links(), {
+            ("Other", "Child", 1),
+            ("Other", "Grandchild", 2),
+            ("Child", "Grandchild", 1),
+            ("Root", "Sibling", 1),
+        })
+
+        self.child.parent = None
+        self.child.save()
+        self.assertEqual(self.links(), {
+            ("Child", "Grandchild", 1),
+            ("Root", "Sibling", 1),
+        })
+
+    def test_invalid_parents(self):
+        self.root.parent = self.grandchild
+        with self.assertRaisesMessage(ValidationError, "its own subtask"):
+            self.root.save()
+
+        self.child.parent = self.child
+        with self.assertRaisesMessage(ValidationError, "own subtask"):
+            self.child.save()
+
+        other = Project.objects.create(
+            name="Other",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+        )
+        with self.assertRaisesMessage(ValidationError, "parent's project"):
+            self.create_task("Elsewhere", parent=self.root, project=other)
+
+    def test_subtasks_get_their_parents_project(self):
+        self.reload(self.child, self.grandchild)
+        self.assertEqual(self.child.project, self.project)
+        self.assertEqual(self.grandchild.project, self.project)
+
+        orphan = self.create_task("Orphan")
+        orphan.parent = self.child
+        orphan.save(update_fields=["parent"])
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.project, self.project)
+
+    def test_tasks_with_subtasks_keep_their_project(self):
+        self.root.project = Project.objects.create(
+            name="Other",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+        )
+        with self.assertRaisesMessage(ValidationError, "subtasks"):
+            self.root.save()
+
+    def test_deleting_a_task_deletes_its_subtasks(self):
+        self.child.delete()
+
+        self.assertFalse(
+            Task.objects.filter(pk=self.grandchild.pk).exists()
+        )
+        self.assertEqual(self.links(), {("Root", "Sibling", 1)})
+
+
+class RollUpTest(HierarchyTestMixin, TestCase):
+    def test_task_with_open_subtasks_cannot_be_completed(self):
+        self.child.is_completed = True
+        with self.assertRaisesMessage(ValidationError, "uncompleted subtasks"):
+            self.child.save()
+
+        with self.assertRaisesMessage(ValidationError, "uncompleted subtasks"):
+            toggle_task_completed(self.root.pk)
+
+    def test_completion_rolls_up(self):
+        with event_scope():
+            toggle_task_completed(self.sibling.pk)
+            # the UPDATE of the task and one for all of its ancestors
+            with self.assertNumQueries(2):
+                toggle_task_completed(self.grandchild.pk)
+
+        self.reload(self.root, self.child)
+        self.assertTrue(self.child.is_completed)
+        self.assertTrue(self.root.is_completed)
+        self.assertEqual(
+            TaskEvent.objects.filter(
+                task=self.root, kind=TaskEvent.Kind.COMPLETED
+            ).count(),
+            1,
+        )
+
+    def test_open_siblings_stop_the_roll_up(self):
+        with event_scope():
+            toggle_task_completed(self.grandchild.pk)
+
+        self.reload(self.root, self.child)
+        self.assertTrue(self.child.is_completed)
+        self.assertFalse(self.root.is_completed)
+
+    def test_reopening_and_new_subtasks_reopen_ancestors(self):
+        with event_scope():
+            toggle_task_completed(self.sibling.pk)
+            toggle_task_completed(self.grandchild.pk)
+            toggle_task_completed(self.grandchild.pk)
+        self.reload(self.root, self.child)
+        self.assertFalse(self.child.is_completed)
+        self.assertFalse(self.root.is_completed)
+
+        with event_scope():
+            toggle_task_completed(self.grandchild.pk)
+            self.create_task("Late addition", parent=self.child)
+        self.reload(self.root, self.child)
+        self.assertFalse(self.child.is_completed)
+        self.assertFalse(self.root.is_completed)
+
+    def test_project_completion_counts_subtasks(self):
+        Task.objects.filter(
+            pk__in=[self.root.pk, self.child.pk, self.sibling.pk]
+        ).update(is_completed=True)
+        # the grandchild has no project of its own
+
+        self.project.is_completed = True
+        with self.assertRaisesMessage(ValidationError, "uncompleted tasks"):
+            self.project.save()
+        with self.assertRaisesMessage(ValidationError, "uncompleted tasks"):
+            toggle_project_completed(self.project.pk)
+
+        self.grandchild.is_completed = True
+        self.grandchild.save()
+        self.assertTrue(toggle_project_completed(self.project.pk))
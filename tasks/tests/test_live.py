@@ -0,0 +1,159 @@
+import json
+from contextlib import aclosing
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.events import event_scope
+from tasks.live import (
+    EventStreamResponse,
+    LocalBroker,
+    _matches,
+    event_stream,
+    get_broker,
+    task_updates,
+)
+from tasks.models import Project, Task, TaskEvent, TaskType, Team
+
+
+class LiveUpdatesTestMixin:
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.team = Team.objects.create(name="Core")
+        self.team.workers.add(self.user)
+        self.project = Project.objects.create(
+            name="Launch",
+            deadline=timezone.localdate() + timezone.timedelta(days=30),
+            team=self.team,
+        )
+        self.task = Task.objects.create(
+            name="Test Task",
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            type=TaskType.objects.create(name="Review"),
+            project=self.project,
+        )
+
+
+class TaskUpdatesTest(LiveUpdatesTestMixin, TestCase):
+    def test_events_become_compact_updates(self):
+        events = [
+            TaskEvent(task_id=self.task.pk, kind=TaskEvent.Kind.COMPLETED),
+            TaskEvent(
+                task_id=self.task.pk,
+                kind=TaskEvent.Kind.ASSIGNED,
+                field="assignees",
+                new_value=str(self.user.pk),
+            ),
+            # renames are not pushed, deleted tasks are left out
+            TaskEvent(task_id=self.task.pk, kind=TaskEvent.Kind.CHANGED),
+            TaskEvent(task_id=0, kind=TaskEvent.Kind.COMPLETED),
+        ]
+
+        updates = task_updates(
+            events, {self.task.pk: (self.project.pk, self.team.pk)}
+        )
+
+        base = {
+            "id": self.task.pk, "project": self.project.pk, "team": self.team.pk
+        }
+        self.assertEqual(updates, [
+            {**base, "kind": "completed"},
+            {**base, "kind": "assigned", "worker": self.user.pk},
+        ])
+
+    def test_filters(self):
+        update = {"id": 1, "kind": "created", "project": 2, "team": None}
+
+        self.assertTrue(_matches(update, set(), set()))
+        self.assertTrue(_matches(update, {2}, set()))
+        self.assertTrue(_matches(update, {3}, {None}))
+        self.assertFalse(_matches(update, {3}, {4}))
+        self.assertTrue(_matches({"kind": "resync"}, {3}, {4}))
+
+    def test_recorded_events_are_published(self):
+        self.client.force_login(self.user)
+
+        with mock.patch.object(LocalBroker, "publish") as publish:
+            self.client.post(
+                reverse("tasks:toggle-completed", args=[self.task.pk]),
+                {"next": reverse("tasks:task-list")},
+            )
+
+        publish.assert_called_once_with([{
+            "id": self.task.pk,
+            "kind": "completed",
+            "project": self.project.pk,
+            "team": self.team.pk,
+        }])
+
+    def test_list_rows_carry_task_ids_and_stream_url(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("tasks:task-list"), {"project": self.project.pk}
+        )
+
+        self.assertContains(response, f'data-task-id="{self.task.pk}"')
+        self.assertEqual(
+            response.context["live_url"],
+            reverse("tasks:task-updates") + f"?project={self.project.pk}",
+        )
+
+
+class TaskUpdatesStreamTest(LiveUpdatesTestMixin, TestCase):
+    url = reverse("tasks:task-updates")
+
+    def test_wsgi_requests_get_no_stream(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 204)
+
+    async def test_stream_sends_matching_updates(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            self.url, {"project": self.project.pk}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        update = {"id": 7, "kind": "created", "project": self.project.pk}
+        get_broker().publish([{**update, "project": 0, "team": None}])
+        get_broker().publish([{**update, "team": None}])
+        chunk = (await anext(stream)).decode()
+        # the test client only closes its wrapper, the server closes the
+        # stream itself and with it the subscription
+        await stream.aclose()
+        await response.stream.aclose()
+        self.assertFalse(get_broker()._subscriptions)
+
+        self.assertTrue(chunk.startswith("event: task\ndata: "))
+        self.assertEqual(
+            json.loads(chunk.split("data: ")[1]), {**update, "team": None}
+        )
+
+    async def test_response_closes_the_stream(self):
+        response = EventStreamResponse(event_stream(set(), set()))
+
+        # the way the ASGI handler consumes it
+        async with aclosing(aiter(response)) as content:
+            self.assertTrue((await anext(content)).startswith(b"retry:"))
+            self.assertTrue(get_broker()._subscriptions)
+
+        self.assertFalse(get_broker()._subscriptions)
+
+    def test_invalid_filter(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.url, {"team": "core"})
+
+        self.assertEqual(response.status_code, 400)
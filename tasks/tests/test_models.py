@@ -305,3 +305,72 @@ class ProjectTest(TestCase):
             deadline=timezone.now().date() + timezone.timedelta(days=10)
         )
         self.assertEqual(str(project), project.name)
+
+
+class ValidatedSaveTest(TestCase):
+    def setUp(self):
+        self.task_type = TaskType.objects.create(name="Test Type")
+        self.project = Project.objects.create(
+            name="Test Project",
+            deadline=timezone.now().date() + timezone.timedelta(days=10)
+        )
+        task = Task.objects.create(
+            name="Test Task",
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            type=self.task_type,
+            project=self.project,
+        )
+        self.task = Task.objects.get(pk=task.pk)
+
+    def test_task_full_save_queries(self):
+        # FK checks for type and project, the open subtask check for the
+        # completion, project fetch for the deadline check, the unique
+        # constraint check and the UPDATE itself
+        self.task.is_completed = True
+        with self.assertNumQueries(6):
+            self.task.save()
+
+    def test_task_save_update_fields_queries(self):
+        self.task.is_completed = True
+        # the open subtask check and the UPDATE
+        with self.assertNumQueries(2):
+            self.task.save(update_fields=["is_completed"])
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_completed)
+
+    def test_task_save_update_fields_validates_saved_fields(self):
+        self.task.deadline = timezone.now() - timezone.timedelta(days=1)
+        with self.assertRaises(ValidationError):
+            self.task.save(update_fields=["deadline"])
+
+    def test_task_with_passed_deadline_can_be_completed(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            deadline=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.task.refresh_from_db()
+        self.task.is_completed = True
+        self.task.save(update_fields=["is_completed"])
+        with self.assertRaises(ValidationError):
+            self.task.save()
+
+    def test_project_save_update_fields_checks_open_tasks(self):
+        self.project.is_completed = True
+        with self.assertRaises(ValidationError):
+            self.project.save(update_fields=["is_completed"])
+
+    def test_project_save_update_fields_queries(self):
+        self.project.is_completed = False
+        with self.assertNumQueries(1):
+            self.project.save(update_fields=["is_completed"])
+
+    def test_worker_save_update_fields_keeps_full_name(self):
+        worker = get_user_model().objects.create_user(
+            username="test_worker",
+            password="Password123!",
+        )
+        worker.first_name = "Test"
+        worker.last_name = "User"
+        with self.assertNumQueries(1):
+            worker.save(update_fields=["first_name", "last_name"])
+        worker.refresh_from_db()
+        self.assertEqual(worker.full_name, "User Test")
@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task, TaskType
+from tasks.pagination import (
+    EstimatedCountPaginator,
+    keyset_after,
+    keyset_ordering,
+    keyset_token,
+)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        TaskType.objects.bulk_create(
+            TaskType(name=f"Type {i}") for i in range(12)
+        )
+
+    def test_narrow_list_is_counted_exactly(self):
+        paginator = EstimatedCountPaginator(TaskType.objects.all(), 5)
+
+        self.assertEqual(paginator.count, 12)
+        self.assertFalse(paginator.is_estimate)
+        with self.assertNumQueries(1):
+            EstimatedCountPaginator(TaskType.objects.all(), 5).count
+
+    def test_large_count_is_cached(self):
+        with mock.patch.object(
+                EstimatedCountPaginator, "estimate_threshold", 10
+        ):
+            first = EstimatedCountPaginator(TaskType.objects.all(), 5)
+            self.assertEqual(first.count, 12)
+            self.assertFalse(first.is_estimate)
+
+            second = EstimatedCountPaginator(TaskType.objects.all(), 5)
+            with self.assertNumQueries(0):
+                self.assertEqual(second.count, 12)
+            self.assertTrue(second.is_estimate)
+
+    def test_filters_are_cached_separately(self):
+        with mock.patch.object(
+                EstimatedCountPaginator, "estimate_threshold", 10
+        ):
+            EstimatedCountPaginator(TaskType.objects.all(), 5).count
+            filtered = EstimatedCountPaginator(
+                TaskType.objects.filter(name__endswith="1"), 5
+            )
+            self.assertEqual(filtered.count, 2)
+            self.assertFalse(filtered.is_estimate)
+
+    def test_pages_past_a_short_estimate_are_reachable(self):
+        paginator = EstimatedCountPaginator(TaskType.objects.all(), 5)
+        # an estimate of 5 rows where there are 12
+        paginator.count = 5
+        paginator.is_estimate = True
+
+        second = paginator.page(2)
+        third = paginator.page(3)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+        self.assertEqual(len(second), 5)
+        self.assertTrue(second.has_next())
+        self.assertEqual(len(third), 2)
+        self.assertFalse(third.has_next())
+        self.assertEqual(third.end_index(), 12)
+
+    def test_lists_are_counted_directly(self):
+        paginator = EstimatedCountPaginator(list(range(12)), 5)
+
+        self.assertEqual(paginator.count, 12)
+        self.assertFalse(paginator.is_estimate)
+
+    def test_list_view_shows_approximate_page_count(self):
+        user = get_user_model().objects.create_user(
+            username="test_user", password="Password123!"
+        )
+        self.client.force_login(user)
+        url = reverse("tasks:task-type-list")
+
+        with mock.patch.object(
+                EstimatedCountPaginator, "estimate_threshold", 10
+        ):
+            response = self.client.get(url)
+            self.assertContains(response, "3 pages")
+            self.assertNotContains(response, "about 3 pages")
+
+            response = self.client.get(url)
+            self.assertContains(response, "about 3 pages")
+
+
+class KeysetTokenTest(TestCase):
+    def setUp(self):
+        task_type = TaskType.objects.create(name="Type")
+        deadline = timezone.now()
+        # shared deadlines, the pk has to break the ties
+        Task.objects.bulk_create(
+            Task(
+                name=f"Task {i}",
+                type=task_type,
+                deadline=deadline + timezone.timedelta(days=i // 2),
+            )
+            for i in range(7)
+        )
+
+    def walk(self, queryset, size):
+        token, seen = None, []
+        while True:
+            batch = keyset_after(queryset, token) if token else (
+                queryset.order_by(*keyset_ordering(queryset))
+            )
+            rows = list(batch[:size])
+            seen.extend(row.name for row in rows)
+            if len(rows) < size:
+                return seen
+            token = keyset_token(queryset, rows[-1])
+
+    def test_ordering_is_made_total(self):
+        self.assertEqual(
+            keyset_ordering(Task.objects.all()), ["deadline", "pk"]
+        )
+        self.assertEqual(
+            keyset_ordering(Task.objects.order_by("-deadline")),
+            ["-deadline", "pk"],
+        )
+
+    def test_batches_cover_every_row_once(self):
+        for queryset in (
+                Task.objects.all(), Task.objects.order_by("-deadline")
+        ):
+            expected = list(
+                queryset.order_by(*keyset_ordering(queryset))
+                .values_list("name", flat=True)
+            )
+            self.assertEqual(self.walk(queryset, 2), expected)
+
+    def test_token_of_other_ordering_is_rejected(self):
+        token = keyset_token(Task.objects.all(), Task.objects.first())
+
+        with self.assertRaises(signing.BadSignature):
+            keyset_after(Task.objects.order_by("-deadline"), token)
+        with self.assertRaises(signing.BadSignature):
+            keyset_after(TaskType.objects.all(), token)
+        with self.assertRaises(signing.BadSignature):
+            keyset_after(Task.objects.all(), token[:-2] + "xx")
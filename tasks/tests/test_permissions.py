@@ -0,0 +1,246 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Project, Task, TaskType, Team
+from tasks.permissions import (
+    accessible,
+    request_access,
+    resolve_access,
+    worker_access,
+)
+from tasks.services import sync_team_members
+
+
+class AccessTestMixin:
+    def setUp(self):
+        cache.clear()
+        worker_model = get_user_model()
+        self.user = worker_model.objects.create_user(
+            username="member", password="Password123!"
+        )
+        self.other = worker_model.objects.create_user(
+            username="other", password="Password123!"
+        )
+        deadline = timezone.localdate() + timezone.timedelta(days=30)
+        self.team = Team.objects.create(name="Core")
+        self.team.workers.add(self.user)
+        self.led_team = Team.objects.create(name="Led", leader=self.user)
+        self.foreign_team = Team.objects.create(name="Foreign")
+        self.team_project = Project.objects.create(
+            name="Team project", deadline=deadline, team=self.team
+        )
+        self.led_project = Project.objects.create(
+            name="Led project", deadline=deadline, leader=self.user
+        )
+        self.foreign_project = Project.objects.create(
+            name="Foreign project", deadline=deadline, team=self.foreign_team
+        )
+        task_type = TaskType.objects.create(name="Review")
+        self.task, self.foreign_task, self.free_task = (
+            Task.objects.create(
+                name=name,
+                type=task_type,
+                deadline=timezone.now() + timezone.timedelta(days=1),
+                project=project,
+            )
+            for name, project in (
+                ("Team task", self.team_project),
+                ("Foreign task", self.foreign_project),
+                ("Free task", None),
+            )
+        )
+
+
+class AccessTest(AccessTestMixin, TestCase):
+    def test_resolve_access(self):
+        with self.assertNumQueries(2):
+            access = resolve_access(self.user.pk)
+
+        self.assertEqual(access, {
+            "projects": {self.team_project.pk, self.led_project.pk},
+            "teams": {self.team.pk, self.led_team.pk},
+        })
+
+    def test_access_is_cached_until_memberships_change(self):
+        worker_access(self.user)
+        worker_access(self.other)
+        with self.assertNumQueries(0):
+            worker_access(self.user)
+
+        self.foreign_team.workers.add(self.other)
+        with self.assertNumQueries(0):
+            worker_access(self.user)
+        self.assertIn(
+            self.foreign_project.pk, worker_access(self.other)["projects"]
+        )
+
+        sync_team_members(self.team, [])
+        self.assertEqual(
+            worker_access(self.user)["projects"], {self.led_project.pk}
+        )
+
+    @override_settings(ACCESS_CACHE_TIMEOUT=0, CACHE_VERSION_TIMEOUT=0)
+    def test_access_expires_without_a_shared_cache(self):
+        worker_access(self.user)
+
+        # a removal whose invalidation only reached another process
+        Team.workers.through.objects.filter(team=self.team).delete()
+
+        self.assertEqual(
+            worker_access(self.user)["projects"], {self.led_project.pk}
+        )
+
+    def test_access_follows_leaders(self):
+        worker_access(self.user)
+
+        self.foreign_project.leader = self.user
+        self.foreign_project.save()
+
+        self.assertIn(
+            self.foreign_project.pk, worker_access(self.user)["projects"]
+        )
+
+    def test_superusers_have_access_to_everything(self):
+        self.user.is_superuser = True
+
+        self.assertIsNone(worker_access(self.user))
+
+    def test_querysets_are_filtered_once_per_request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+
+        with self.assertNumQueries(2):
+            request_access(request)
+        with self.assertNumQueries(2):
+            tasks = set(accessible(Task.objects.all(), request))
+            teams = set(accessible(Team.objects.all(), request))
+
+        self.assertEqual(tasks, {self.task, self.free_task})
+        self.assertEqual(teams, {self.team, self.led_team})
+
+
+class AccessViewTest(AccessTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_lists_only_show_accessible_objects(self):
+        response = self.client.get(reverse("tasks:project-list"))
+        self.assertEqual(
+            set(response.context["project_list"]),
+            {self.team_project, self.led_project},
+        )
+
+        response = self.client.get(reverse("tasks:task-list"))
+        self.assertEqual(
+            set(response.context["task_list"]), {self.task, self.free_task}
+        )
+
+        response = self.client.get(
+            reverse("tasks:autocomplete", kwargs={"source": "projects"}),
+            {"term": "project"},
+        )
+        self.assertEqual(
+            {result["id"] for result in response.json()["results"]},
+            {self.team_project.pk, self.led_project.pk},
+        )
+
+    def test_inaccessible_objects_are_not_found(self):
+        urls = [
+            reverse("tasks:project-detail", args=[self.foreign_project.pk]),
+            reverse("tasks:project-update", args=[self.foreign_project.pk]),
+            reverse("tasks:project-metrics", args=[self.foreign_project.pk]),
+            reverse("tasks:team-detail", args=[self.foreign_team.pk]),
+            reverse("tasks:task-detail", args=[self.foreign_task.pk]),
+            reverse("tasks:task-timeline", args=[self.foreign_task.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.assertEqual(
+            self.client.get(
+                reverse("tasks:project-detail", args=[self.led_project.pk])
+            ).status_code,
+            200,
+        )
+
+    def test_worker_page_only_lists_accessible_objects(self):
+        self.foreign_task.assignees.add(self.other)
+        self.task.assignees.add(self.other)
+        self.foreign_team.workers.add(self.other)
+        self.team.workers.add(self.other)
+        self.foreign_project.leader = self.other
+        self.foreign_project.save()
+
+        response = self.client.get(
+            reverse("tasks:worker-detail", args=[self.other.pk])
+        )
+
+        self.assertEqual(list(response.context["tasks"]), [self.task])
+        self.assertEqual(list(response.context["teams"]), [self.team])
+        self.assertNotIn("projects", response.context)
+
+    def test_inaccessible_tasks_cannot_be_toggled(self):
+        response = self.client.post(
+            reverse("tasks:toggle-completed", args=[self.foreign_task.pk])
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.foreign_task.refresh_from_db()
+        self.assertFalse(self.foreign_task.is_completed)
+
+        self.client.post(
+            reverse("tasks:toggle-completed", args=[self.free_task.pk]),
+            {"next": reverse("tasks:task-list")},
+        )
+        self.free_task.refresh_from_db()
+        self.assertTrue(self.free_task.is_completed)
+
+    def test_subtasks_of_inaccessible_tasks_are_hidden(self):
+        subtask = Task.objects.create(
+            name="Foreign subtask",
+            type=self.foreign_task.type,
+            deadline=self.foreign_task.deadline,
+            parent=self.foreign_task,
+        )
+
+        response = self.client.get(
+            reverse("tasks:task-detail", args=[subtask.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(
+            reverse("tasks:toggle-completed", args=[subtask.pk]),
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        self.assertEqual(response.status_code, 404)
+        subtask.refresh_from_db()
+        self.foreign_task.refresh_from_db()
+        self.assertFalse(subtask.is_completed)
+        self.assertFalse(self.foreign_task.is_completed)
+
+    def test_forms_only_offer_accessible_projects(self):
+        response = self.client.post(
+            reverse("tasks:task-update", args=[self.task.pk]),
+            {
+                "name": self.task.name,
+                "priority": self.task.priority,
+                "deadline": self.task.deadline.isoformat(),
+                "type": self.task.type_id,
+                "project": self.foreign_project.pk,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("project", response.context["form"].errors)
+
+    def test_new_projects_are_led_by_their_creator(self):
+        response = self.client.get(reverse("tasks:project-create"))
+
+        self.assertEqual(
+            response.context["form"].initial["leader"], self.user.pk
+        )
@@ -0,0 +1,168 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.events import event_scope
+from tasks.models import Project, RecurringTask, Task, TaskEvent, TaskType
+from tasks.recurrence import materialize, occurrences
+
+
+class RecurringTaskTestMixin:
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.task_type = TaskType.objects.create(name="Maintenance")
+        self.project = Project.objects.create(
+            name="Servers",
+            deadline=self.today + datetime.timedelta(days=365),
+        )
+        self.worker = get_user_model().objects.create_user(
+            username="test_worker",
+            password="Password123!"
+        )
+
+    def create_template(self, **kwargs):
+        fields = {
+            "name": "Patch servers",
+            "type": self.task_type,
+            "project": self.project,
+            "starts_on": self.today + datetime.timedelta(days=1),
+            **kwargs,
+        }
+        return RecurringTask.objects.create(**fields)
+
+
+class OccurrencesTest(RecurringTaskTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # only kept in memory, the rules below are about fixed dates
+        self.project.deadline = datetime.date(2031, 12, 31)
+
+    def days(self, template, first, last):
+        return [
+            day.isoformat() for day in occurrences(template, first, last)
+        ]
+
+    def test_weekly_every_other_week(self):
+        template = self.create_template(
+            starts_on=datetime.date(2030, 1, 1), interval=2
+        )
+
+        self.assertEqual(
+            self.days(
+                template, datetime.date(2030, 1, 10), datetime.date(2030, 2, 15)
+            ),
+            ["2030-01-15", "2030-01-29", "2030-02-12"],
+        )
+
+    def test_monthly_keeps_to_the_month_end(self):
+        template = self.create_template(
+            starts_on=datetime.date(2030, 1, 31),
+            frequency=RecurringTask.Frequency.MONTHLY,
+        )
+
+        self.assertEqual(
+            self.days(
+                template, datetime.date(2030, 2, 1), datetime.date(2030, 4, 30)
+            ),
+            ["2030-02-28", "2030-03-31", "2030-04-30"],
+        )
+
+    def test_stops_at_the_end_and_the_project_deadline(self):
+        template = self.create_template(
+            starts_on=datetime.date(2030, 1, 1),
+            ends_on=datetime.date(2030, 1, 3),
+            frequency=RecurringTask.Frequency.DAILY,
+        )
+        self.assertEqual(
+            self.days(
+                template, datetime.date(2030, 1, 1), datetime.date(2030, 1, 9)
+            ),
+            ["2030-01-01", "2030-01-02", "2030-01-03"],
+        )
+
+        template.ends_on = None
+        template.project.deadline = datetime.date(2030, 1, 2)
+        self.assertEqual(
+            self.days(
+                template, datetime.date(2030, 1, 1), datetime.date(2030, 1, 9)
+            ),
+            ["2030-01-01", "2030-01-02"],
+        )
+
+
+class MaterializeTest(RecurringTaskTestMixin, TestCase):
+    def test_occurrences_are_created_and_assigned_in_bulk(self):
+        other = Project.objects.create(
+            name="Backups",
+            deadline=self.today + datetime.timedelta(days=365),
+        )
+        for project in (self.project, other):
+            self.create_template(
+                project=project,
+                frequency=RecurringTask.Frequency.DAILY,
+                priority=Task.Priority.HIGH,
+            ).assignees.add(self.worker)
+
+        # templates, their assignees, existing tasks, task insert,
+        # created tasks, assignment insert, events insert, event receiver,
+        # all in one transaction (a savepoint here)
+        with self.assertNumQueries(10):
+            report = materialize(days=6)
+
+        self.assertEqual(report["tasks"], 12)
+        self.assertEqual(report["assignments"], 12)
+        tasks = Task.objects.filter(project=self.project).order_by("deadline")
+        self.assertEqual(tasks.count(), 6)
+        first = tasks[0]
+        self.assertEqual(
+            first.name,
+            f"Patch servers ({self.today + datetime.timedelta(days=1)})",
+        )
+        self.assertEqual(first.priority, Task.Priority.HIGH)
+        self.assertQuerySetEqual(first.assignees.all(), [self.worker])
+        self.assertEqual(
+            TaskEvent.objects.filter(task=first).count(), 2
+        )
+
+    def test_reruns_create_nothing_twice(self):
+        self.create_template(frequency=RecurringTask.Frequency.DAILY)
+        materialize(days=3)
+        # an occurrence that was renamed away is not brought back,
+        # one deleted by hand is
+        renamed, deleted = Task.objects.order_by("deadline")[:2]
+        with event_scope():
+            renamed.name = "Patched already"
+            renamed.save()
+            deleted.delete()
+
+        report = materialize(days=3)
+
+        self.assertEqual(report["tasks"], 2)
+        self.assertEqual(Task.objects.count(), 4)
+
+    def test_past_occurrences_and_inactive_templates_are_skipped(self):
+        self.create_template(
+            starts_on=self.today - datetime.timedelta(days=7),
+            frequency=RecurringTask.Frequency.DAILY,
+            due_time=datetime.time(0, 0),
+        )
+        self.create_template(name="Paused", is_active=False)
+
+        materialize(days=1)
+
+        self.assertEqual(
+            list(Task.objects.values_list("name", flat=True)),
+            [f"Patch servers ({self.today + datetime.timedelta(days=1)})"],
+        )
+
+    def test_command(self):
+        self.create_template()
+        out = StringIO()
+
+        call_command("materialize_recurring_tasks", "--days", "7", stdout=out)
+
+        self.assertRegex(out.getvalue(), r"1 tasks, 0 assignments in")
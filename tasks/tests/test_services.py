@@ -0,0 +1,178 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Project, Team
+from tasks.services import (
+    eligible_assignee_ids,
+    eligible_assignees,
+    sync_team_members,
+    team_members_changed,
+)
+
+
+class EligibleAssigneesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        worker_model = get_user_model()
+        self.leader = worker_model.objects.create_user(
+            username="leader", password="Password123!"
+        )
+        self.member = worker_model.objects.create_user(
+            username="member", password="Password123!"
+        )
+        self.outsider = worker_model.objects.create_user(
+            username="outsider", password="Password123!"
+        )
+        self.team = Team.objects.create(name="Backend")
+        self.team.workers.add(self.member, self.leader)
+        self.deadline = timezone.localdate() + timezone.timedelta(days=7)
+        self.project = Project.objects.create(
+            name="Project",
+            deadline=self.deadline,
+            leader=self.leader,
+            team=self.team,
+        )
+
+    def test_team_members_and_leader(self):
+        with self.assertNumQueries(1):
+            ids = eligible_assignee_ids(self.project)
+        self.assertEqual(ids, {self.leader.pk, self.member.pk})
+        self.assertEqual(
+            set(eligible_assignees(self.project)), {self.leader, self.member}
+        )
+
+    def test_ids_are_cached(self):
+        eligible_assignee_ids(self.project)
+        with self.assertNumQueries(0):
+            eligible_assignee_ids(self.project)
+
+    def test_membership_change_invalidates_cache(self):
+        eligible_assignee_ids(self.project)
+        self.outsider.teams.add(self.team)
+        self.assertIn(self.outsider.pk, eligible_assignee_ids(self.project))
+        self.team.workers.clear()
+        self.assertEqual(eligible_assignee_ids(self.project), {self.leader.pk})
+
+    @override_settings(ELIGIBLE_ASSIGNEES_CACHE_TIMEOUT=0)
+    def test_cache_timeout_bounds_missed_invalidations(self):
+        eligible_assignee_ids(self.project)
+        # a change made by another process, no signal reaches this one
+        Team.workers.through.objects.create(
+            team=self.team, worker=self.outsider
+        )
+        self.assertIn(self.outsider.pk, eligible_assignee_ids(self.project))
+
+    def test_project_without_team_or_leader(self):
+        project = Project.objects.create(
+            name="Empty", deadline=self.deadline
+        )
+        # nobody to restrict the assignees to, anybody may be assigned
+        with self.assertNumQueries(0):
+            self.assertIsNone(eligible_assignee_ids(project))
+        self.assertEqual(eligible_assignees(project).count(), 3)
+
+    def test_task_without_project(self):
+        self.assertIsNone(eligible_assignee_ids(None))
+        self.assertEqual(eligible_assignees(None).count(), 3)
+
+
+class TeamMembershipSyncTest(TestCase):
+    def setUp(self):
+        worker_model = get_user_model()
+        self.workers = [
+            worker_model.objects.create_user(
+                username=f"worker{i}", password="Password123!"
+            )
+            for i in range(4)
+        ]
+        self.team = Team.objects.create(name="Backend")
+        self.team.workers.add(*self.workers[:3])
+        self.sent = []
+        team_members_changed.connect(self.receive)
+        self.addCleanup(team_members_changed.disconnect, self.receive)
+
+    def receive(self, sender, changes, **kwargs):
+        self.sent.append(changes)
+
+    def member_ids(self, team):
+        return set(team.workers.values_list("pk", flat=True))
+
+    def test_only_the_delta_is_written(self):
+        wanted = {self.workers[0].pk, self.workers[3].pk}
+        # current members, savepoint, insert, delete, release
+        with self.assertNumQueries(5):
+            added, removed = sync_team_members(self.team, wanted)
+        self.assertEqual(added, {self.workers[3].pk})
+        self.assertEqual(removed, {self.workers[1].pk, self.workers[2].pk})
+        self.assertEqual(self.member_ids(self.team), wanted)
+        self.assertEqual(
+            self.sent, [{self.team.pk: (added, removed)}]
+        )
+
+    def test_unchanged_membership_writes_nothing(self):
+        with self.assertNumQueries(1):
+            sync_team_members(
+                self.team, [worker.pk for worker in self.workers[:3]]
+            )
+        self.assertEqual(self.sent, [])
+
+    def test_sync_from_hr_export(self):
+        other = Team.objects.create(name="Frontend")
+        untouched = Team.objects.create(name="Ops")
+        untouched.workers.add(self.workers[0])
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False
+        ) as export:
+            export.write(
+                "team,username\n"
+                "Backend,worker0\n"
+                "Frontend,worker1\n"
+                "Frontend,worker2\n"
+                "Frontend,ghost\n"
+                "Design,worker3\n"
+            )
+        self.addCleanup(os.remove, export.name)
+
+        out, err = StringIO(), StringIO()
+        call_command("sync_team_members", export.name, stdout=out, stderr=err)
+
+        self.assertEqual(self.member_ids(self.team), {self.workers[0].pk})
+        self.assertEqual(
+            self.member_ids(other), {self.workers[1].pk, self.workers[2].pk}
+        )
+        self.assertEqual(self.member_ids(untouched), {self.workers[0].pk})
+        self.assertIn("teams: 2, added: 2, removed: 2", out.getvalue())
+        self.assertIn("unknown team: Design", err.getvalue())
+        self.assertIn("unknown worker: ghost", err.getvalue())
+        self.assertEqual(len(self.sent), 1)
+
+    def test_dry_run_does_not_write(self):
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False
+        ) as export:
+            export.write("team,username\nBackend,worker3\n")
+        self.addCleanup(os.remove, export.name)
+
+        call_command(
+            "sync_team_members", export.name, "--dry-run", stdout=StringIO()
+        )
+        self.assertEqual(len(self.member_ids(self.team)), 3)
+        self.assertEqual(self.sent, [])
+
+    def test_short_rows_are_rejected(self):
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False
+        ) as export:
+            export.write("team,username\nBackend,worker3\nBackend\n")
+        self.addCleanup(os.remove, export.name)
+
+        with self.assertRaisesMessage(CommandError, "Line 3:"):
+            call_command("sync_team_members", export.name, stdout=StringIO())
+        self.assertEqual(len(self.member_ids(self.team)), 3)
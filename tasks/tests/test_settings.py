@@ -0,0 +1,19 @@
+from django.test import SimpleTestCase
+
+from task_manager_site.settings import base, dev
+
+
+class SettingsProfileTest(SimpleTestCase):
+    def test_production_profile_has_no_dev_apps(self):
+        for app in dev.DEV_APPS:
+            self.assertNotIn(app, base.INSTALLED_APPS)
+        for middleware in dev.DEV_MIDDLEWARE:
+            self.assertNotIn(middleware, base.MIDDLEWARE)
+
+    def test_dev_profile_keeps_compression_outermost(self):
+        self.assertLess(
+            dev.MIDDLEWARE.index("tasks.middleware.CompressionMiddleware"),
+            dev.MIDDLEWARE.index(
+                "debug_toolbar.middleware.DebugToolbarMiddleware"
+            ),
+        )
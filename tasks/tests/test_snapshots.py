@@ -0,0 +1,145 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import (
+    Task,
+    TaskType,
+    Project,
+    Team,
+    ProjectSnapshot,
+    TeamSnapshot,
+    TaskTypeSnapshot,
+)
+from tasks.snapshots import take_snapshots
+
+
+class TakeSnapshotsTest(TestCase):
+    def setUp(self):
+        self.task_type = TaskType.objects.create(name="Test Type")
+        self.team = Team.objects.create(name="Test Team")
+        self.project = Project.objects.create(
+            name="Test Project",
+            deadline=timezone.localdate() + timezone.timedelta(days=10),
+            team=self.team,
+        )
+        deadline = timezone.now() + timezone.timedelta(days=1)
+        Task.objects.create(
+            name="Open",
+            deadline=deadline,
+            type=self.task_type,
+            project=self.project,
+        )
+        Task.objects.create(
+            name="Done",
+            deadline=deadline,
+            type=self.task_type,
+            project=self.project,
+            is_completed=True,
+        )
+        overdue = Task.objects.create(
+            name="Overdue",
+            deadline=deadline,
+            type=self.task_type,
+            project=self.project,
+        )
+        Task.objects.filter(pk=overdue.pk).update(
+            deadline=timezone.now() - timezone.timedelta(days=1)
+        )
+        Task.objects.create(
+            name="Without project",
+            deadline=deadline,
+            type=self.task_type,
+        )
+
+    def test_take_snapshots_counts(self):
+        take_snapshots()
+        project_row = ProjectSnapshot.objects.get(project=self.project)
+        self.assertEqual(project_row.date, timezone.localdate())
+        self.assertEqual(project_row.open_count, 2)
+        self.assertEqual(project_row.completed_count, 1)
+        self.assertEqual(project_row.overdue_count, 1)
+
+        team_row = TeamSnapshot.objects.get(team=self.team)
+        self.assertEqual(team_row.open_count, 2)
+        self.assertEqual(team_row.completed_count, 1)
+
+        type_row = TaskTypeSnapshot.objects.get(type=self.task_type)
+        self.assertEqual(type_row.open_count, 3)
+        self.assertEqual(type_row.completed_count, 1)
+
+    def test_take_snapshots_one_statement_per_dimension(self):
+        # exists() guard + INSERT ... SELECT for each of three dimensions
+        with self.assertNumQueries(6):
+            take_snapshots()
+
+    def test_take_snapshots_is_idempotent_per_day(self):
+        take_snapshots()
+        written = take_snapshots()
+        self.assertEqual(set(written.values()), {0})
+        self.assertEqual(ProjectSnapshot.objects.count(), 1)
+
+    def test_take_snapshots_appends_new_day(self):
+        yesterday = timezone.localdate() - timezone.timedelta(days=1)
+        take_snapshots(yesterday)
+        take_snapshots()
+        self.assertEqual(
+            ProjectSnapshot.objects.filter(project=self.project).count(), 2
+        )
+
+    def test_command_output(self):
+        out = StringIO()
+        call_command("take_snapshots", stdout=out)
+        self.assertIn("projectsnapshot: 1 rows", out.getvalue())
+
+
+class SnapshotMetricsViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.project = Project.objects.create(
+            name="Test Project",
+            deadline=timezone.localdate() + timezone.timedelta(days=10),
+            leader=self.user,
+        )
+        ProjectSnapshot.objects.create(
+            project=self.project,
+            date=timezone.localdate(),
+            open_count=3,
+            completed_count=1,
+            overdue_count=2,
+        )
+        self.url = reverse(
+            "tasks:project-metrics", kwargs={"pk": self.project.pk}
+        )
+
+    def test_metrics_login_required(self):
+        response = self.client.get(self.url)
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_project_metrics(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "labels": [timezone.localdate().isoformat()],
+                "open": [3],
+                "completed": [1],
+                "overdue": [2],
+            },
+        )
+
+    def test_metrics_days_out_of_range(self):
+        self.client.force_login(self.user)
+        for days in ("100000000000", "-1", "many"):
+            with self.subTest(days=days):
+                response = self.client.get(self.url, {"days": days})
+                self.assertEqual(response.status_code, 400)
@@ -1,8 +1,13 @@
+import re
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from tasks.auth import CachedModelBackend
 from tasks.models import Worker, Project, Task, TaskType, Position, Team
 
 WORKER_URL = reverse("tasks:worker-list")
@@ -50,6 +55,108 @@ class PrivateHomePageTest(TestCase):
         self.assertTemplateUsed(response, "index.html")
 
 
+class CachedUserLookupTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.backend = CachedModelBackend()
+
+    def test_user_is_cached_until_saved(self):
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        self.user.first_name = "Test"
+        self.user.save()
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.user.pk)
+        self.assertEqual(user.first_name, "Test")
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/").status_code, 302)
+
+
+class ListPreferencesTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.client.force_login(self.user)
+        TaskType.objects.bulk_create(
+            TaskType(name=f"Type {i:02}") for i in range(12)
+        )
+
+    def set_preferences(self, **data):
+        return self.client.post(
+            reverse("tasks:list-preferences"),
+            {"next": TASK_TYPE_URL, **data},
+        )
+
+    def test_page_size_preference(self):
+        response = self.set_preferences(page_size=10)
+        self.assertRedirects(response, TASK_TYPE_URL)
+
+        response = self.client.get(TASK_TYPE_URL)
+        self.assertEqual(len(response.context["task_type_list"]), 10)
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+
+    def test_page_size_is_bounded(self):
+        self.set_preferences(page_size=1000)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.page_size)
+
+    def test_infinite_scroll_streams_batches(self):
+        self.set_preferences(page_size=5, infinite_scroll="on")
+
+        response = self.client.get(TASK_TYPE_URL)
+        self.assertIsNone(response.context["paginator"])
+        self.assertEqual(len(response.context["task_type_list"]), 5)
+        next_url = response.context["next_url"]
+        self.assertContains(response, "data-next-url")
+
+        names = []
+        while next_url:
+            response = self.client.get(next_url, HTTP_HX_REQUEST="true")
+            self.assertTrue(response.streaming)
+            html = b"".join(response.streaming_content).decode()
+            names.extend(re.findall(r"Type \d\d", html))
+            next_url = response.get("X-Next-Url")
+        self.assertEqual(names, [f"Type {i:02}" for i in range(5, 12)])
+
+    def test_continuation_as_json(self):
+        self.set_preferences(page_size=5, infinite_scroll="on")
+        next_url = self.client.get(TASK_TYPE_URL).context["next_url"]
+
+        response = self.client.get(
+            next_url, HTTP_ACCEPT="application/json"
+        )
+        data = response.json()
+        self.assertIn("Type 05", data["html"])
+        self.assertNotIn("Type 04", data["html"])
+        self.assertIn("after=", data["next"])
+
+    def test_continuation_without_script_renders_page(self):
+        self.set_preferences(page_size=5, infinite_scroll="on")
+        next_url = self.client.get(TASK_TYPE_URL).context["next_url"]
+
+        response = self.client.get(next_url)
+        self.assertTemplateUsed(response, "tasks/task_type_list.html")
+        self.assertEqual(
+            response.context["task_type_list"][0].name, "Type 05"
+        )
+
+    def test_invalid_token(self):
+        response = self.client.get(TASK_TYPE_URL, {"after": "bogus"})
+        self.assertEqual(response.status_code, 400)
+
+
 class PublicWorkerTest(TestCase):
     def setUp(self):
         self.worker = Worker.objects.create(
@@ -101,6 +208,79 @@ class PrivateWorkerTest(TestCase):
 
         self.assertTemplateUsed(response, "tasks/worker_list.html")
 
+    def test_retrieve_workers_partial(self):
+        response = self.client.get(WORKER_URL, headers={"HX-Request": "true"})
+        self.assertTemplateUsed(
+            response, "tasks/partials/worker_list_results.html"
+        )
+        self.assertTemplateNotUsed(response, "layouts/base_sections.html")
+
+    def test_worker_autocomplete(self):
+        anna = get_user_model().objects.create_user(
+            username="anna",
+            first_name="Anna",
+            last_name="Zed",
+            password="Password123!"
+        )
+        bob = get_user_model().objects.create_user(
+            username="bob",
+            last_name="Anderson",
+            password="Password123!"
+        )
+        Team.objects.create(name="Core", leader=bob).workers.add(
+            self.user, anna
+        )
+        # outside of the user's teams
+        get_user_model().objects.create_user(
+            username="andy", password="Password123!"
+        )
+        response = self.client.get(
+            reverse("tasks:worker-autocomplete"), {"term": "an"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(result["text"] for result in response.json()["results"]),
+            ["Anderson", "Zed Anna"],
+        )
+
+    def test_worker_autocomplete_paging(self):
+        team = Team.objects.create(name="Core", leader=self.user)
+        for index in range(25):
+            team.workers.add(Worker.objects.create(
+                username=f"worker_{index:02}", password="Password123!"
+            ))
+        url = reverse("tasks:worker-autocomplete")
+        first = self.client.get(url, {"term": "worker_"}).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["more"])
+        second = self.client.get(url, {"term": "worker_", "page": 2}).json()
+        self.assertEqual(len(second["results"]), 5)
+        self.assertFalse(second["more"])
+
+    def test_worker_autocomplete_scoped_to_task_project(self):
+        leader = Worker.objects.create(
+            username="leader", password="Password123!"
+        )
+        Worker.objects.create(username="outsider", password="Password123!")
+        project = Project.objects.create(
+            name="Test Project",
+            leader=leader,
+            deadline=timezone.now() + timezone.timedelta(days=10),
+        )
+        task = Task.objects.create(
+            name="Test Task",
+            type=TaskType.objects.create(name="Test Type"),
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            project=project,
+        )
+        self.client.force_login(leader)
+        response = self.client.get(
+            reverse("tasks:worker-autocomplete"), {"task": task.id}
+        )
+        self.assertEqual(
+            response.json()["results"], [{"id": leader.id, "text": "leader"}]
+        )
+
     def test_retrieve_worker_detail(self):
         response = self.client.get(WORKER_URL + f"{self.user.id}/")
         self.assertEqual(response.status_code, 200)
@@ -293,6 +473,26 @@ class PrivateTaskTest(TestCase):
         tasks = Task.objects.all().order_by("deadline")
         self.assertEqual(list(response.context["task_list"]), list(tasks))
 
+    def test_retrieve_tasks_partial(self):
+        response = self.client.get(
+            TASK_URL + "?status=uncompleted", headers={"HX-Request": "true"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "tasks/partials/task_list_results.html"
+        )
+        self.assertTemplateNotUsed(response, "layouts/base_sections.html")
+        self.assertTemplateNotUsed(response, "includes/navigation.html")
+        self.assertContains(response, self.task.name)
+        self.assertIn("HX-Request", response["Vary"])
+
+    def test_retrieve_tasks_full_page_includes_results(self):
+        response = self.client.get(TASK_URL)
+        self.assertTemplateUsed(response, "layouts/base_sections.html")
+        self.assertTemplateUsed(
+            response, "tasks/partials/task_list_results.html"
+        )
+
     def test_retrieve_task_detail(self):
         response = self.client.get(TASK_URL + f"{self.task.id}/")
         self.assertEqual(response.status_code, 200)
@@ -307,6 +507,7 @@ class PrivateTaskTest(TestCase):
         project = Project.objects.create(
             name="Test Project",
             deadline=deadline,
+            leader=self.user,
         )
         form_data = {
             "name": "Test Task 2",
@@ -350,6 +551,7 @@ class PrivateTaskTest(TestCase):
         project = Project.objects.create(
             name="Test Project",
             deadline=deadline,
+            leader=self.user,
         )
         task = Task.objects.create(
             name="Test Tsks",
@@ -402,6 +604,62 @@ class PrivateTaskTest(TestCase):
         self.task.refresh_from_db()
         self.assertFalse(self.task.is_completed)
 
+    def test_complete_task_queries(self):
+        url = TASK_URL + f"{self.task.id}/completed/"
+        self.client.post(url, {"next": TASK_URL})
+        # session and user come from the cache, leaving the
+        # UPDATE ... RETURNING, the task event insert and the lookup of
+        # the assignees whose calendar feeds go stale
+        with self.assertNumQueries(3):
+            self.client.post(url, {"next": TASK_URL})
+
+    def test_complete_task_json(self):
+        url = TASK_URL + f"{self.task.id}/completed/"
+        response = self.client.post(
+            url, headers={"x-requested-with": "XMLHttpRequest"}
+        )
+        self.assertEqual(
+            response.json(), {"id": self.task.id, "is_completed": True}
+        )
+        response = self.client.post(url, headers={"accept": "application/json"})
+        self.assertEqual(
+            response.json(), {"id": self.task.id, "is_completed": False}
+        )
+
+    def test_complete_missing_task(self):
+        response = self.client.post(TASK_URL + "0/completed/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_assign_task_does_not_save_task_row(self):
+        url = TASK_URL + f"{self.task.id}/assign/"
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"assignees": [self.user.id]})
+        self.assertIn(self.user, self.task.assignees.all())
+        self.assertFalse(
+            any(
+                query["sql"].startswith('UPDATE "tasks_task"')
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_assign_task_rejects_workers_outside_project_team(self):
+        team = Team.objects.create(name="Backend")
+        team.workers.add(self.user)
+        self.task.project = Project.objects.create(
+            name="Project", deadline=self.deadline.date(), team=team
+        )
+        self.task.save()
+        outsider = get_user_model().objects.create_user(
+            username="outsider",
+            password="Password123!"
+        )
+        response = self.client.post(
+            TASK_URL + f"{self.task.id}/assign/",
+            {"assignees": [self.user.id, outsider.id]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.task.assignees.exists())
+
     def test_retrieve_assign_task(self):
         response = self.client.get(TASK_URL + f"{self.task.id}/assign/")
         self.assertEqual(response.status_code, 200)
@@ -421,6 +679,40 @@ class PrivateTaskTest(TestCase):
         self.assertNotIn(self.user, self.task.assignees.all())
 
 
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="Password123!"
+        )
+        self.client.force_login(self.user)
+
+    def test_autocomplete_login_required(self):
+        self.client.logout()
+        response = self.client.get(
+            reverse("tasks:autocomplete", kwargs={"source": "teams"})
+        )
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_autocomplete_teams(self):
+        team = Team.objects.create(name="Backend", leader=self.user)
+        Team.objects.create(name="Frontend", leader=self.user)
+        response = self.client.get(
+            reverse("tasks:autocomplete", kwargs={"source": "teams"}),
+            {"term": "back"},
+        )
+        self.assertEqual(
+            response.json(),
+            {"results": [{"id": team.id, "text": "Backend"}], "more": False},
+        )
+
+    def test_autocomplete_unknown_source(self):
+        response = self.client.get(
+            reverse("tasks:autocomplete", kwargs={"source": "workers"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
 class PublicTaskTypeTest(TestCase):
     def test_task_types_login_required(self):
         response = self.client.get(TASK_TYPE_URL)
@@ -467,6 +759,15 @@ class PrivateTaskTypeTest(TestCase):
 
         self.assertTemplateUsed(response, "tasks/task_type_list.html")
 
+    def test_retrieve_task_types_partial(self):
+        response = self.client.get(
+            TASK_TYPE_URL, headers={"HX-Request": "true"}
+        )
+        self.assertTemplateUsed(
+            response, "tasks/partials/task_type_list_results.html"
+        )
+        self.assertTemplateNotUsed(response, "layouts/base_sections.html")
+
     def test_retrieve_task_type_detail(self):
         response = self.client.get(TASK_TYPE_URL + f"{self.task_type.id}/")
         self.assertEqual(response.status_code, 200)
@@ -654,7 +955,8 @@ class PublicTeamTest(TestCase):
 
 class PrivateTeamTest(TestCase):
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
+        # sees every team, access itself is covered by test_permissions
+        self.user = get_user_model().objects.create_superuser(
             username="test_user",
             password="Password123!"
         )
@@ -801,7 +1103,8 @@ class PublicProjectTest(TestCase):
 
 class PrivateProjectTest(TestCase):
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
+        # sees every project, access itself is covered by test_permissions
+        self.user = get_user_model().objects.create_superuser(
             username="test_user",
             password="Password123!"
         )
@@ -903,6 +1206,34 @@ class PrivateProjectTest(TestCase):
         self.project.refresh_from_db()
         self.assertTrue(self.project.is_completed)
 
+    def test_project_toggle_complete_with_open_tasks(self):
+        Task.objects.create(
+            name="Open Task",
+            type=TaskType.objects.create(name="Test Type"),
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            project=self.project,
+        )
+        url = PROJECT_URL + f"{self.project.id}/completed/"
+        response = self.client.post(url)
+        self.assertRedirects(response, PROJECT_URL + f"{self.project.id}/")
+
+        response = self.client.post(
+            url, headers={"x-requested-with": "XMLHttpRequest"}
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("error", response.json())
+        self.project.refresh_from_db()
+        self.assertFalse(self.project.is_completed)
+
+    def test_project_toggle_complete_json(self):
+        response = self.client.post(
+            PROJECT_URL + f"{self.project.id}/completed/",
+            headers={"x-requested-with": "XMLHttpRequest"},
+        )
+        self.assertEqual(
+            response.json(), {"id": self.project.id, "is_completed": True}
+        )
+
     def test_project_toggle_uncomlete(self):
         next_url = f"?next={PROJECT_URL}"
         self.project.is_completed = True
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.models import Task, TaskType
+from tasks.services import dashboard_counts
+from tasks.warmup import warm_up
+
+
+class WarmUpTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_up_prefills_counters(self):
+        summary = warm_up()
+        self.assertGreater(summary["urls"], 30)
+        self.assertGreater(summary["templates"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard_counts()["worker_count"], 0)
+
+    def test_failed_warm_up_is_logged_not_raised(self):
+        with mock.patch(
+                "tasks.warmup.warm_database",
+                side_effect=RuntimeError("database is down"),
+        ), self.assertLogs("tasks.warmup", "ERROR") as logs:
+            self.assertIsNone(warm_up())
+        self.assertIn("database is down", logs.output[0])
+
+    def test_counters_follow_creates_and_deletes(self):
+        dashboard_counts()
+        task = Task.objects.create(
+            name="Test Task",
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            type=TaskType.objects.create(name="Test Type"),
+        )
+        self.assertEqual(dashboard_counts()["tasks_count"], 1)
+        task.delete()
+        self.assertEqual(dashboard_counts()["tasks_count"], 0)
+        get_user_model().objects.create_user(
+            username="test_user", password="Password123!"
+        )
+        self.assertEqual(dashboard_counts()["worker_count"], 1)
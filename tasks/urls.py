@@ -2,6 +2,8 @@ from django.urls import path
 
 from tasks.views import (
     index,
+    autocomplete,
+    list_preferences,
     TaskListView,
     TaskDetailView,
     toggle_completed,
@@ -14,6 +16,7 @@ from tasks.views import (
     TaskTypeUpdateView,
     TaskTypeDeleteView,
     WorkerListView,
+    worker_autocomplete,
     WorkerDetailView,
     WorkerCreateView,
     WorkerUpdateView,
@@ -35,16 +38,57 @@ from tasks.views import (
     ProjectUpdateView,
     project_toggle_completed,
     task_assign,
+    task_timeline,
+    task_updates_stream,
     task_take,
     task_remove_from_me,
+    project_metrics,
+    project_dependencies,
+    team_metrics,
+    task_type_metrics,
+    task_calendar,
+    project_timeline,
+    calendar_feed,
+    worker_calendar_feed,
+    worker_feed_reset,
 )
 
 urlpatterns = [
     path("", index, name="index"),
+    path(
+        "autocomplete/<slug:source>/",
+        autocomplete,
+        name="autocomplete",
+    ),
+    path(
+        "preferences/lists/",
+        list_preferences,
+        name="list-preferences",
+    ),
+    # Calendar
+    path("calendar/", task_calendar, name="task-calendar"),
+    path(
+        "calendar/<int:year>/<int:month>/",
+        task_calendar,
+        name="task-calendar-month",
+    ),
+    path("calendar/deadlines.ics", calendar_feed, name="calendar-feed"),
+    path(
+        "calendar/workers/<str:key>.ics",
+        worker_calendar_feed,
+        name="worker-calendar-feed",
+    ),
+    path(
+        "calendar/workers/reset/",
+        worker_feed_reset,
+        name="worker-feed-reset",
+    ),
+    path("timeline/", project_timeline, name="project-timeline"),
     # Task
     path("tasks/", TaskListView.as_view(), name="task-list"),
     path("tasks/<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
     path("tasks/create/", TaskCreateView.as_view(), name="task-create"),
+    path("tasks/live/", task_updates_stream, name="task-updates"),
     path(
         "tasks/<int:pk>/update/",
         TaskUpdateView.as_view(),
@@ -61,6 +105,7 @@ urlpatterns = [
         name="toggle-completed"
     ),
     path("tasks/<int:pk>/assign/", task_assign, name="task-assign"),
+    path("tasks/<int:pk>/timeline/", task_timeline, name="task-timeline"),
     path("tasks/<int:pk>/take/", task_take, name="task-take"),
     path(
         "tasks/<int:pk>/remove-from-me/",
@@ -89,8 +134,18 @@ urlpatterns = [
         TaskTypeDeleteView.as_view(),
         name="task-type-delete",
     ),
+    path(
+        "task-types/<int:pk>/metrics/",
+        task_type_metrics,
+        name="task-type-metrics",
+    ),
     # Worker
     path("workers/", WorkerListView.as_view(), name="worker-list"),
+    path(
+        "workers/autocomplete/",
+        worker_autocomplete,
+        name="worker-autocomplete",
+    ),
     path(
         "workers/<int:pk>/",
         WorkerDetailView.as_view(),
@@ -143,6 +198,7 @@ urlpatterns = [
         TeamDeleteView.as_view(),
         name="team-delete"
     ),
+    path("teams/<int:pk>/metrics/", team_metrics, name="team-metrics"),
     # Project
     path("projects/", ProjectListView.as_view(), name="project-list"),
     path(
@@ -170,6 +226,16 @@ urlpatterns = [
         project_toggle_completed,
         name="project-toggle-completed",
     ),
+    path(
+        "projects/<int:pk>/metrics/",
+        project_metrics,
+        name="project-metrics",
+    ),
+    path(
+        "projects/<int:pk>/dependencies/",
+        project_dependencies,
+        name="project-dependencies",
+    ),
 ]
 
 app_name = "tasks"
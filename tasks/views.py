@@ -1,11 +1,33 @@
+import calendar
+import datetime
+from itertools import chain
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.core import signing
+from django.core.exceptions import BadRequest, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.template.loader import get_template
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
 from django.views import generic
+from django.views.decorators.http import require_POST
 
 from tasks.forms import (
     TaskSearchForm,
@@ -26,27 +48,264 @@ from tasks.forms import (
     ProjectCreateForm,
     ProjectUpdateForm,
     TaskAssignForm,
+    ListPreferencesForm,
+    assignee_queryset,
+    worker_label,
+)
+from tasks.models import (
+    Task,
+    Worker,
+    Project,
+    TaskType,
+    Position,
+    Team,
+    ProjectSnapshot,
+    TeamSnapshot,
+    TaskTypeSnapshot,
+    TaskEvent,
+)
+from tasks.dependencies import project_graph
+from tasks.hierarchy import subtask_counts
+from tasks.feeds import (
+    feed_key,
+    reset_feed_key,
+    worker_feed,
+    worker_feed_changes,
+    worker_for_key,
+)
+from tasks.ical import project_event, stream_calendar, task_event
+from tasks.live import EventStreamResponse, event_stream
+from tasks.pagination import (
+    MAX_PAGE_SIZE,
+    EstimatedCountPaginator,
+    keyset_after,
+    keyset_ordering,
+    keyset_token,
 )
-from tasks.models import Task, Worker, Project, TaskType, Position, Team
+from tasks.permissions import accessible, can_access, request_access
+from tasks.schedule import (
+    day_bounds,
+    month_weeks,
+    projects_due_between,
+    task_deadline_counts,
+    tasks_due_between,
+    tasks_due_on,
+)
+from tasks.services import (
+    dashboard_counts,
+    toggle_task_completed,
+    toggle_project_completed,
+    eligible_assignee_ids,
+    eligible_assignees,
+)
+
+SNAPSHOT_DEFAULT_DAYS = 90
+SNAPSHOT_MAX_DAYS = 366 * 10
+AUTOCOMPLETE_PAGE_SIZE = 20
+TIMELINE_MONTHS = 6
+CALENDAR_FEED_PAST_DAYS = 30
+CALENDAR_FEED_DAYS = 365
+CALENDAR_FEED_MAX_DAYS = 366 * 3
 
 
 @login_required
 def index(request):
-    tasks_count = Task.objects.count()
-    project_count = Project.objects.all().count()
-    worker_count = Worker.objects.all().count()
+    return render(request, "index.html", context=dashboard_counts())
 
-    context = {
-        "tasks_count": tasks_count,
-        "project_count": project_count,
-        "worker_count": worker_count,
-    }
-    return render(request, "index.html", context=context)
 
+class PartialListMixin:
+    """
+    Render only the results fragment (table and pagination) for
+    partial requests, marked with the ``HX-Request`` header.
+    """
+
+    partial_template_name = None
+
+    def is_partial(self) -> bool:
+        return self.request.headers.get("HX-Request") == "true"
+
+    def get_partial_template_name(self) -> str:
+        if self.partial_template_name:
+            return self.partial_template_name
+        return (
+            f"{self.model._meta.app_label}/partials/"
+            f"{self.model._meta.model_name}_list_results.html"
+        )
+
+    def get_template_names(self):
+        if self.is_partial():
+            return [self.get_partial_template_name()]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        patch_vary_headers(response, ["HX-Request"])
+        return response
+
+
+class ListPreferencesMixin:
+    """
+    Page size and infinite scroll from the user's list preferences.
+
+    In infinite-scroll mode the list starts with the first page worth of
+    rows, the following batches are requested with ``?after=<token>``
+    keyset continuation tokens instead of OFFSET pages. Batches are
+    streamed as row fragments with the next batch in ``X-Next-Url``, or
+    returned as JSON for ``Accept: application/json``.
+
+    Used together with ``PartialListMixin``.
+    """
+
+    rows_template_name = None
+    stream_batch_size = 25
+    next_url = None
+
+    def get_paginate_by(self, queryset):
+        page_size = getattr(self.request.user, "page_size", None)
+        return min(page_size or self.paginate_by, MAX_PAGE_SIZE)
+
+    def is_continuation(self) -> bool:
+        return "after" in self.request.GET
+
+    def is_infinite_scroll(self) -> bool:
+        return self.is_continuation() or bool(
+            getattr(self.request.user, "infinite_scroll", False)
+        )
+
+    def get_rows_template_name(self) -> str:
+        if self.rows_template_name:
+            return self.rows_template_name
+        return (
+            f"{self.model._meta.app_label}/partials/"
+            f"{self.model._meta.model_name}_list_rows.html"
+        )
+
+    def _list_url(self, **params) -> str:
+        query = self.request.GET.copy()
+        for name in ("after", "page"):
+            query.pop(name, None)
+        query.update(params)
+        return f"{self.request.path}?{query.urlencode()}".rstrip("?")
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_infinite_scroll():
+            return super().paginate_queryset(queryset, page_size)
+
+        if self.is_continuation():
+            try:
+                queryset = keyset_after(queryset, self.request.GET["after"])
+            except signing.BadSignature:
+                raise BadRequest("Invalid continuation token.")
+        else:
+            queryset = queryset.order_by(*keyset_ordering(queryset))
+
+        # one extra row tells whether there is another batch
+        rows = list(queryset[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_url = self._list_url(
+                after=keyset_token(queryset, rows[-1])
+            )
+        return None, None, rows, False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["infinite_scroll"] = self.is_infinite_scroll()
+        context["next_url"] = self.next_url
+        # where row actions send the user back to, never a batch url
+        context["list_path"] = (
+            self._list_url() if self.is_continuation()
+            else self.request.get_full_path()
+        )
+        if self.request.user.is_authenticated:
+            context["preferences_form"] = ListPreferencesForm(
+                instance=self.request.user
+            )
+        return context
+
+    def _row_batches(self, template, context):
+        rows = context["object_list"]
+        for start in range(0, len(rows), self.stream_batch_size):
+            batch = rows[start:start + self.stream_batch_size]
+            yield template.render({**context, "rows": batch}, self.request)
+
+    def render_to_response(self, context, **response_kwargs):
+        wants_json = _wants_json(self.request)
+        # without script a continuation link renders the whole page
+        if not self.is_continuation() or not (
+                wants_json or self.is_partial()
+        ):
+            return super().render_to_response(context, **response_kwargs)
+
+        template = get_template(self.get_rows_template_name())
+        if wants_json:
+            response = JsonResponse(
+                {
+                    "html": "".join(self._row_batches(template, context)),
+                    "next": self.next_url,
+                }
+            )
+        else:
+            response = StreamingHttpResponse(
+                self._row_batches(template, context),
+                content_type="text/html; charset=utf-8",
+            )
+            if self.next_url:
+                response["X-Next-Url"] = self.next_url
+        patch_vary_headers(response, ["Accept"])
+        return response
 
-class TaskListView(LoginRequiredMixin, generic.ListView):
+
+class AccessibleObjectsMixin:
+    """
+    Limit the view to the projects, teams or tasks the user has access
+    to, others answer 404.
+    """
+
+    def get_queryset(self):
+        return accessible(super().get_queryset(), self.request)
+
+
+class AccessibleChoicesMixin:
+    """Offer only accessible projects, teams and tasks in form choices."""
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        for field in form.fields.values():
+            queryset = getattr(field, "queryset", None)
+            if queryset is not None:
+                field.queryset = accessible(queryset, self.request)
+        return form
+
+
+@login_required
+@require_POST
+def list_preferences(request):
+    form = ListPreferencesForm(request.POST, instance=request.user)
+    if form.is_valid():
+        form.save(commit=False).save(
+            update_fields=["page_size", "infinite_scroll"]
+        )
+    else:
+        messages.error(request, "Could not save the list preferences.")
+
+    next_url = request.POST.get("next") or request.GET.get("next")
+    if not next_url:
+        next_url = request.META.get("HTTP_REFERER") or "tasks:index"
+
+    return redirect(next_url)
+
+
+class TaskListView(
+        LoginRequiredMixin,
+        AccessibleObjectsMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = Task
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -56,10 +315,18 @@ class TaskListView(LoginRequiredMixin, generic.ListView):
         context["status"] = self.request.GET.get("status", "all")
         context["name"] = name
         context["ordering"] = self.request.GET.get("ordering", "-deadline")
+        live_params = [
+            (name, value)
+            for name in ("project", "team")
+            for value in self.request.GET.getlist(name)
+        ]
+        context["live_url"] = reverse("tasks:task-updates") + (
+            "?" + urlencode(live_params) if live_params else ""
+        )
         return context
 
     def get_queryset(self):
-        queryset = Task.objects.all().select_related("type", "project")
+        queryset = super().get_queryset().select_related("type", "project")
         name = self.request.GET.get("name", "")
         if name:
             queryset = queryset.filter(name__icontains=name)
@@ -73,6 +340,13 @@ class TaskListView(LoginRequiredMixin, generic.ListView):
         if status == "uncompleted":
             queryset = queryset.filter(is_completed=False)
 
+        projects = _id_params(self.request, "project")
+        if projects:
+            queryset = queryset.filter(project__in=projects)
+        teams = _id_params(self.request, "team")
+        if teams:
+            queryset = queryset.filter(project__team__in=teams)
+
         ordering = self.request.GET.get("ordering", None)
         if ordering:
             allowed_orderings = {
@@ -85,46 +359,92 @@ class TaskListView(LoginRequiredMixin, generic.ListView):
         return queryset
 
 
-class TaskDetailView(LoginRequiredMixin, generic.DetailView):
+class TaskDetailView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DetailView
+):
     model = Task
     queryset = (
         Task.objects.all()
-        .select_related("type", "project")
-        .prefetch_related("assignees")
+        .select_related("type", "project", "parent")
+        .prefetch_related("assignees", "blocked_by", "subtasks")
     )
 
     def get_context_data(self, **kwargs):
         context = super(TaskDetailView, self).get_context_data(**kwargs)
         if self.object:
             context["assignees"] = self.object.assignees.all()
+            context["subtask_progress"] = subtask_counts(
+                [self.object.pk]
+            ).get(self.object.pk)
         return context
 
 
-class TaskCreateView(LoginRequiredMixin, generic.CreateView):
+class TaskCreateView(
+        LoginRequiredMixin, AccessibleChoicesMixin, generic.CreateView
+):
     model = Task
     form_class = TaskCreateForm
     success_url = reverse_lazy("tasks:task-list")
 
-
-class TaskUpdateView(LoginRequiredMixin, generic.UpdateView):
+    def get_initial(self):
+        initial = super().get_initial()
+        # "Add subtask" links pass the parent along
+        parent = self.request.GET.get("parent", "")
+        if parent.isdigit():
+            initial["parent"] = parent
+        return initial
+
+
+class TaskUpdateView(
+        LoginRequiredMixin,
+        AccessibleObjectsMixin,
+        AccessibleChoicesMixin,
+        generic.UpdateView,
+):
     model = Task
     form_class = TaskUpdateForm
 
 
-class TaskDeleteView(LoginRequiredMixin, generic.DeleteView):
+class TaskDeleteView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DeleteView
+):
     model = Task
     success_url = reverse_lazy("tasks:task-list")
 
 
+def _id_params(request, name: str) -> set[int]:
+    try:
+        return {int(value) for value in request.GET.getlist(name)}
+    except ValueError:
+        raise BadRequest(f"Invalid {name} id.")
+
+
+def _wants_json(request) -> bool:
+    return (
+        request.headers.get("x-requested-with") == "XMLHttpRequest"
+        or "application/json" in request.headers.get("accept", "")
+    )
+
+
 @login_required
 def toggle_completed(request, pk: int):
-    task = Task.objects.get(id=pk)
-    if task:
-        if task.is_completed:
-            task.is_completed = False
-        else:
-            task.is_completed = True
-        task.save()
+    access = request_access(request)
+    try:
+        is_completed = toggle_task_completed(
+            pk, None if access is None else access["projects"]
+        )
+    except Task.DoesNotExist:
+        raise Http404("No Task matches the given query.")
+    except ValidationError as error:
+        if _wants_json(request):
+            return JsonResponse(
+                {"id": pk, "error": error.messages[0]}, status=409
+            )
+        messages.error(request, error.messages[0])
+        return redirect("tasks:task-detail", pk=pk)
+    if _wants_json(request):
+        return JsonResponse({"id": pk, "is_completed": is_completed})
+
     next_url = request.POST.get("next") or request.GET.get("next")
     if not next_url:
         next_url = request.META.get("HTTP_REFERER")
@@ -132,35 +452,71 @@ def toggle_completed(request, pk: int):
     return redirect(next_url)
 
 
+@login_required
+async def task_updates_stream(request):
+    """
+    Server-sent events with the completion, assignment and creation of
+    tasks, limited to ``?project=`` and ``?team=`` ids when given and to
+    the projects and teams the user has access to.
+
+    Only the ASGI app can hold the stream open, under WSGI it answers
+    204 so that ``EventSource`` stops reconnecting.
+    """
+    projects = _id_params(request, "project")
+    teams = _id_params(request, "team")
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    access = await sync_to_async(request_access)(request)
+    if access is not None:
+        if projects or teams:
+            projects &= access["projects"]
+            teams &= access["teams"]
+            if not (projects or teams):
+                return HttpResponse(status=204)
+        else:
+            # updates of tasks outside of a project carry no project id
+            projects = access["projects"] | {None}
+            teams = access["teams"]
+    response = EventStreamResponse(event_stream(projects, teams))
+    patch_cache_control(response, no_cache=True)
+    # keep nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def task_timeline(request, pk: int):
+    if request_access(request) is not None:
+        # the history of deleted tasks is left to superusers
+        get_object_or_404(accessible(Task.objects, request), pk=pk)
+    events = [
+        {**event, "created_at": event["created_at"].isoformat()}
+        for event in TaskEvent.objects.timeline(pk)
+    ]
+    return JsonResponse({"task": pk, "events": events})
+
+
 @login_required
 def task_assign(request, pk: int):
-    task = get_object_or_404(Task, pk=pk)
-
-    # якщо у завдання є проект, то беремо працівників з команди проекту
-    # інакше показуємо всіх працівників
-    if task.project:
-        if task.project.team_id and task.project.leader_id:
-            team = task.project.team
-            assignees_qs = Worker.objects.filter(
-                Q(teams=team) | Q(pk=task.project.leader_id)
-            ).distinct()
-        elif task.project.leader_id:
-            assignees_qs = Worker.objects.filter(Q(pk=task.project.leader_id))
-        elif task.project.team_id:
-            team = task.project.team
-            assignees_qs = Worker.objects.filter(Q(teams=team))
-    else:
-        assignees_qs = Worker.objects.all()
+    task = get_object_or_404(
+        accessible(Task.objects.select_related("project"), request), pk=pk
+    )
 
     if request.method == "POST":
+        # якщо у завдання є проект, то призначати можна лише команду
+        # проекту та його лідера, інакше будь-якого працівника
         form = TaskAssignForm(
-            request.POST, instance=task, assignees_queryset=assignees_qs
+            request.POST,
+            instance=task,
+            eligible_ids=eligible_assignee_ids(task.project),
         )
         if form.is_valid():
-            form.save()
+            # only the m2m rows change, the task row itself is untouched
+            form.save(commit=False)
+            form.save_m2m()
             return redirect(task.get_absolute_url())
     else:
-        form = TaskAssignForm(instance=task, assignees_queryset=assignees_qs)
+        form = TaskAssignForm(instance=task)
 
     return render(
         request,
@@ -171,27 +527,30 @@ def task_assign(request, pk: int):
 
 @login_required()
 def task_take(request, pk: int):
-    task = get_object_or_404(Task, pk=pk)
-    worker = Worker.objects.get(id=request.user.id)
-    if task.assignees.filter(id=worker.id).exists():
-        return redirect(task.get_absolute_url())
-    task.assignees.add(worker)
+    task = get_object_or_404(accessible(Task.objects, request), pk=pk)
+    task.assignees.add(request.user)
     return redirect(task.get_absolute_url())
 
 @login_required()
 def task_remove_from_me(request, pk: int):
-    task = get_object_or_404(Task, pk=pk)
-    worker = Worker.objects.get(id=request.user.id)
-    if task.assignees.filter(id=worker.id).exists():
-        task.assignees.remove(worker)
+    task = get_object_or_404(accessible(Task.objects, request), pk=pk)
+    task.assignees.remove(request.user)
     return redirect(task.get_absolute_url())
 
 
-class TaskTypeListView(LoginRequiredMixin, generic.ListView):
+class TaskTypeListView(
+        LoginRequiredMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = TaskType
     template_name = "tasks/task_type_list.html"
+    partial_template_name = "tasks/partials/task_type_list_results.html"
+    rows_template_name = "tasks/partials/task_type_list_rows.html"
     context_object_name = "task_type_list"
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super(TaskTypeListView, self).get_context_data(**kwargs)
@@ -243,9 +602,15 @@ class TaskTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("tasks:task-type-list")
 
 
-class WorkerListView(LoginRequiredMixin, generic.ListView):
+class WorkerListView(
+        LoginRequiredMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = Worker
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super(WorkerListView, self).get_context_data(**kwargs)
@@ -263,25 +628,108 @@ class WorkerListView(LoginRequiredMixin, generic.ListView):
         return queryset
 
 
+AUTOCOMPLETE_SOURCES = {
+    "tasks": Task,
+    "task-types": TaskType,
+    "projects": Project,
+    "teams": Team,
+}
+
+
+def _autocomplete_response(request, queryset, label) -> JsonResponse:
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    offset = (page - 1) * AUTOCOMPLETE_PAGE_SIZE
+    # one extra row tells whether there is a next page, no COUNT needed
+    objects = list(queryset[offset:offset + AUTOCOMPLETE_PAGE_SIZE + 1])
+    return JsonResponse(
+        {
+            "results": [
+                {"id": obj.pk, "text": label(obj)}
+                for obj in objects[:AUTOCOMPLETE_PAGE_SIZE]
+            ],
+            "more": len(objects) > AUTOCOMPLETE_PAGE_SIZE,
+        }
+    )
+
+
+@login_required
+def autocomplete(request, source: str):
+    """Paged select2 results for the remote choice fields of our forms."""
+    model = AUTOCOMPLETE_SOURCES.get(source)
+    if model is None:
+        raise Http404("Unknown autocomplete source.")
+    queryset = accessible(model.objects.only("id", "name"), request)
+    term = request.GET.get("term", "").strip()
+    if term:
+        queryset = queryset.filter(name__icontains=term)
+    return _autocomplete_response(request, queryset, str)
+
+
+@login_required
+def worker_autocomplete(request):
+    """
+    Paged select2 results, prefix search over full name and username.
+    Offers the user and the members and leaders of their teams, or the
+    workers eligible for ``?task=``.
+    """
+    queryset = Worker.objects.all()
+    task_id = request.GET.get("task")
+    access = request_access(request)
+    if task_id and task_id.isdigit():
+        task = get_object_or_404(
+            accessible(Task.objects.select_related("project"), request),
+            pk=task_id,
+        )
+        queryset = eligible_assignees(task.project)
+    elif access is not None:
+        queryset = queryset.filter(
+            Q(pk=request.user.pk)
+            | Q(
+                pk__in=Team.workers.through.objects.filter(
+                    team_id__in=access["teams"]
+                ).values("worker_id")
+            )
+            | Q(
+                pk__in=Team.objects.filter(
+                    pk__in=access["teams"]
+                ).values("leader_id")
+            )
+        )
+
+    term = request.GET.get("term", "").strip()
+    if term:
+        queryset = queryset.filter(
+            Q(full_name__istartswith=term) | Q(username__istartswith=term)
+        )
+    return _autocomplete_response(
+        request, assignee_queryset(queryset), worker_label
+    )
+
+
 class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
     model = Worker
-    queryset = (
-        Worker.objects.all()
-        .select_related("position")
-        .prefetch_related("projects", "tasks", "teams")
-    )
+    queryset = Worker.objects.all().select_related("position")
 
     def get_context_data(self, **kwargs):
         context = super(WorkerDetailView, self).get_context_data(**kwargs)
-        tasks = self.object.tasks.all()
-        teams = self.object.teams.all()
-        projects = self.object.projects.all()
+        # only what the user has access to
+        tasks = accessible(self.object.tasks.all(), self.request)
+        teams = accessible(self.object.teams.all(), self.request)
+        projects = accessible(self.object.projects.all(), self.request)
         if tasks:
             context["tasks"] = tasks
         if teams:
             context["teams"] = teams
         if projects:
             context["projects"] = projects
+        if self.object.pk == self.request.user.pk:
+            feed_path = reverse(
+                "tasks:worker-calendar-feed", args=[feed_key(self.object)]
+            )
+            context["feed_url"] = self.request.build_absolute_uri(feed_path)
         return context
 
 
@@ -306,9 +754,15 @@ class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Worker
 
 
-class PositionListView(LoginRequiredMixin, generic.ListView):
+class PositionListView(
+        LoginRequiredMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = Position
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -350,9 +804,16 @@ class PositionDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("tasks:position-list")
 
 
-class TeamListView(LoginRequiredMixin, generic.ListView):
+class TeamListView(
+        LoginRequiredMixin,
+        AccessibleObjectsMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = Team
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -361,19 +822,21 @@ class TeamListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        queryset = Team.objects.all()
+        queryset = super().get_queryset()
         name = self.request.GET.get("name", "")
         if name:
             queryset = queryset.filter(name__icontains=name)
         return queryset
 
 
-class TeamDetailView(LoginRequiredMixin, generic.DetailView):
+class TeamDetailView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DetailView
+):
     model = Team
     context_object_name = "team"
 
     def get_queryset(self):
-        return Team.objects.all().prefetch_related("workers", "projects")
+        return super().get_queryset().prefetch_related("workers", "projects")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -393,8 +856,14 @@ class TeamCreateView(LoginRequiredMixin, generic.CreateView):
     form_class = TeamCreateForm
     success_url = reverse_lazy("tasks:team-list")
 
+    def get_initial(self):
+        # leading it keeps the team accessible to its creator
+        return {**super().get_initial(), "leader": self.request.user.pk}
+
 
-class TeamUpdateView(LoginRequiredMixin, generic.UpdateView):
+class TeamUpdateView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.UpdateView
+):
     model = Team
     form_class = TeamUpdateForm
 
@@ -402,14 +871,23 @@ class TeamUpdateView(LoginRequiredMixin, generic.UpdateView):
         return reverse_lazy("tasks:team-detail", kwargs={"pk": self.object.pk})
 
 
-class TeamDeleteView(LoginRequiredMixin, generic.DeleteView):
+class TeamDeleteView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DeleteView
+):
     model = Team
     success_url = reverse_lazy("tasks:team-list")
 
 
-class ProjectListView(LoginRequiredMixin, generic.ListView):
+class ProjectListView(
+        LoginRequiredMixin,
+        AccessibleObjectsMixin,
+        ListPreferencesMixin,
+        PartialListMixin,
+        generic.ListView,
+):
     model = Project
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -418,20 +896,22 @@ class ProjectListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        queryset = Project.objects.all()
+        queryset = super().get_queryset()
         name = self.request.GET.get("name", "")
         if name:
             queryset = queryset.filter(name__icontains=name)
         return queryset
 
 
-class ProjectDetailView(LoginRequiredMixin, generic.DetailView):
+class ProjectDetailView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DetailView
+):
     model = Project
     context_object_name = "project"
 
     def get_queryset(self):
         return (
-            Project.objects.all()
+            super().get_queryset()
             .select_related("team")
             .prefetch_related(
                 "tasks",
@@ -449,10 +929,16 @@ class ProjectDetailView(LoginRequiredMixin, generic.DetailView):
         return context
 
 
-class ProjectCreateView(LoginRequiredMixin, generic.CreateView):
+class ProjectCreateView(
+        LoginRequiredMixin, AccessibleChoicesMixin, generic.CreateView
+):
     model = Project
     form_class = ProjectCreateForm
 
+    def get_initial(self):
+        # leading it keeps the project accessible to its creator
+        return {**super().get_initial(), "leader": self.request.user.pk}
+
     def get_success_url(self):
         return reverse_lazy(
             "tasks:project-detail",
@@ -460,7 +946,12 @@ class ProjectCreateView(LoginRequiredMixin, generic.CreateView):
         )
 
 
-class ProjectUpdateView(LoginRequiredMixin, generic.UpdateView):
+class ProjectUpdateView(
+        LoginRequiredMixin,
+        AccessibleObjectsMixin,
+        AccessibleChoicesMixin,
+        generic.UpdateView,
+):
     model = Project
     form_class = ProjectUpdateForm
 
@@ -471,29 +962,307 @@ class ProjectUpdateView(LoginRequiredMixin, generic.UpdateView):
         )
 
 
-class ProjectDeleteView(LoginRequiredMixin, generic.DeleteView):
+class ProjectDeleteView(
+        LoginRequiredMixin, AccessibleObjectsMixin, generic.DeleteView
+):
     model = Project
     success_url = reverse_lazy("tasks:project-list")
 
 
+def _check_access(request, model, pk: int) -> None:
+    if not can_access(request, model, pk):
+        raise Http404(f"No {model._meta.object_name} matches the given query.")
+
+
 @login_required
 def project_toggle_completed(request, pk: int):
-    project = Project.objects.get(pk=pk)
-    if project.is_completed:
-        project.is_completed = False
-        project.save()
-    else:
-        try:
-            project.is_completed = True
-            project.save()
-        except ValidationError:
-            messages.error(
-                request,
-                "Cannot complete project with uncompleted tasks."
+    _check_access(request, Project, pk)
+    try:
+        is_completed = toggle_project_completed(pk)
+    except Project.DoesNotExist:
+        raise Http404("No Project matches the given query.")
+    except ValidationError as error:
+        if _wants_json(request):
+            return JsonResponse(
+                {"id": pk, "error": error.messages[0]}, status=409
             )
-            return redirect(project.get_absolute_url())
+        messages.error(request, error.messages[0])
+        return redirect("tasks:project-detail", pk=pk)
+    if _wants_json(request):
+        return JsonResponse({"id": pk, "is_completed": is_completed})
+
     next_url = request.POST.get("next") or request.GET.get("next")
     if not next_url:
         next_url = request.META.get("HTTP_REFERER")
 
     return redirect(next_url)
+
+
+def _snapshot_series(request, queryset) -> JsonResponse:
+    try:
+        days = int(request.GET.get("days", SNAPSHOT_DEFAULT_DAYS))
+    except ValueError:
+        raise BadRequest("Invalid days.")
+    if not 0 <= days <= SNAPSHOT_MAX_DAYS:
+        raise BadRequest(f"days must be between 0 and {SNAPSHOT_MAX_DAYS}.")
+    since = timezone.localdate() - datetime.timedelta(days=days)
+    rows = queryset.filter(date__gte=since).values_list(
+        "date", "open_count", "completed_count", "overdue_count"
+    )
+    series = {"labels": [], "open": [], "completed": [], "overdue": []}
+    for day, open_count, completed_count, overdue_count in rows:
+        series["labels"].append(day.isoformat())
+        series["open"].append(open_count)
+        series["completed"].append(completed_count)
+        series["overdue"].append(overdue_count)
+    return JsonResponse(series)
+
+
+@login_required
+def project_metrics(request, pk: int):
+    _check_access(request, Project, pk)
+    return _snapshot_series(
+        request, ProjectSnapshot.objects.filter(project_id=pk)
+    )
+
+
+@login_required
+def project_dependencies(request, pk: int):
+    """
+    The project's dependency graph: ``edges`` as ``[task, blocker]``
+    pairs, the topological ``order``, the ``critical_path`` of open tasks
+    and a ``cycle`` if one slipped in.
+    """
+    get_object_or_404(accessible(Project.objects, request), pk=pk)
+    graph = project_graph(pk)
+    ids = graph["ids"]
+    return JsonResponse(
+        {
+            "project": pk,
+            "edges": [
+                [ids[task], ids[blocker]]
+                for task, blockers in enumerate(graph["blocked_by"])
+                for blocker in blockers
+            ],
+            "order": graph["order"],
+            "critical_path": graph["critical_path"],
+            "cycle": graph["cycle"],
+        }
+    )
+
+
+@login_required
+def team_metrics(request, pk: int):
+    _check_access(request, Team, pk)
+    return _snapshot_series(request, TeamSnapshot.objects.filter(team_id=pk))
+
+
+@login_required
+def task_type_metrics(request, pk: int):
+    return _snapshot_series(
+        request, TaskTypeSnapshot.objects.filter(type_id=pk)
+    )
+
+
+def _date_param(request, name: str, default=None):
+    value = request.GET.get(name)
+    if not value:
+        return default
+    try:
+        day = datetime.date.fromisoformat(value)
+        # the day after has to exist for the deadline ranges
+        day_bounds(day, day)
+    except (ValueError, OverflowError):
+        raise BadRequest(f"Invalid {name} date.")
+    return day
+
+
+def _shift_month(day: datetime.date, months: int) -> datetime.date:
+    """First day of the month ``months`` away from ``day``."""
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+@login_required
+def task_calendar(
+        request, year: int | None = None, month: int | None = None
+):
+    """
+    Month grid of task deadlines. Days only carry per-day counts, the
+    tasks themselves are loaded for the ``?day=`` that is expanded.
+    """
+    today = timezone.localdate()
+    if year is None:
+        year, month = today.year, today.month
+    try:
+        first = datetime.date(year, month, 1)
+        weeks = month_weeks(year, month)
+        previous_month = _shift_month(first, -1)
+        next_month = _shift_month(first, 1)
+    except (ValueError, OverflowError):
+        raise Http404("No such month.")
+
+    counts = task_deadline_counts(
+        weeks[0][0], weeks[-1][-1], accessible(Task.objects, request)
+    )
+    day = _date_param(request, "day")
+    context = {
+        "month": first,
+        "previous_month": previous_month,
+        "next_month": next_month,
+        "weekdays": [
+            calendar.day_abbr[weekday]
+            for weekday in calendar.Calendar().iterweekdays()
+        ],
+        "weeks": [
+            [
+                {
+                    "date": date,
+                    "in_month": date.month == month,
+                    "is_today": date == today,
+                    "counts": counts.get(date),
+                }
+                for date in week
+            ]
+            for week in weeks
+        ],
+        "day": day,
+        "day_tasks": (
+            accessible(tasks_due_on(day), request) if day else None
+        ),
+    }
+    if day and request.headers.get("HX-Request") == "true":
+        return render(request, "tasks/partials/calendar_day.html", context)
+    return render(request, "tasks/task_calendar.html", context)
+
+
+@login_required
+def project_timeline(request):
+    """Project deadlines of ``TIMELINE_MONTHS`` months, grouped by month."""
+    start = _date_param(request, "start", timezone.localdate())
+    first = start.replace(day=1)
+    try:
+        end = _shift_month(first, TIMELINE_MONTHS)
+        previous_start = _shift_month(first, -TIMELINE_MONTHS)
+    except ValueError:
+        raise Http404("No such period.")
+
+    months = [
+        {"month": _shift_month(first, offset), "projects": []}
+        for offset in range(TIMELINE_MONTHS)
+    ]
+    projects = accessible(
+        projects_due_between(first, end - datetime.timedelta(days=1)),
+        request,
+    ).select_related("team").annotate(
+        open_tasks=Count("tasks", filter=Q(tasks__is_completed=False))
+    )
+    for project in projects:
+        offset = (
+            (project.deadline.year - first.year) * 12
+            + project.deadline.month - first.month
+        )
+        months[offset]["projects"].append(project)
+
+    return render(
+        request,
+        "tasks/project_timeline.html",
+        {
+            "months": months,
+            "today": timezone.localdate(),
+            "previous_start": previous_start,
+            "next_start": end,
+        },
+    )
+
+
+@login_required
+def calendar_feed(request):
+    """
+    iCal export of task and project deadlines between ``?from=`` and
+    ``?to=``, streamed event by event.
+    """
+    today = timezone.localdate()
+    first = _date_param(
+        request,
+        "from",
+        today - datetime.timedelta(days=CALENDAR_FEED_PAST_DAYS),
+    )
+    last = _date_param(
+        request, "to", today + datetime.timedelta(days=CALENDAR_FEED_DAYS)
+    )
+    if (last - first).days > CALENDAR_FEED_MAX_DAYS:
+        raise BadRequest(
+            f"The range can span at most {CALENDAR_FEED_MAX_DAYS} days."
+        )
+    stamp = timezone.now()
+    uri = request.build_absolute_uri
+    tasks = (
+        tasks_due_between(first, last, accessible(Task.objects, request))
+        .select_related("type")
+        .order_by("deadline", "pk")
+    )
+    events = chain(
+        (
+            task_event(task, uri, stamp)
+            for task in tasks.iterator(chunk_size=500)
+        ),
+        (
+            project_event(project, uri, stamp)
+            for project in accessible(
+                projects_due_between(first, last), request
+            ).iterator()
+        ),
+    )
+    response = StreamingHttpResponse(
+        stream_calendar(events, "Task deadlines"),
+        content_type="text/calendar; charset=utf-8",
+    )
+    response["Content-Disposition"] = 'attachment; filename="deadlines.ics"'
+    return response
+
+
+def worker_calendar_feed(request, key: str):
+    """
+    Tasks assigned to the worker as an iCal feed, for calendar apps.
+
+    The secret ``key`` stands in for a login. The whole feed comes with a
+    strong ETag, ``?sync-token=`` returns only the events changed since
+    the feed (or the previous changes) carrying that token.
+    """
+    worker = worker_for_key(key)
+    if worker is None:
+        raise Http404("No such feed.")
+    content_type = "text/calendar; charset=utf-8"
+
+    token = request.GET.get("sync-token")
+    if token:
+        try:
+            body, next_token = worker_feed_changes(
+                worker, token, request.build_absolute_uri
+            )
+        except signing.BadSignature:
+            raise BadRequest("Invalid sync token.")
+        response = HttpResponse(body, content_type=content_type)
+    else:
+        feed = worker_feed(worker, request.build_absolute_uri)
+        next_token = feed["token"]
+        response = get_conditional_response(request, etag=feed["etag"])
+        if response is None:
+            response = HttpResponse(feed["body"], content_type=content_type)
+        response["ETag"] = feed["etag"]
+
+    response["X-Sync-Token"] = next_token
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@require_POST
+def worker_feed_reset(request):
+    """Give the user a new calendar feed url, the old one stops working."""
+    reset_feed_key(request.user)
+    messages.success(
+        request, "Your calendar feed has a new address, update your calendar."
+    )
+    return redirect(request.user)